@@ -0,0 +1,62 @@
+"""
+基准测试公共部分：以包的形式加载插件目录（插件模块使用相对导入），
+未安装AstrBot时提供只含logger的astrbot.api替身
+"""
+
+import importlib
+import importlib.util
+import logging
+import sys
+import time
+import types
+from collections.abc import Callable
+from pathlib import Path
+
+PLUGIN_DIR = Path(__file__).resolve().parent.parent
+PACKAGE = "astrbot_plugin_disaster_warning"
+
+
+def load_plugin(*modules: str) -> list[types.ModuleType]:
+    """导入插件的子模块，如 load_plugin("json_codec", "models")"""
+    try:
+        import astrbot.api  # noqa: F401
+    except ImportError:
+        astrbot = types.ModuleType("astrbot")
+        api = types.ModuleType("astrbot.api")
+        api.logger = logging.getLogger("astrbot")
+        astrbot.api = api
+        sys.modules.setdefault("astrbot", astrbot)
+        sys.modules.setdefault("astrbot.api", api)
+
+    if PACKAGE not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            PACKAGE,
+            PLUGIN_DIR / "__init__.py",
+            submodule_search_locations=[str(PLUGIN_DIR)],
+        )
+        package = importlib.util.module_from_spec(spec)
+        sys.modules[PACKAGE] = package
+        spec.loader.exec_module(package)
+
+    return [importlib.import_module(f"{PACKAGE}.{name}") for name in modules]
+
+
+def per_call_us(func: Callable[[], object], min_time: float = 0.2) -> float:
+    """单次调用耗时（微秒）：重复调用直到累计超过min_time秒，取5轮中的最小值"""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / 5:
+            break
+        number *= 2
+
+    best = elapsed
+    for _ in range(4):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - started)
+    return best / number * 1e6
@@ -0,0 +1,133 @@
+"""
+去重基准：模拟地震群，每次地震由多个数据源各报一次，位置、震级、发震时间各有偏差，
+比较只按精确指纹匹配（旧实现）与时空网格索引查找相邻网格（当前实现）的重复推送数与单次查找耗时
+
+用法：python bench/bench_dedup.py [地震次数 ...]
+"""
+
+import math
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from _plugin import load_plugin
+
+# 每次地震的报告数据源
+_SOURCES = ("FAN_STUDIO_CENC", "FAN_STUDIO_CEA", "WOLFX_CENC_EEW", "GLOBAL_QUAKE")
+# 各数据源之间的偏差上限：位置（公里）、震级、发震时间（秒）
+_LOCATION_JITTER_KM = 8.0
+_MAGNITUDE_JITTER = 0.2
+_TIME_JITTER_S = 20.0
+# 相邻两次地震的间隔（秒）：记录都在保留期内，查找时缓存随地震数增长
+_QUAKE_SPACING_S = 2.0
+
+
+def _swarm(count: int, seed: int = 42):
+    """返回按到达顺序排列的 (地震序号, 数据源名称, 纬度, 经度, 震级, 发震时间)"""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    reports = []
+    for quake in range(count):
+        latitude = rng.uniform(-60, 60)
+        longitude = rng.uniform(-180, 180)
+        magnitude = rng.uniform(3.0, 7.0)
+        shock_time = start + timedelta(seconds=quake * _QUAKE_SPACING_S)
+        for source in _SOURCES:
+            distance = rng.uniform(0, _LOCATION_JITTER_KM)
+            bearing = rng.uniform(0, 2 * math.pi)
+            d_lat = distance * math.cos(bearing) / 111.0
+            d_lon = distance * math.sin(bearing) / (
+                111.0 * max(math.cos(math.radians(latitude)), 0.1)
+            )
+            reports.append(
+                (
+                    quake,
+                    source,
+                    latitude + d_lat,
+                    (longitude + d_lon + 180) % 360 - 180,
+                    round(magnitude + rng.uniform(-_MAGNITUDE_JITTER, _MAGNITUDE_JITTER), 1),
+                    shock_time + timedelta(seconds=rng.uniform(-_TIME_JITTER_S, _TIME_JITTER_S)),
+                )
+            )
+    # 各数据源的到达顺序在同一次地震内打乱
+    reports.sort(key=lambda report: (report[0], rng.random()))
+    return start, reports
+
+
+def _run(deduplicator_cls, models, start, reports):
+    deduplicator = deduplicator_cls(max_entries=len(reports), clock=lambda: start)
+    events = [
+        models.DisasterEvent(
+            id=f"{source}-{quake}",
+            data=models.EarthquakeData(
+                id=f"{source}-{quake}",
+                event_id=f"{source}-{quake}",
+                source=models.DataSource[source],
+                disaster_type=models.DisasterType.EARTHQUAKE,
+                shock_time=shock_time,
+                latitude=latitude,
+                longitude=longitude,
+                magnitude=magnitude,
+                place_name="",
+            ),
+            source=models.DataSource[source],
+            disaster_type=models.DisasterType.EARTHQUAKE,
+        )
+        for quake, source, latitude, longitude, magnitude, shock_time in reports
+    ]
+
+    pushes: dict[int, int] = {}
+    elapsed = []
+    perf_counter = time.perf_counter
+    should_push = deduplicator.should_push_event
+    for report, event in zip(reports, events):
+        started = perf_counter()
+        pushed = should_push(event)
+        elapsed.append(perf_counter() - started)
+        if pushed:
+            pushes[report[0]] = pushes.get(report[0], 0) + 1
+
+    quakes = reports[-1][0] + 1
+    tenth = max(1, len(elapsed) // 10)
+    return {
+        "duplicates": sum(pushes.values()) - len(pushes),
+        "missed": quakes - len(pushes),
+        "avg_us": sum(elapsed) / len(elapsed) * 1e6,
+        "first_us": sum(elapsed[:tenth]) / tenth * 1e6,
+        "last_us": sum(elapsed[-tenth:]) / tenth * 1e6,
+        "entries": len(deduplicator.recent_events),
+    }
+
+
+def main():
+    event_deduplicator, models = load_plugin("event_deduplicator", "models")
+
+    class ExactKeyDeduplicator(event_deduplicator.EventDeduplicator):
+        """旧实现：只按精确指纹匹配，不查找相邻网格"""
+
+        def _find_similar(self, earthquake, timestamp):
+            return None
+
+    counts = [int(arg) for arg in sys.argv[1:]] or [2000, 20000]
+    print(
+        f"每次地震 {len(_SOURCES)} 个数据源，偏差 ±{_LOCATION_JITTER_KM:g}km / "
+        f"±{_MAGNITUDE_JITTER:g}级 / ±{_TIME_JITTER_S:g}秒"
+    )
+    for count in counts:
+        start, reports = _swarm(count)
+        print(f"\n地震 {count} 次，报告 {len(reports)} 条")
+        for name, cls in (
+            ("精确指纹（旧实现）", ExactKeyDeduplicator),
+            ("时空网格索引", event_deduplicator.EventDeduplicator),
+        ):
+            result = _run(cls, models, start, reports)
+            print(
+                f"{name:<12} 重复推送 {result['duplicates']:6d}  漏推 {result['missed']:4d}  "
+                f"查找 {result['avg_us']:6.1f} us（前10% {result['first_us']:6.1f} / "
+                f"后10% {result['last_us']:6.1f}）  记录 {result['entries']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
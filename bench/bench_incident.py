@@ -0,0 +1,148 @@
+"""
+地震关联基准：模拟每分钟上千条报告的地震群，每次地震由4个数据源报告，
+其中P2P与Wolfx地震列表每次修订都使用新的事件ID。比较同一数据源一律视为另一次地震的旧规则
+与识别同一数据源修订的当前实现：被拆分的地震数、被错误合并的incident数与单次关联耗时
+
+用法：python bench/bench_incident.py [每分钟报告数 ...]
+"""
+
+import math
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from _plugin import load_plugin
+
+# (数据源, 每次修订是否使用新的事件ID)
+_SOURCES = (
+    ("FAN_STUDIO_CENC", False),
+    ("GLOBAL_QUAKE", False),
+    ("P2P_EARTHQUAKE", True),
+    ("WOLFX_CENC_EEW", True),
+)
+# 每个数据源对同一地震的报告次数
+_MAX_REVISIONS = 3
+# 数据源之间的偏差上限：位置（公里）、震级、发震时间（秒）；同一数据源修订之间的发震时间偏差（秒）
+_LOCATION_JITTER_KM = 8.0
+_MAGNITUDE_JITTER = 0.2
+_TIME_JITTER_S = 3.0
+_REVISION_JITTER_S = 1.0
+# 模拟时长（分钟）与地震分布范围（日本附近约1500公里见方）
+_MINUTES = 10
+_LATITUDE_RANGE = (30.0, 45.0)
+_LONGITUDE_RANGE = (130.0, 145.0)
+
+
+def _swarm(reports_per_minute: int, seed: int = 7):
+    """返回按到达顺序排列的 (地震序号, 数据源, 事件ID, 纬度, 经度, 震级, 发震时间)"""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    reports_per_quake = len(_SOURCES) * (1 + _MAX_REVISIONS) / 2
+    quakes = int(reports_per_minute * _MINUTES / reports_per_quake)
+    spacing = _MINUTES * 60 / quakes
+
+    reports = []
+    for quake in range(quakes):
+        latitude = rng.uniform(*_LATITUDE_RANGE)
+        longitude = rng.uniform(*_LONGITUDE_RANGE)
+        magnitude = rng.uniform(3.0, 7.0)
+        shock_time = start + timedelta(seconds=quake * spacing)
+        for source, new_ids in _SOURCES:
+            distance = rng.uniform(0, _LOCATION_JITTER_KM)
+            bearing = rng.uniform(0, 2 * math.pi)
+            source_latitude = latitude + distance * math.cos(bearing) / 111.0
+            source_longitude = longitude + distance * math.sin(bearing) / (
+                111.0 * math.cos(math.radians(latitude))
+            )
+            source_time = shock_time + timedelta(
+                seconds=rng.uniform(-_TIME_JITTER_S, _TIME_JITTER_S)
+            )
+            for revision in range(rng.randint(1, _MAX_REVISIONS)):
+                event_id = f"{source}-{quake}" + (f"-{revision}" if new_ids else "")
+                arrival = shock_time + timedelta(seconds=rng.uniform(5, 120))
+                reports.append(
+                    (
+                        arrival,
+                        quake,
+                        source,
+                        event_id,
+                        source_latitude,
+                        source_longitude,
+                        round(magnitude + rng.uniform(-_MAGNITUDE_JITTER, _MAGNITUDE_JITTER), 1),
+                        source_time
+                        + timedelta(seconds=rng.uniform(-_REVISION_JITTER_S, _REVISION_JITTER_S)),
+                    )
+                )
+    reports.sort(key=lambda report: report[0])
+    return quakes, [report[1:] for report in reports]
+
+
+def _run(correlator_cls, models, reports):
+    correlator = correlator_cls()
+    earthquakes = [
+        models.EarthquakeData(
+            id=event_id,
+            event_id=event_id,
+            source=models.DataSource[source],
+            disaster_type=models.DisasterType.EARTHQUAKE,
+            shock_time=shock_time,
+            latitude=latitude,
+            longitude=longitude,
+            magnitude=magnitude,
+            place_name="",
+        )
+        for _, source, event_id, latitude, longitude, magnitude, shock_time in reports
+    ]
+
+    incidents_by_quake: dict[int, set[str]] = {}
+    quakes_by_incident: dict[str, set[int]] = {}
+    correlate = correlator.correlate
+    perf_counter = time.perf_counter
+    started = perf_counter()
+    for report, earthquake in zip(reports, earthquakes):
+        incident_id = correlate(earthquake)
+        incidents_by_quake.setdefault(report[0], set()).add(incident_id)
+        quakes_by_incident.setdefault(incident_id, set()).add(report[0])
+    elapsed = perf_counter() - started
+
+    return {
+        "incidents": len(quakes_by_incident),
+        "split": sum(1 for ids in incidents_by_quake.values() if len(ids) > 1),
+        "merged": sum(1 for quakes in quakes_by_incident.values() if len(quakes) > 1),
+        "us": elapsed / len(reports) * 1e6,
+    }
+
+
+def main():
+    incident_correlator, models = load_plugin("incident_correlator", "models")
+
+    class StrictSourceCorrelator(incident_correlator.IncidentCorrelator):
+        """旧规则：同一数据源以新事件ID报告的一律视为另一次地震"""
+
+        @staticmethod
+        def _is_revision(previous, shock_time):
+            return False
+
+    rates = [int(arg) for arg in sys.argv[1:]] or [1000, 5000]
+    print(
+        f"{len(_SOURCES)} 个数据源，每个数据源报告1~{_MAX_REVISIONS}次，"
+        f"偏差 ±{_LOCATION_JITTER_KM:g}km / ±{_MAGNITUDE_JITTER:g}级 / ±{_TIME_JITTER_S:g}秒，"
+        f"模拟 {_MINUTES} 分钟"
+    )
+    for rate in rates:
+        quakes, reports = _swarm(rate)
+        print(f"\n每分钟 {rate} 条报告：地震 {quakes} 次，报告 {len(reports)} 条")
+        for name, cls in (
+            ("同源视为新地震（旧规则）", StrictSourceCorrelator),
+            ("识别同源修订", incident_correlator.IncidentCorrelator),
+        ):
+            result = _run(cls, models, reports)
+            print(
+                f"{name:<14} incident {result['incidents']:6d}  被拆分的地震 {result['split']:5d}  "
+                f"错误合并 {result['merged']:4d}  关联 {result['us']:5.1f} us/条"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+事件状态日志重放基准：按推送流程的写入方式生成一周的记录（去重记录、推送记录、最终报标记），
+按日志自身的规则压缩，再在日志中追加到压缩阈值前一条（重启前的最坏情况），测量启动重放的耗时
+
+用法：python bench/bench_journal.py [每天事件数 ...]
+"""
+
+import asyncio
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+from _plugin import load_plugin
+
+DAYS = 7
+# 每次事件的报告数（每次报告写入一条去重记录与一条推送记录）
+_MAX_REPORTS = 5
+# 去重记录在内存中的保留时间
+_DEDUP_RETENTION = timedelta(minutes=65)
+# 重放耗时预算（毫秒）
+BUDGET_MS = 100.0
+
+
+def _event_records(rng: random.Random, index: int, timestamp: datetime):
+    """一次事件的各报：(去重指纹, 去重记录, 事件ID, 推送记录)"""
+    event_id = f"EQ{timestamp:%Y%m%d%H%M%S}-{index:06x}"
+    reports = rng.randint(1, _MAX_REPORTS)
+    latitude, longitude = rng.uniform(-60, 60), rng.uniform(-180, 180)
+    for report in range(1, reports + 1):
+        fingerprint = f"{latitude:.3f},{longitude:.3f},4.5,{timestamp:%Y%m%d%H%M}"
+        entry = {
+            "timestamp": timestamp,
+            "source": "fan_studio_cenc",
+            "latitude": latitude,
+            "longitude": longitude,
+            "magnitude": 4.8,
+            "info_type": "正式测定",
+            "updates": report,
+            "is_final": report == reports,
+        }
+        record = {
+            "timestamp": timestamp,
+            "event_id": event_id,
+            "disaster_type": "earthquake",
+            "is_final": report == reports,
+            "suppressed": False,
+            "source": "fan_studio_cenc",
+            "source_event_id": f"CD{timestamp:%Y%m%d%H%M%S}.{index:04d}",
+            "hypocenter": {
+                "latitude": latitude,
+                "longitude": longitude,
+                "magnitude": 4.8,
+                "shock_time": timestamp.isoformat(),
+            },
+        }
+        yield fingerprint, entry, event_id, record
+
+
+def write_week(event_journal, directory, events_per_day: int, threshold: int, seed: int = 5):
+    """写入一周的记录并在日志中留下threshold-1条未压缩记录，返回日志记录数"""
+    rng = random.Random(seed)
+    journal = event_journal.EventJournal(directory, compact_threshold=threshold)
+    dedup: dict[str, dict] = {}
+    push: dict[str, list[dict]] = {}
+    final: set[str] = set()
+    journal.set_snapshot_provider(lambda: (dedup, push, final))
+
+    events = events_per_day * DAYS
+    start = datetime.now() - timedelta(days=DAYS)
+    step = timedelta(seconds=DAYS * 86400 / events)
+
+    def record_event(index: int):
+        timestamp = start + index * step
+        for fingerprint, entry, event_id, record in _event_records(rng, index, timestamp):
+            dedup[fingerprint] = entry
+            journal.record_dedup(fingerprint, entry)
+            push.setdefault(event_id, []).append(record)
+            journal.record_push(event_id, record)
+        final.add(event_id)
+        journal.record_final(event_id)
+
+    async def write():
+        nonlocal dedup
+        for index in range(events):
+            record_event(index)
+            if index % 20 == 0:
+                cutoff = start + index * step - _DEDUP_RETENTION
+                dedup = {k: v for k, v in dedup.items() if v["timestamp"] >= cutoff}
+                await journal.flush()
+                if journal.should_compact():
+                    await journal.compact()
+        await journal.compact()
+
+        # 最近的事件只在日志中：追加到压缩阈值前一条
+        index = events
+        while journal._journal_records < threshold - 1:
+            record_event(index)
+            index += 1
+        await journal.flush()
+
+    asyncio.run(write())
+    return journal._journal_records
+
+
+def replay_ms(event_journal, directory, rounds: int = 5):
+    """重放耗时（毫秒，取多轮中的最小值）与重放得到的状态"""
+    best = None
+    for _ in range(rounds):
+        journal = event_journal.EventJournal(directory)
+        state = journal.load()
+        best = journal.replay_ms if best is None else min(best, journal.replay_ms)
+    return best, state
+
+
+def main():
+    (event_journal,) = load_plugin("event_journal")
+    rates = [int(arg) for arg in sys.argv[1:]] or [500, 1000]
+    print(f"{DAYS} 天，每次事件 1~{_MAX_REPORTS} 报，预算 {BUDGET_MS:g} 毫秒")
+    for events_per_day in rates:
+        print(f"\n每天 {events_per_day} 次事件")
+        for threshold in (5000, 2000, 1000):
+            with tempfile.TemporaryDirectory() as directory:
+                pending = write_week(event_journal, directory, events_per_day, threshold)
+                elapsed, state = replay_ms(event_journal, directory)
+                print(
+                    f"压缩阈值 {threshold:5d}：推送记录 {len(state.push)} 个事件，"
+                    f"日志 {pending} 条，重放 {elapsed:6.1f} 毫秒"
+                )
+
+
+if __name__ == "__main__":
+    main()
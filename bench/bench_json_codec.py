@@ -0,0 +1,43 @@
+"""
+JSON编解码基准：各数据源消息帧经标准库json与json_codec（当前后端）的解码/编码耗时
+
+用法：python bench/bench_json_codec.py [录制的帧.jsonl]
+"""
+
+import json
+import sys
+
+from _plugin import load_plugin, per_call_us
+from payloads import load_frames
+
+
+def main():
+    (json_codec,) = load_plugin("json_codec")
+    frames = load_frames(sys.argv[1] if len(sys.argv) > 1 else None)
+
+    print(f"json_codec后端: {json_codec.BACKEND}")
+    print(
+        f"{'数据源帧':<20}{'字节':>7}"
+        f"{'json解码':>10}{'codec解码':>11}{'加速':>7}"
+        f"{'json编码':>10}{'codec编码':>11}{'加速':>7}"
+    )
+    for feed, _, _, raw in frames:
+        data = json.loads(raw)
+        stdlib_decode = per_call_us(lambda: json.loads(raw))
+        codec_decode = per_call_us(lambda: json_codec.loads(raw))
+        # 原始消息日志的JSON回退格式
+        stdlib_encode = per_call_us(
+            lambda: json.dumps(data, ensure_ascii=False, indent=2)
+        )
+        codec_encode = per_call_us(lambda: json_codec.dumps(data, indent=True))
+        print(
+            f"{feed:<20}{len(raw.encode()):>7}"
+            f"{stdlib_decode:>9.1f}us{codec_decode:>9.1f}us"
+            f"{stdlib_decode / codec_decode:>6.1f}x"
+            f"{stdlib_encode:>9.1f}us{codec_encode:>9.1f}us"
+            f"{stdlib_encode / codec_encode:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+逐帧解析CPU基准：各数据源消息帧经处理器parse_message（JSON解码 + 结构解码 + 热路径日志）的耗时
+
+日志写入内存中的StringIO，INFO/DEBUG级别下的字符串构建与格式化都计入耗时。
+脚本只依赖各版本都有的parse_message(envelope, source)，在更早的提交上运行即可得到对比数据。
+
+用法：python bench/bench_parse.py [录制的帧.jsonl]
+"""
+
+import io
+import logging
+import sys
+
+from _plugin import load_plugin, per_call_us
+from payloads import load_frames
+
+# (日志级别, 采样率)；采样率只在支持日志采样的版本上生效
+_CONFIGS = [
+    (logging.WARNING, 1),
+    (logging.INFO, 1),
+    (logging.INFO, 10),
+    (logging.DEBUG, 1),
+]
+
+
+def main():
+    data_handlers, models = load_plugin("data_handlers", "models")
+    frames = load_frames(sys.argv[1] if len(sys.argv) > 1 else None)
+
+    logger = logging.getLogger("astrbot")
+    logger.handlers = [logging.StreamHandler(io.StringIO())]
+    logger.propagate = False
+
+    headers = [
+        f"{logging.getLevelName(level)}{f'/{rate}' if rate > 1 else ''}"
+        for level, rate in _CONFIGS
+    ]
+    print(f"{'数据源帧':<20}" + "".join(f"{header:>12}" for header in headers))
+
+    totals = [0.0] * len(_CONFIGS)
+    for feed, handler_name, source_value, raw in frames:
+        source = models.DataSource(source_value) if source_value else None
+        connection_name = source_value or f"{handler_name}_main"
+        row = []
+        for index, (level, rate) in enumerate(_CONFIGS):
+            logger.setLevel(level)
+            handler = data_handlers.DATA_HANDLERS[handler_name]()
+            if hasattr(handler, "log_sampler"):
+                handler.log_sampler.rate = rate
+
+            def parse():
+                envelope = models.MessageEnvelope(
+                    raw=raw, connection_name=connection_name
+                )
+                handler.parse_message(envelope, source)
+
+            elapsed = per_call_us(parse)
+            totals[index] += elapsed
+            row.append(elapsed)
+        print(f"{feed:<20}" + "".join(f"{value:>10.1f}us" for value in row))
+
+    print(f"{'合计':<20}" + "".join(f"{value:>10.1f}us" for value in totals))
+    print("\n地震列表帧在首次解析后列表哈希不变，计时为跳过未变化快照的路径")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+结构解码基准：各数据源消息体经按字段映射逐字段查找（decode_table，未安装msgspec时的路径）
+与由字段映射生成的msgspec.Struct（decode）解码为数据模型的耗时，并核对两者结果一致。
+只计结构解码，不含JSON解码与处理器的其余部分（整帧耗时见bench_parse.py）
+
+用法：python bench/bench_schemas.py（需要安装msgspec）
+"""
+
+import dataclasses
+import json
+import sys
+
+from _plugin import load_plugin, per_call_us
+from payloads import load_frames
+
+# 数据源帧名称 -> (结构声明, 取出待解码消息体)
+_SCHEMA_FRAMES = {
+    "fan_studio_usgs": ("FAN_USGS_SCHEMA", lambda body: body["Data"]),
+    "fan_studio_cea": ("FAN_CEA_SCHEMA", lambda body: body["Data"]),
+    "fan_studio_cenc": ("FAN_CENC_SCHEMA", lambda body: body["Data"]),
+    "fan_studio_weather": ("FAN_WEATHER_SCHEMA", lambda body: body["Data"]),
+    "p2p_551": ("P2P_EARTHQUAKE_SCHEMA", lambda body: body),
+    "wolfx_jma_eew": ("WOLFX_JMA_EEW_SCHEMA", lambda body: body),
+    "wolfx_cenc_eqlist": ("WOLFX_CENC_EQLIST_SCHEMA", lambda body: body["No1"]),
+}
+
+# 每次解码时变化的字段
+_VOLATILE_FIELDS = {"receive_time"}
+
+
+def _same(left, right) -> bool:
+    return all(
+        getattr(left, field.name) == getattr(right, field.name)
+        for field in dataclasses.fields(left)
+        if field.name not in _VOLATILE_FIELDS
+    )
+
+
+def main():
+    message_schemas, data_handlers = load_plugin("message_schemas", "data_handlers")
+    if message_schemas.msgspec is None:
+        print("未安装msgspec，只有逐字段查找路径")
+        sys.exit(1)
+
+    handlers = {name: cls() for name, cls in data_handlers.DATA_HANDLERS.items()}
+    print(f"{'数据源帧':<20}{'逐字段查找':>12}{'msgspec.Struct':>16}{'加速':>8}  结果一致")
+    totals = [0.0, 0.0]
+    for feed, handler_name, _, raw in load_frames():
+        if feed not in _SCHEMA_FRAMES:
+            continue
+        schema_name, extract = _SCHEMA_FRAMES[feed]
+        schema = getattr(message_schemas, schema_name)
+        data = extract(json.loads(raw))
+        handler = handlers[handler_name]
+
+        table_us = per_call_us(lambda: schema.decode_table(data, handler))
+        struct_us = per_call_us(lambda: schema.decode(data, handler))
+        same = _same(schema.decode(data, handler), schema.decode_table(data, handler))
+        totals[0] += table_us
+        totals[1] += struct_us
+        print(
+            f"{feed:<20}{table_us:>10.2f}us{struct_us:>14.2f}us"
+            f"{table_us / struct_us:>7.2f}x  {'是' if same else '否'}"
+        )
+    print(
+        f"{'合计':<20}{totals[0]:>10.2f}us{totals[1]:>14.2f}us"
+        f"{totals[0] / totals[1]:>7.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+时间解析基准：各数据源消息帧中的时间字符串经逐个尝试strptime格式的旧实现，
+与按字段记住格式 + fromisoformat快速路径 + LRU缓存的_parse_datetime_cached的耗时
+
+用法：python bench/bench_timestamps.py [录制的帧.jsonl]
+"""
+
+import re
+import sys
+from datetime import datetime
+from typing import Any
+
+from _plugin import load_plugin, per_call_us
+from payloads import load_frames
+
+_TIMESTAMP = re.compile(r"^\d{4}[-/]\d{2}[-/]\d{2} \d{2}:\d{2}")
+
+
+def _legacy_parse(time_str: str, formats: tuple[str, ...]) -> datetime | None:
+    """改进前的实现：按顺序尝试每个格式"""
+    for fmt in formats:
+        try:
+            return datetime.strptime(time_str, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _timestamps(value: Any, path: str, found: list[tuple[str, str]]):
+    """收集消息中的时间字符串及其字段路径（作为格式键）"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            # 地震列表的No1..No50是同一字段
+            key = "No" if re.fullmatch(r"No\d+", key) else key
+            _timestamps(item, f"{path}.{key}", found)
+    elif isinstance(value, list):
+        for item in value:
+            _timestamps(item, f"{path}[]", found)
+    elif isinstance(value, str) and _TIMESTAMP.match(value):
+        found.append((value, path))
+
+
+def main():
+    json_codec, data_handlers = load_plugin("json_codec", "data_handlers")
+    parse_cached = data_handlers._parse_datetime_cached
+    formats = data_handlers._DATETIME_FORMATS
+
+    timestamps: list[tuple[str, str]] = []
+    for feed, _, _, raw in load_frames(sys.argv[1] if len(sys.argv) > 1 else None):
+        _timestamps(json_codec.loads(raw), feed, timestamps)
+
+    mismatches = [
+        time_str
+        for time_str, key in timestamps
+        if parse_cached(time_str, key) != _legacy_parse(time_str, formats)
+    ]
+
+    def legacy():
+        for time_str, _ in timestamps:
+            _legacy_parse(time_str, formats)
+
+    def cold():
+        # 已记住各字段的格式，但每个字符串都未命中缓存
+        parse_cached.cache_clear()
+        for time_str, key in timestamps:
+            parse_cached(time_str, key)
+
+    def warm():
+        for time_str, key in timestamps:
+            parse_cached(time_str, key)
+
+    count = len(timestamps)
+    legacy_us = per_call_us(legacy) / count
+    cold_us = per_call_us(cold) / count
+    warm_us = per_call_us(warm) / count
+    print(f"时间字符串: {count} 个，来自 {len({key for _, key in timestamps})} 个字段")
+    print(f"逐个尝试格式（旧实现）: {legacy_us:6.2f} us/个")
+    print(f"记住格式，未命中缓存:   {cold_us:6.2f} us/个 ({legacy_us / cold_us:.1f}x)")
+    print(f"命中缓存:               {warm_us:6.2f} us/个 ({legacy_us / warm_us:.1f}x)")
+    print(f"与旧实现结果不一致: {len(mismatches)} 个 {mismatches[:5]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+基准测试使用的各数据源消息帧
+字段与取值取自各数据源实际推送的消息（见README的原始消息格式记录），
+可用 load_frames(path) 改为读取自行录制的帧（每行一个JSON：{"feed", "handler", "source", "raw"}）
+"""
+
+import json
+from pathlib import Path
+from typing import Any
+
+# (数据源帧名称, 处理器, 数据源, 消息体)
+_SAMPLES: list[tuple[str, str, str | None, Any]] = [
+    (
+        "fan_studio_usgs",
+        "fan_studio",
+        "fan_studio_usgs",
+        {
+            "type": "initial",
+            "Data": {
+                "id": "71501338",
+                "title": "M 3.2 - 46 km NNW of San Antonio, Puerto Rico",
+                "infoTypeName": "reviewed",
+                "magnitude": 3.18,
+                "placeName": "46 km NNW of San Antonio, Puerto Rico",
+                "shockTime": "2025-12-04 11:57:06",
+                "updateTime": "2025-12-04 12:27:09",
+                "longitude": -67.2761666666667,
+                "latitude": 18.8746666666667,
+                "depth": 46.2,
+                "url": "https://earthquake.usgs.gov/earthquakes/eventpage/pr71501338",
+            },
+            "md5": "9be951e4461d496a0094fe2b6546d8cf",
+        },
+    ),
+    (
+        "fan_studio_cea",
+        "fan_studio",
+        "fan_studio_cea",
+        {
+            "type": "initial",
+            "Data": {
+                "id": "bzcwijmrcyryy",
+                "eventId": "202512021945.0001",
+                "shockTime": "2025-12-02 19:45:32",
+                "longitude": 78.153,
+                "latitude": 36.509,
+                "placeName": "新疆和田地区皮山县",
+                "magnitude": 4.9,
+                "epiIntensity": 6.4,
+                "depth": 20,
+                "updates": 1,
+            },
+            "md5": "bcf7a40698cc74e0287d9d5ea61b9dfb",
+        },
+    ),
+    (
+        "fan_studio_cenc",
+        "fan_studio",
+        "fan_studio_cenc",
+        {
+            "type": "initial",
+            "Data": {
+                "id": "cenc20251202194532",
+                "eventId": "CD20251202194532.0001",
+                "shockTime": "2025-12-02 19:45:32",
+                "longitude": 78.15,
+                "latitude": 36.51,
+                "placeName": "新疆和田地区皮山县",
+                "magnitude": 4.8,
+                "depth": 18,
+                "infoTypeName": "[正式测定]",
+            },
+            "md5": "1c7f3a1d2e5b4f6a8c9d0e1f2a3b4c5d",
+        },
+    ),
+    (
+        "fan_studio_weather",
+        "fan_studio",
+        "fan_studio_weather",
+        {
+            "type": "initial",
+            "Data": {
+                "id": "44030041600000_20250425123759",
+                "headline": "深圳市气象台发布暴雨黄色预警信号",
+                "title": "深圳市气象台发布暴雨黄色预警信号",
+                "description": (
+                    "深圳市气象台于2025年04月25日12时37分在全市陆地和海区发布暴雨黄色预警信号，"
+                    "预计未来3小时全市陆地和海区将出现50毫米以上的降水，请注意防御。"
+                ),
+                "type": "p0002002",
+                "effective": "2025/04/25 12:37",
+                "longitude": 114.06,
+                "latitude": 22.54,
+            },
+            "md5": "0d8b6f2c1a4e3d5f7a9b8c6d4e2f1a3b",
+        },
+    ),
+    (
+        "p2p_551",
+        "p2p",
+        None,
+        {
+            "_id": "69314fccc58757000701eb4d",
+            "code": 551,
+            "comments": {"freeFormComment": ""},
+            "earthquake": {
+                "domesticTsunami": "None",
+                "foreignTsunami": "Unknown",
+                "hypocenter": {
+                    "depth": 50,
+                    "latitude": 42.8,
+                    "longitude": 143.2,
+                    "magnitude": 3.6,
+                    "name": "十勝地方中部",
+                },
+                "maxScale": 20,
+                "time": "2025/12/04 18:04:00",
+            },
+            "issue": {
+                "correct": "None",
+                "source": "気象庁",
+                "time": "2025/12/04 18:06:54",
+                "type": "DetailScale",
+            },
+            "points": [
+                {"addr": addr, "isArea": False, "pref": "北海道", "scale": scale}
+                for addr, scale in (
+                    ("浦幌町桜町", 20),
+                    ("十勝池田町西１条", 10),
+                    ("幕別町本町", 10),
+                    ("豊頃町茂岩本町", 10),
+                    ("本別町北２丁目", 10),
+                    ("帯広市東４条", 10),
+                    ("足寄町北１条", 10),
+                    ("十勝清水町南４条", 10),
+                )
+            ],
+            "time": "2025/12/04 18:06:55.246",
+            "timestamp": {
+                "convert": "2025/12/04 18:06:55.241",
+                "register": "2025/12/04 18:06:55.246",
+            },
+            "user_agent": "jmaxml-seis-parser-go, relay, register-api",
+            "ver": "20231023",
+        },
+    ),
+    (
+        "p2p_555",
+        "p2p",
+        None,
+        {
+            "_id": "69315011c58757000701eb52",
+            "areas": [{"id": area_id, "peer": 3 + area_id % 41} for area_id in range(10, 905, 10)],
+            "code": 555,
+            "created_at": "2025/12/04 18:08:01.512",
+            "hop": 2,
+            "id": "69315011c58757000701eb52",
+            "time": "2025/12/04 18:08:01.520",
+            "uid": "Y4bBoQT5v8rP2",
+            "ver": "20231023",
+        },
+    ),
+    (
+        "p2p_561",
+        "p2p",
+        None,
+        {
+            "_id": "6931501ac58757000701eb53",
+            "area": 250,
+            "code": 561,
+            "created_at": "2025/12/04 18:08:10.377",
+            "hop": 3,
+            "id": "6931501ac58757000701eb53",
+            "time": "2025/12/04 18:08:10.384",
+            "uid": "kd9Q2xWm7LpT4",
+            "ver": "20231023",
+        },
+    ),
+    (
+        "p2p_9611",
+        "p2p",
+        None,
+        {
+            "_id": "6931501fc58757000701eb54",
+            "area_confidences": {
+                str(area_id): {
+                    "confidence": round(0.5 + (area_id % 50) / 100, 4),
+                    "count": 1 + area_id % 7,
+                    "display": "ABCDE"[area_id % 5],
+                }
+                for area_id in range(200, 320, 10)
+            },
+            "code": 9611,
+            "confidence": 0.9728,
+            "count": 24,
+            "created_at": "2025/12/04 18:08:15.102",
+            "id": "6931501fc58757000701eb54",
+            "started_at": "2025/12/04 18:08:05.000",
+            "time": "2025/12/04 18:08:15.108",
+            "updated_at": "2025/12/04 18:08:15.000",
+            "user_agent": "jmaxml-seis-parser-go, relay, register-api",
+            "ver": "20231023",
+        },
+    ),
+    (
+        "wolfx_jma_eew",
+        "wolfx",
+        None,
+        {
+            "type": "jma_eew",
+            "Title": "緊急地震速報（予報）",
+            "CodeType": "Ｍ、最大予測震度及び主要動到達予測時刻の緊急地震速報",
+            "Issue": {"Source": "東京", "Status": "通常"},
+            "EventID": "20251204180345",
+            "Serial": 3,
+            "AnnouncedTime": "2025/12/04 18:04:12",
+            "OriginTime": "2025/12/04 18:03:45",
+            "Hypocenter": "十勝地方中部",
+            "Latitude": 42.8,
+            "Longitude": 143.2,
+            "Magnitude": 3.8,
+            "Depth": 50,
+            "MaxIntensity": "2",
+            "Accuracy": {
+                "Epicenter": "IPF 法（5 点以上）",
+                "Depth": "IPF 法（5 点以上）",
+                "Magnitude": "全点全相",
+            },
+            "MaxIntChange": {"String": "ほとんど変化なし", "Reason": "不明、未設定時、キャンセル時"},
+            "WarnArea": [],
+            "isSea": False,
+            "isTraining": False,
+            "isAssumption": False,
+            "isWarn": False,
+            "isFinal": False,
+            "isCancel": False,
+            "OriginalText": "37 03 00 251204180412 C11 251204180345 ND20251204180345 NCN903",
+        },
+    ),
+    (
+        "wolfx_cenc_eqlist",
+        "wolfx",
+        None,
+        {
+            "type": "cenc_eqlist",
+            **{
+                f"No{index}": {
+                    "type": "正式测定" if index > 2 else "自动测定",
+                    "time": f"2025-12-{4 - index // 20:02d} {(18 - index % 18):02d}:{(index * 7) % 60:02d}:{(index * 13) % 60:02d}",
+                    "location": "新疆和田地区皮山县" if index % 3 else "四川甘孜州泸定县",
+                    "magnitude": f"{2.5 + (index % 30) / 10:.1f}",
+                    "depth": str(10 + index % 15),
+                    "latitude": f"{36.5 - index * 0.11:.2f}",
+                    "longitude": f"{78.1 + index * 0.37:.2f}",
+                    "intensity": str(index % 6),
+                    "md5": f"{index:032x}",
+                }
+                for index in range(1, 51)
+            },
+            "md5": "5e0f9c1b2a3d4e5f60718293a4b5c6d7",
+        },
+    ),
+]
+
+
+def load_frames(path: str | None = None) -> list[tuple[str, str, str | None, str]]:
+    """返回 (数据源帧名称, 处理器, 数据源, 原始消息文本) 列表"""
+    if path is None:
+        return [
+            (feed, handler, source, json.dumps(body, ensure_ascii=False))
+            for feed, handler, source, body in _SAMPLES
+        ]
+
+    frames = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            record = json.loads(line)
+            frames.append(
+                (record["feed"], record["handler"], record.get("source"), record["raw"])
+            )
+    return frames
@@ -3,7 +3,8 @@
 """
 
 import asyncio
-import json
+import functools
+import time
 import traceback
 from datetime import datetime
 from typing import Any
@@ -11,11 +12,15 @@ from typing import Any
 from astrbot.api import logger
 
 from .data_handlers import (
+    CONNECTION_SOURCE_MAP,
     FanStudioHandler,
     GlobalQuakeHandler,
     P2PDataHandler,
     WolfxDataHandler,
 )
+from .event_journal import EventJournal
+from .gap_backfill import P2P_HISTORY, GapBackfiller
+from .log_sampling import LogSampler
 from .message_logger import MessageLogger
 from .message_manager import MessagePushManager
 from .models import (
@@ -23,10 +28,43 @@ from .models import (
     DisasterEvent,
     DisasterType,
     EarthquakeData,
+    MessageEnvelope,
     TsunamiData,
     WeatherAlarmData,
 )
-from .websocket_manager import GlobalQuakeClient, HTTPDataFetcher, WebSocketManager
+from .parse_executor import ParseExecutor
+from .poll_scheduler import POLL_CHANGED, POLL_FAILED, POLL_UNCHANGED, PollScheduler
+from .websocket_manager import (
+    GlobalQuakeClient,
+    HTTPDataFetcher,
+    Outage,
+    WebSocketManager,
+)
+
+# Wolfx地震列表HTTP接口（连接名称 -> URL）
+WOLFX_EQLIST_URLS = {
+    "http_wolfx_cenc_eqlist": "https://api.wolfx.jp/cenc_eqlist.json",
+    "http_wolfx_jma_eqlist": "https://api.wolfx.jp/jma_eqlist.json",
+}
+
+# 启动预热：就绪检查周期（秒）；连接后一直没有消息的连接在此时间后视为就绪（秒）
+_WARM_START_TICK = 0.2
+_WARM_START_SETTLE = 3.0
+
+# 与地震列表覆盖同一地区的WebSocket连接：这些连接断线或收到地震时提前轮询对应列表
+EQLIST_RELATED_CONNECTIONS = {
+    "http_wolfx_cenc_eqlist": (
+        "fan_studio_cea",
+        "fan_studio_cenc",
+        "wolfx_china_cenc_eew",
+        "wolfx_china_cenc_earthquake",
+    ),
+    "http_wolfx_jma_eqlist": (
+        "p2p_main",
+        "wolfx_japan_jma_eew",
+        "wolfx_japan_jma_earthquake",
+    ),
+}
 
 
 class DisasterWarningService:
@@ -45,16 +83,42 @@ class DisasterWarningService:
             config.get("websocket_config", {}), self.message_logger
         )
         self.http_fetcher: HTTPDataFetcher | None = None
-        self.message_manager = MessagePushManager(config, context)
+        self.gap_backfiller: GapBackfiller | None = None
+        self.global_quake_client: GlobalQuakeClient | None = None
+        self.poll_scheduler = PollScheduler(config.get("http_poll_config", {}))
+        # WebSocket连接名称 -> 对应的HTTP轮询数据源
+        self._poll_source_by_connection = {
+            connection_name: poll_name
+            for poll_name, connections in EQLIST_RELATED_CONNECTIONS.items()
+            for connection_name in connections
+        }
+
+        # 事件状态日志：重启后恢复去重记录、推送记录与最终报标记
+        persistence_config = config.get("persistence_config", {})
+        self.journal: EventJournal | None = None
+        if persistence_config.get("enabled", True):
+            self.journal = EventJournal(
+                self.message_logger.data_dir / "journal",
+                flush_interval=persistence_config.get("flush_interval", 1.0),
+                compact_threshold=persistence_config.get("compact_threshold", 2000),
+                retention_days=persistence_config.get("retention_days", 7),
+            )
+        self.message_manager = MessagePushManager(config, context, self.journal)
 
-        # 数据处理器
+        # 数据处理器（高频逐条日志按采样率输出）
+        log_sampler = LogSampler(
+            config.get("performance_config", {}).get("log_sample_rate", 1)
+        )
         self.handlers = {
-            "fan_studio": FanStudioHandler(self.message_logger),
-            "p2p": P2PDataHandler(self.message_logger),
-            "wolfx": WolfxDataHandler(self.message_logger),
-            "global_quake": GlobalQuakeHandler(self.message_logger),
+            "fan_studio": FanStudioHandler(self.message_logger, log_sampler),
+            "p2p": P2PDataHandler(self.message_logger, log_sampler),
+            "wolfx": WolfxDataHandler(self.message_logger, log_sampler),
+            "global_quake": GlobalQuakeHandler(self.message_logger, log_sampler),
         }
 
+        # 解析执行器（大消息可转移到线程池/进程池解析）
+        self.parse_executor = ParseExecutor(config.get("performance_config", {}))
+
         # 连接配置
         self.connections = {}
         self.connection_tasks = []
@@ -70,6 +134,17 @@ class DisasterWarningService:
             # 初始化HTTP获取器
             self.http_fetcher = HTTPDataFetcher(self.config)
 
+            # 断线回补：地震列表相关连接从对应的地震列表补拉，P2P从历史接口补拉
+            self.gap_backfiller = GapBackfiller(
+                self.http_fetcher,
+                self._handle_backfill_envelope,
+                sources={**self._poll_source_by_connection, "p2p_main": P2P_HISTORY},
+                eqlist_urls=WOLFX_EQLIST_URLS,
+                enabled=self.config.get("websocket_config", {}).get(
+                    "gap_backfill_enabled", True
+                ),
+            )
+
             # 注册WebSocket消息处理器
             self._register_handlers()
 
@@ -83,103 +158,60 @@ class DisasterWarningService:
             raise
 
     def _register_handlers(self):
-        """注册消息处理器"""
-
-        # FAN Studio WebSocket处理器 - 修复source信息传递
-        async def fan_studio_handler(message, connection_name=None):
-            handler = self.handlers["fan_studio"]
-            # 关键修复：通过连接名称推断具体的数据源
-            if connection_name:
-                # 根据连接名称映射到具体的数据源
-                source_map = {
-                    "fan_studio_cenc": DataSource.FAN_STUDIO_CENC,
-                    "fan_studio_cwa": DataSource.FAN_STUDIO_CWA,
-                    "fan_studio_cea": DataSource.FAN_STUDIO_CEA,
-                    "fan_studio_usgs": DataSource.FAN_STUDIO_USGS,
-                    "fan_studio_weather": DataSource.FAN_STUDIO_WEATHER,
-                    "fan_studio_tsunami": DataSource.FAN_STUDIO_TSUNAMI,
-                }
-
-                # 获取目标数据源
-                target_source = source_map.get(connection_name)
-                if target_source:
-                    # 临时修改处理器的source，确保正确识别
-                    original_source = handler.source
-                    handler.source = target_source
-                    event = handler.parse_message(
-                        message, connection_name=connection_name
-                    )
-                    handler.source = original_source  # 恢复原始source
-                else:
-                    logger.warning(
-                        f"[灾害预警] FAN Studio处理器无法识别连接名称: {connection_name}"
-                    )
-                    event = handler.parse_message(
-                        message, connection_name=connection_name
-                    )
-            else:
-                logger.warning(
-                    "[灾害预警] FAN Studio处理器未收到连接名称，使用默认处理"
-                )
-                event = handler.parse_message(message)
+        """注册消息处理器 - 所有WebSocket连接共用同一个无状态分发函数"""
+        for handler_name in ("fan_studio", "p2p", "wolfx"):
+            self.ws_manager.register_handler(
+                handler_name, functools.partial(self._process_envelope, handler_name)
+            )
+        self.ws_manager.add_connection_listener(self._on_connection_state)
 
-            if event:
-                logger.debug(f"[灾害预警] FAN Studio处理器解析成功: {event.id}")
-                await self._handle_disaster_event(event)
-            else:
-                logger.debug("[灾害预警] FAN Studio处理器返回None，无有效事件")
-
-        self.ws_manager.register_handler("fan_studio", fan_studio_handler)
-
-        # P2P WebSocket处理器 - 修复source信息传递
-        async def p2p_handler(message, connection_name=None):
-            logger.debug(f"[灾害预警] P2P处理器收到消息，长度: {len(message)}")
-            handler = self.handlers["p2p"]
-            # P2P连接名称映射
-            if connection_name:
-                source_map = {
-                    "p2p_main": DataSource.P2P_EARTHQUAKE,
-                    "p2p_eew": DataSource.P2P_EEW,
-                }
-                original_source = handler.source
-                handler.source = source_map.get(connection_name, handler.source)
-                event = handler.parse_message(message)
-                handler.source = original_source
-            else:
-                event = handler.parse_message(message)
+    def _on_connection_state(
+        self, connection_name: str, connected: bool, outage: Outage | None
+    ):
+        """WebSocket断线期间的数据可能遗漏
 
-            if event:
-                logger.debug(f"[灾害预警] P2P处理器解析成功: {event.id}")
-                await self._handle_disaster_event(event)
-            else:
-                logger.debug("[灾害预警] P2P处理器返回None，无有效事件")
-
-        self.ws_manager.register_handler("p2p", p2p_handler)
-
-        # Wolfx WebSocket处理器 - 修复source信息传递
-        async def wolfx_handler(message, connection_name=None):
-            handler = self.handlers["wolfx"]
-            # Wolfx连接名称映射
-            if connection_name:
-                source_map = {
-                    "wolfx_japan_jma_eew": DataSource.WOLFX_JMA_EEW,
-                    "wolfx_china_cenc_eew": DataSource.WOLFX_CENC_EEW,
-                    "wolfx_taiwan_cwa_eew": DataSource.WOLFX_CWA_EEW,
-                    "wolfx_china_cenc_earthquake": DataSource.WOLFX_CENC_EEW,
-                    "wolfx_japan_jma_earthquake": DataSource.WOLFX_JMA_EEW,
-                }
-                original_source = handler.source
-                handler.source = source_map.get(connection_name, handler.source)
-                event = handler.parse_message(message)
-                handler.source = original_source
-            else:
-                event = handler.parse_message(message)
+        断线时提前轮询对应的地震列表；恢复时按断线区间回补，没有回补接口时同样提前轮询
+        """
+        if connected and self.gap_backfiller.schedule(connection_name, outage):
+            return
+        poll_name = self._poll_source_by_connection.get(connection_name)
+        if poll_name:
+            self.poll_scheduler.nudge(
+                poll_name, f"{connection_name} {'已恢复' if connected else '已断开'}"
+            )
 
-            if event:
-                logger.debug(f"[灾害预警] Wolfx处理器解析成功: {event.id}")
-                await self._handle_disaster_event(event)
+    async def _process_envelope(
+        self,
+        handler_name: str,
+        envelope: MessageEnvelope,
+        connection_name: str | None = None,
+    ) -> int:
+        """按连接解析消息并处理事件，返回产生的事件数
+
+        数据源显式传入处理器，不修改处理器状态
+        """
+        connection_name = connection_name or envelope.connection_name
+        source = CONNECTION_SOURCE_MAP.get(connection_name)
+        if source is None:
+            logger.warning(
+                f"[灾害预警] 未知连接名称，按消息内容识别数据源: {connection_name}"
+            )
 
-        self.ws_manager.register_handler("wolfx", wolfx_handler)
+        result = await self.parse_executor.parse(
+            handler_name, self.handlers[handler_name], envelope, source
+        )
+        # 地震列表等消息一次可能产生多个事件
+        events = result if isinstance(result, list) else [result] if result else []
+        for event in events:
+            event.receive_time = envelope.receive_time
+            logger.debug(f"[灾害预警] {connection_name} 解析成功: {event.id}")
+            await self._handle_disaster_event(event)
+
+        # 收到地震时余震可能接踵而至，提前轮询对应的地震列表
+        poll_name = self._poll_source_by_connection.get(connection_name)
+        if poll_name and any(isinstance(event.data, EarthquakeData) for event in events):
+            self.poll_scheduler.nudge(poll_name, f"{connection_name} 收到地震")
+        return len(events)
 
     def _configure_connections(self):
         """配置连接 - 适配新的细粒度数据源配置"""
@@ -275,6 +307,11 @@ class DisasterWarningService:
             self.running = True
             logger.info("[灾害预警] 正在启动灾害预警服务...")
 
+            # 启动预热：各数据源重放的旧事件与首份列表快照只记录不推送
+            self.message_manager.warm_start.begin(
+                set(self.connections) | set(WOLFX_EQLIST_URLS)
+            )
+
             # 启动WebSocket管理器
             await self.ws_manager.start()
 
@@ -331,12 +368,22 @@ class DisasterWarningService:
             else:
                 logger.info("[灾害预警] Global Quake未启用或配置无效，跳过连接")
 
-            # 启动定时HTTP数据获取
+            # 启动定时HTTP数据获取（整个服务期间复用同一个连接池会话）
+            await self.http_fetcher.start()
             await self._start_scheduled_http_fetch()
 
+            # 等待各数据源就绪后开放推送
+            task = asyncio.create_task(self._run_warm_start())
+            self.scheduled_tasks.append(task)
+
             # 启动清理任务
             await self._start_cleanup_task()
 
+            # 事件状态日志定时写入
+            if self.journal:
+                task = asyncio.create_task(self.journal.run())
+                self.scheduled_tasks.append(task)
+
             logger.info("[灾害预警] 灾害预警服务已启动")
 
         except Exception as e:
@@ -360,12 +407,22 @@ class DisasterWarningService:
             for task in self.scheduled_tasks:
                 task.cancel()
 
+            if self.gap_backfiller:
+                self.gap_backfiller.stop()
+
             # 停止WebSocket管理器
             await self.ws_manager.stop()
 
             # 关闭HTTP获取器
             if self.http_fetcher:
-                await self.http_fetcher.__aexit__(None, None, None)
+                await self.http_fetcher.close()
+
+            # 关闭解析执行器
+            self.parse_executor.shutdown()
+
+            # 写入剩余的事件状态变更
+            if self.journal:
+                await self.journal.close()
 
             logger.info("[灾害预警] 灾害预警服务已停止")
 
@@ -383,91 +440,116 @@ class DisasterWarningService:
                 logger.info(f"[灾害预警] 已启动WebSocket连接任务: {conn_name}")
 
     async def _start_global_quake_connection(self):
-        """启动Global Quake连接"""
+        """启动Global Quake连接监督任务"""
         try:
-            global_quake_config = self.config.get("data_sources", {}).get(
+            source_config = self.config.get("data_sources", {}).get(
                 "global_quake", {}
             )
-            logger.info(
-                f"[灾害预警] 创建Global Quake客户端 - 配置: {global_quake_config}, 消息记录器: {self.message_logger is not None}"
+            # 服务器地址与重连参数在global_quake_config中，
+            # 数据源配置里的primary_server/secondary_server为开关（旧配置中也可能是地址）
+            client_config = dict(self.config.get("global_quake_config", {}))
+            for key in ("primary_server", "secondary_server"):
+                if isinstance(source_config.get(key), str):
+                    client_config[key] = source_config[key]
+            client_config["secondary_enabled"] = (
+                source_config.get("secondary_server", False) is not False
             )
-            global_quake_client = GlobalQuakeClient(
-                global_quake_config, self.message_logger
+            logger.info(
+                f"[灾害预警] 创建Global Quake客户端 - 配置: {client_config}, 消息记录器: {self.message_logger is not None}"
             )
+            global_quake_client = GlobalQuakeClient(client_config, self.message_logger)
+            self.global_quake_client = global_quake_client
+            self.message_manager.warm_start.expect("global_quake")
 
             # 注册消息处理器
-            async def global_quake_handler(message):
-                handler = self.handlers["global_quake"]
-                event = handler.parse_message(message)
-                if event:
-                    await self._handle_disaster_event(event)
-
-            global_quake_client.register_handler(global_quake_handler)
+            global_quake_client.register_handler(
+                functools.partial(self._process_envelope, "global_quake")
+            )
 
-            # 连接并监听
-            if await global_quake_client.connect():
-                task = asyncio.create_task(global_quake_client.listen())
-                self.connection_tasks.append(task)
-                logger.info(
-                    f"[灾害预警] Global Quake连接已启动 (当前活跃的后台连接任务数量: {len(self.connection_tasks)})"
-                )
-            else:
-                logger.error("[灾害预警] Global Quake连接失败")
+            # 连接失败或断线后由监督任务负责重连与主备切换
+            task = asyncio.create_task(global_quake_client.run())
+            self.connection_tasks.append(task)
+            logger.info(
+                f"[灾害预警] Global Quake连接监督任务已启动 (当前活跃的后台连接任务数量: {len(self.connection_tasks)})"
+            )
 
         except Exception as e:
             logger.error(f"[灾害预警] 启动Global Quake连接失败: {e}")
 
     async def _start_scheduled_http_fetch(self):
-        """启动定时HTTP数据获取"""
+        """启动HTTP轮询调度 - 所有HTTP数据源由同一个调度循环轮询"""
+        for connection_name, url in WOLFX_EQLIST_URLS.items():
+            # 启动时立即拉取一次列表快照，作为启动预热的一部分
+            self.poll_scheduler.register(
+                connection_name,
+                functools.partial(self._poll_eqlist, connection_name, url),
+                initial_delay=0,
+            )
 
-        # 定时获取Wolfx的地震列表数据
-        async def fetch_wolfx_data():
-            while self.running:
-                try:
-                    await asyncio.sleep(300)  # 5分钟获取一次
-
-                    async with self.http_fetcher as fetcher:
-                        # 获取中国地震台网列表
-                        cenc_data = await fetcher.fetch_json(
-                            "https://api.wolfx.jp/cenc_eqlist.json"
-                        )
-                        if cenc_data:
-                            # 记录HTTP响应
-                            if self.message_logger:
-                                self.message_logger.log_http_response(
-                                    "https://api.wolfx.jp/cenc_eqlist.json",
-                                    cenc_data,
-                                    200,
-                                )
-
-                            handler = self.handlers["wolfx"]
-                            event = handler.parse_message(json.dumps(cenc_data))
-                            if event:
-                                await self._handle_disaster_event(event)
-
-                        # 获取日本气象厅地震列表
-                        jma_data = await fetcher.fetch_json(
-                            "https://api.wolfx.jp/jma_eqlist.json"
-                        )
-                        if jma_data:
-                            # 记录HTTP响应
-                            if self.message_logger:
-                                self.message_logger.log_http_response(
-                                    "https://api.wolfx.jp/jma_eqlist.json",
-                                    jma_data,
-                                    200,
-                                )
-
-                            handler = self.handlers["wolfx"]
-                            event = handler.parse_message(json.dumps(jma_data))
-                            if event:
-                                await self._handle_disaster_event(event)
+        task = asyncio.create_task(self.poll_scheduler.run())
+        self.scheduled_tasks.append(task)
 
-                except Exception as e:
-                    logger.error(f"[灾害预警] 定时HTTP数据获取失败: {e}")
+    async def _run_warm_start(self):
+        """启动预热 - 等待所有启用的数据源就绪（或超时）后开放推送"""
+        warm_start = self.message_manager.warm_start
+        while not warm_start.check():
+            for source in warm_start.pending:
+                if self._is_source_ready(source):
+                    warm_start.report(source)
+            await asyncio.sleep(_WARM_START_TICK)
+
+    def _is_source_ready(self, source: str) -> bool:
+        """数据源是否已就绪：连接后重放的消息或首份列表快照已处理完毕"""
+        poll_source = self.poll_scheduler.sources.get(source)
+        if poll_source is not None:
+            return poll_source.completed > 0
+
+        if source == "global_quake":
+            return bool(
+                self.global_quake_client and self.global_quake_client.writer
+            )
 
-        task = asyncio.create_task(fetch_wolfx_data())
-        self.scheduled_tasks.append(task)
+        activity = self.ws_manager.feed_activity.get(source)
+        if source not in self.ws_manager.connections or activity is None:
+            return False
+        # 上游通常在连接后立即重放最近的消息；不重放的连接（如P2P）等待一小段时间
+        if not activity.frames and (
+            time.monotonic() - activity.connected_at < _WARM_START_SETTLE
+        ):
+            return False
+        ingress_queue = self.ws_manager.ingress_queues.get(source)
+        return ingress_queue is None or ingress_queue.idle
+
+    async def _poll_eqlist(self, connection_name: str, url: str) -> str:
+        """轮询一次Wolfx地震列表，列表未变化时服务器返回304（None）"""
+        envelope = await self.http_fetcher.fetch_envelope(url, connection_name)
+        if envelope is None:
+            if self.http_fetcher.last_status.get(url) == 304:
+                return POLL_UNCHANGED
+            return POLL_FAILED
+
+        new_events = await self._handle_http_envelope(envelope)
+        return POLL_CHANGED if new_events else POLL_UNCHANGED
+
+    async def _handle_http_envelope(self, envelope: MessageEnvelope) -> int:
+        """处理HTTP获取的Wolfx数据，返回产生的事件数"""
+        try:
+            return await self._process_envelope("wolfx", envelope)
+        finally:
+            # 记录HTTP响应（解析之后记录，复用解码结果）
+            if self.message_logger:
+                self.message_logger.log_http_response(envelope.url, envelope, 200)
+
+    async def _handle_backfill_envelope(
+        self, handler_name: str, envelope: MessageEnvelope
+    ) -> int:
+        """处理回补获取的数据，返回产生的事件数"""
+        try:
+            return await self._process_envelope(handler_name, envelope)
+        finally:
+            # 解析之后记录，复用解码结果
+            if self.message_logger:
+                self.message_logger.log_http_response(envelope.url, envelope, 200)
 
     async def _start_cleanup_task(self):
         """启动清理任务"""
@@ -541,6 +623,26 @@ class DisasterWarningService:
             "active_connections": len(self.ws_manager.connections),
             "push_stats": self.message_manager.get_push_stats(),
             "data_sources": self._get_active_data_sources(),
+            "connection_states": self.ws_manager.get_connection_states(),
+            "feed_activity": self.ws_manager.get_feed_activity(),
+            "ingress_queues": self.ws_manager.get_queue_stats(),
+            "prefiltered_frames": self.ws_manager.get_frame_stats(),
+            "parse_stats": self.parse_executor.get_stats(),
+            "eqlist_diff": self.handlers["wolfx"].eqlist_differ.get_stats(),
+            "http_stats": self.http_fetcher.get_stats() if self.http_fetcher else {},
+            "http_polls": self.poll_scheduler.get_stats(),
+            "outages": self.ws_manager.get_outages(),
+            "warm_start": self.message_manager.warm_start.get_stats(),
+            "weather_alarms": self.message_manager.weather_alarms.get_stats(),
+            "journal": self.journal.get_stats() if self.journal else {},
+            "gap_backfill": (
+                self.gap_backfiller.get_stats() if self.gap_backfiller else {}
+            ),
+            "global_quake": (
+                self.global_quake_client.get_stats()
+                if self.global_quake_client
+                else {}
+            ),
         }
 
     def _get_active_data_sources(self) -> list[str]:
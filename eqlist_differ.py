@@ -0,0 +1,79 @@
+"""
+地震列表快照差分
+Wolfx的cenc_eqlist/jma_eqlist每次推送完整的最近地震列表（No1为最新），
+这里记录已见过的条目md5，只输出新增或更新的条目
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class _Snapshot:
+    """单个列表的上一份快照"""
+
+    list_hash: str | None
+    seen: set[str] = field(default_factory=set)
+
+
+class EqListDiffer:
+    """地震列表快照差分器（线程安全，可在解析线程池中调用）"""
+
+    def __init__(self):
+        self._snapshots: dict[str, _Snapshot] = {}
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.snapshots_total = 0
+        self.snapshots_unchanged = 0
+        self.entries_emitted = 0
+
+    def diff(self, list_key: str, data: dict[str, Any]) -> list[dict[str, Any]]:
+        """返回新增或更新的条目（按时间从旧到新）
+
+        - 列表哈希与上一份快照相同时直接跳过
+        - 某个列表的首份快照只输出最新一条，避免启动时推送整份历史列表
+        - 条目内容变化时md5随之变化，因此按新条目处理
+        """
+        entries = [
+            value
+            for key, value in data.items()
+            if key.startswith("No") and isinstance(value, dict)
+        ]
+        if not entries:
+            return []
+
+        # 优先使用列表整体的md5，没有时使用最新条目的md5
+        list_hash = data.get("md5") or entries[0].get("md5")
+
+        with self._lock:
+            self.snapshots_total += 1
+            snapshot = self._snapshots.get(list_key)
+            if snapshot is not None and list_hash and list_hash == snapshot.list_hash:
+                self.snapshots_unchanged += 1
+                return []
+
+            current = {entry.get("md5") for entry in entries if entry.get("md5")}
+            if snapshot is None:
+                changed = entries[:1]
+            else:
+                changed = [
+                    entry
+                    for entry in entries
+                    if entry.get("md5") and entry.get("md5") not in snapshot.seen
+                ]
+            # 只保留当前快照中的md5，内存占用与列表长度一致
+            self._snapshots[list_key] = _Snapshot(list_hash=list_hash, seen=current)
+            self.entries_emitted += len(changed)
+
+        changed.reverse()
+        return changed
+
+    def get_stats(self) -> dict[str, int]:
+        """获取差分统计"""
+        return {
+            "snapshots": self.snapshots_total,
+            "unchanged": self.snapshots_unchanged,
+            "emitted": self.entries_emitted,
+        }
@@ -4,12 +4,101 @@
 只推送最先获取到的数据源
 """
 
+import heapq
+import math
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable
 from datetime import datetime, timedelta
 from typing import Any
 
 from astrbot.api import logger
 
-from .models import DataSource, DisasterEvent, EarthquakeData
+from .event_journal import EventJournal
+from .latency_tracker import LatencyTracker
+from .models import (
+    DataSource,
+    DisasterEvent,
+    EarthquakeData,
+    TsunamiData,
+    WeatherAlarmData,
+)
+
+
+_EARTH_RADIUS_KM = 6371.0
+_KM_PER_DEGREE = 111.0
+# 高纬度地区经度方向网格很窄，按不低于该值的cos(纬度)计算需要搜索的经度网格数
+_MIN_COS_LATITUDE = 0.1
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """两点间的大圆距离（公里）"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * _EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class SpatialTemporalIndex:
+    """地震记录的时空网格索引
+
+    按距离容差划分经纬度网格、按时间窗口划分时间桶。查找时搜索相邻网格与相邻时间桶，
+    落在网格边界两侧的同一地震也能找到；每次查找只访问固定数量的网格，与记录总数无关
+    """
+
+    def __init__(self, cell_km: float, window: timedelta):
+        self.cell_degrees = max(cell_km, 0.1) / _KM_PER_DEGREE
+        self.lon_cells = math.ceil(360 / self.cell_degrees)
+        self.window_seconds = max(window.total_seconds(), 1.0)
+        self.cells: defaultdict[tuple[int, int, int], set[str]] = defaultdict(set)
+        # 记录 -> 所在网格
+        self.keys: dict[str, tuple[int, int, int]] = {}
+
+    def _cell(self, latitude: float, longitude: float, timestamp: datetime):
+        return (
+            math.floor(latitude / self.cell_degrees),
+            math.floor((longitude + 180) / self.cell_degrees) % self.lon_cells,
+            math.floor(timestamp.timestamp() / self.window_seconds),
+        )
+
+    def add(self, key: str, latitude: float, longitude: float, timestamp: datetime):
+        """加入或移动一条记录"""
+        cell = self._cell(latitude, longitude, timestamp)
+        if self.keys.get(key) == cell:
+            return
+        self.remove(key)
+        self.cells[cell].add(key)
+        self.keys[key] = cell
+
+    def remove(self, key: str):
+        cell = self.keys.pop(key, None)
+        if cell is None:
+            return
+        bucket = self.cells[cell]
+        bucket.discard(key)
+        if not bucket:
+            del self.cells[cell]
+
+    def candidates(self, latitude: float, longitude: float, timestamp: datetime):
+        """相邻网格（含时间桶前后各一个）中的所有记录"""
+        lat_cell, lon_cell, time_cell = self._cell(latitude, longitude, timestamp)
+        cos_latitude = max(math.cos(math.radians(latitude)), _MIN_COS_LATITUDE)
+        lon_span = min(math.ceil(1 / cos_latitude), self.lon_cells // 2)
+        for d_lat in (-1, 0, 1):
+            for d_lon in range(-lon_span, lon_span + 1):
+                for d_time in (-1, 0, 1):
+                    bucket = self.cells.get(
+                        (
+                            lat_cell + d_lat,
+                            (lon_cell + d_lon) % self.lon_cells,
+                            time_cell + d_time,
+                        )
+                    )
+                    if bucket:
+                        yield from bucket
 
 
 class EventDeduplicator:
@@ -20,6 +109,12 @@ class EventDeduplicator:
         time_window_minutes: int = 1,
         location_tolerance_km: float = 20.0,
         magnitude_tolerance: float = 0.5,
+        latency_tracker: LatencyTracker | None = None,
+        journal: EventJournal | None = None,
+        retention_minutes: int = 65,
+        max_entries: int = 10000,
+        clock: Callable[[], datetime] = datetime.now,
+        max_bulletins: int = 10000,
     ):
         """
         初始化去重器
@@ -28,6 +123,13 @@ class EventDeduplicator:
             time_window_minutes: 时间窗口（分钟），默认1分钟
             location_tolerance_km: 位置容差（公里），默认20公里
             magnitude_tolerance: 震级容差，默认0.5级
+            latency_tracker: 数据源首达延迟统计（可选）
+            journal: 事件状态日志（可选），去重记录的变更写入日志以便重启后恢复
+            retention_minutes: 去重记录保留时间（分钟），默认65分钟
+                （超过1小时的事件会被推送前的过时检查过滤，再留出时间窗口的余量）
+            max_entries: 去重记录数量上限，超出时淘汰最早过期的记录
+            clock: 当前时间来源，默认datetime.now
+            max_bulletins: 海啸/气象预警状态记录数量上限，超出时淘汰最久未更新的记录
         """
         self.time_window = timedelta(minutes=time_window_minutes)
         self.location_tolerance = location_tolerance_km
@@ -35,32 +137,69 @@ class EventDeduplicator:
 
         # 记录最近的事件：事件指纹 -> 首次接收信息
         self.recent_events: dict[str, dict] = {}
+        # 按位置与时间索引去重记录，查找网格边界另一侧的相似事件
+        self.index = SpatialTemporalIndex(location_tolerance_km, self.time_window)
+        self.latency_tracker = latency_tracker
+        self.journal = journal
+
+        self.retention = timedelta(minutes=retention_minutes)
+        self.max_entries = max(1, max_entries)
+        self.clock = clock
+        # 过期时间最小堆：(过期时间戳, 指纹)。记录更新后旧条目仍留在堆中，出堆时按过期时间识别并跳过
+        self._expiry_heap: list[tuple[float, str]] = []
+        self.expired_count = 0
+        self.evicted_count = 0
+
+        # 海啸/气象预警：预警标识 -> 最近一次推送的状态签名（按更新顺序排列，超出上限淘汰最旧的）
+        self.bulletin_states: OrderedDict[str, int] = OrderedDict()
+        self.max_bulletins = max(1, max_bulletins)
+        self.bulletin_resends = 0
+        self.bulletin_changes = 0
+
+    def restore(self, entries: dict[str, dict]):
+        """恢复持久化的去重记录"""
+        for fingerprint, entry in entries.items():
+            self._track(fingerprint, entry)
+        self.cleanup_old_events()
 
     def should_push_event(self, event: DisasterEvent) -> bool:
         """判断是否应该推送事件 - 只推送首次接收的"""
+        if isinstance(event.data, (TsunamiData, WeatherAlarmData)):
+            return self._should_push_bulletin(event)
         if not isinstance(event.data, EarthquakeData):
             logger.debug(
-                f"[灾害预警] 非地震事件，直接允许推送: {event.disaster_type.value}"
+                "[灾害预警] 非地震事件，直接允许推送: %s", event.disaster_type.value
             )
-            return True  # 非地震事件直接推送
+            return True  # 其他事件直接推送
 
         earthquake = event.data
-
-        # 生成事件指纹
-        event_fingerprint = self._generate_event_fingerprint(earthquake)
+        self.cleanup_old_events()
 
         # 关键修复：如果地震时间解析失败，使用当前时间作为后备
         # 但要去重逻辑仍然有效
-        current_time = earthquake.shock_time if earthquake.shock_time is not None else datetime.now()
+        current_time = earthquake.shock_time if earthquake.shock_time is not None else self.clock()
+
+        # 生成事件指纹；附近已有相似事件时沿用其指纹
+        event_fingerprint = self._generate_event_fingerprint(earthquake)
+        if event_fingerprint != "unknown_location":
+            event_fingerprint = (
+                self._find_similar(earthquake, current_time) or event_fingerprint
+            )
 
         logger.debug(
-            f"[灾害预警] 检查事件去重: {event.source.value}, 震级: {earthquake.magnitude}, 位置: {earthquake.place_name}"
-        )
-        logger.debug(f"[灾害预警] 事件指纹: {event_fingerprint}")
-        logger.debug(
-            f"[灾害预警] 当前时间: {current_time}, 时间窗口: {self.time_window}"
+            "[灾害预警] 检查事件去重: %s, 震级: %s, 位置: %s, 指纹: %s, 当前时间: %s, 时间窗口: %s",
+            event.source.value,
+            earthquake.magnitude,
+            earthquake.place_name,
+            event_fingerprint,
+            current_time,
+            self.time_window,
         )
 
+        # 同一指纹即同一地震，记录各数据源的到达顺序（重复事件也计入）
+        if self.latency_tracker and event_fingerprint != "unknown_location":
+            self.latency_tracker.record_arrival(event_fingerprint, event)
+
         # 检查是否已有相似事件
         if event_fingerprint in self.recent_events:
             existing_event = self.recent_events[event_fingerprint]
@@ -70,38 +209,43 @@ class EventDeduplicator:
                 (current_time - existing_event["timestamp"]).total_seconds() / 60
             )
             logger.debug(
-                f"[灾害预警] 发现相似事件，时间差: {time_diff}分钟, 时间窗口: {self.time_window.total_seconds() / 60}分钟"
+                "[灾害预警] 发现相似事件，时间差: %s分钟, 时间窗口: %s分钟",
+                time_diff,
+                self.time_window.total_seconds() / 60,
             )
 
             if time_diff <= self.time_window.total_seconds() / 60:
                 # 检查是否允许状态升级或报数更新
                 if self._should_allow_update(earthquake, existing_event):
                     logger.info(
-                        f"[灾害预警] 状态升级/报数更新: {event.source.value} -> {existing_event['source']}"
+                        "[灾害预警] 状态升级/报数更新: %s -> %s",
+                        event.source.value,
+                        existing_event["source"],
                     )
                     # 更新记录但允许推送
-                    self.recent_events[event_fingerprint] = {
-                        "timestamp": current_time,
-                        "source": event.source.value,
-                        "latitude": earthquake.latitude or 0,
-                        "longitude": earthquake.longitude or 0,
-                        "magnitude": earthquake.magnitude or 0,
-                        "info_type": earthquake.info_type or "",
-                        "updates": getattr(earthquake, "updates", 1),
-                        "is_final": getattr(earthquake, "is_final", False),
-                    }
+                    self._remember(event_fingerprint, event, current_time)
                     return True
                 else:
                     logger.info(
-                        f"[灾害预警] 跳过重复事件: {event.source.value} - {existing_event['source']} 已推送相似事件"
+                        "[灾害预警] 跳过重复事件: %s - %s 已推送相似事件",
+                        event.source.value,
+                        existing_event["source"],
                     )
                     return False
             else:
                 logger.debug("[灾害预警] 相似事件已过期，允许推送")
 
         # 新事件或过期事件，记录并允许推送
-        self.recent_events[event_fingerprint] = {
-            "timestamp": current_time,
+        self._remember(event_fingerprint, event, current_time)
+
+        logger.info("[灾害预警] 允许推送新事件: %s", event.source.value)
+        return True
+
+    def _remember(self, fingerprint: str, event: DisasterEvent, timestamp: datetime):
+        """记录指纹对应的最新事件信息"""
+        earthquake = event.data
+        entry = {
+            "timestamp": timestamp,
             "source": event.source.value,
             "latitude": earthquake.latitude or 0,
             "longitude": earthquake.longitude or 0,
@@ -110,10 +254,122 @@ class EventDeduplicator:
             "updates": getattr(earthquake, "updates", 1),
             "is_final": getattr(earthquake, "is_final", False),
         }
+        self._track(fingerprint, entry)
+        if self.journal:
+            self.journal.record_dedup(fingerprint, entry)
+
+    def _should_push_bulletin(self, event: DisasterEvent) -> bool:
+        """海啸/气象预警：同一预警状态未变化的重发直接跳过，升级、降级、解除、区域变化照常推送。
+        这里只检查，预警状态在通过推送条件后由record_event记录"""
+        key, state = self._bulletin_state(event.data)
+        if self.bulletin_states.get(key) == state:
+            self.bulletin_states.move_to_end(key)
+            self.bulletin_resends += 1
+            logger.info("[灾害预警] 跳过重复预警: %s %s", event.source.value, key)
+            return False
+        return True
 
-        logger.info(f"[灾害预警] 允许推送新事件: {event.source.value}")
+    def _record_bulletin(self, event: DisasterEvent):
+        key, state = self._bulletin_state(event.data)
+        previous = self.bulletin_states.get(key)
+        if previous == state:
+            self.bulletin_states.move_to_end(key)
+            return
+
+        if previous is not None:
+            self.bulletin_changes += 1
+            logger.info("[灾害预警] 预警状态更新: %s %s", event.source.value, key)
+        self.bulletin_states[key] = state
+        self.bulletin_states.move_to_end(key)
+        if len(self.bulletin_states) > self.max_bulletins:
+            self.bulletin_states.popitem(last=False)
+
+    @staticmethod
+    def _bulletin_state(data: TsunamiData | WeatherAlarmData) -> tuple[str, int]:
+        """预警标识与状态签名"""
+        if isinstance(data, TsunamiData):
+            # FAN Studio的code为事件编号；P2P的code为消息类型552，全国的津波予報视为同一预警
+            key = f"{data.source.value}:tsunami:{data.code or data.id}"
+            areas = frozenset(
+                (
+                    forecast.get("name", ""),
+                    forecast.get("grade") or forecast.get("warningLevel") or "",
+                )
+                for forecast in data.forecasts
+            )
+            state = (
+                data.level,
+                data.title,
+                data.subtitle,
+                bool(data.raw_data.get("cancelled", False)),
+                areas,
+            )
+        else:
+            key = f"{data.source.value}:weather:{data.id}"
+            state = (data.type, data.title, data.headline)
+        return key, hash(state)
+
+    def _expires_at(self, entry: dict) -> float:
+        return (entry["timestamp"] + self.retention).timestamp()
+
+    def _track(self, fingerprint: str, entry: dict):
+        """保存记录并加入索引与过期堆，超出数量上限时淘汰最早过期的记录"""
+        self.recent_events[fingerprint] = entry
+        if fingerprint != "unknown_location":
+            self.index.add(
+                fingerprint, entry["latitude"], entry["longitude"], entry["timestamp"]
+            )
+        heapq.heappush(self._expiry_heap, (self._expires_at(entry), fingerprint))
+
+        # 堆中过时的条目过多时重建，堆大小不超过记录数的2倍
+        if len(self._expiry_heap) > 2 * len(self.recent_events) + 64:
+            self._expiry_heap = [
+                (self._expires_at(event_info), key)
+                for key, event_info in self.recent_events.items()
+            ]
+            heapq.heapify(self._expiry_heap)
+
+        while len(self.recent_events) > self.max_entries:
+            expires_at, key = heapq.heappop(self._expiry_heap)
+            if self._discard(key, expires_at):
+                self.evicted_count += 1
+
+    def _discard(self, fingerprint: str, expires_at: float) -> bool:
+        """删除堆条目对应的记录；记录已更新或已删除时返回False"""
+        entry = self.recent_events.get(fingerprint)
+        if entry is None or self._expires_at(entry) != expires_at:
+            return False
+        del self.recent_events[fingerprint]
+        self.index.remove(fingerprint)
         return True
 
+    def _find_similar(
+        self, earthquake: EarthquakeData, timestamp: datetime
+    ) -> str | None:
+        """在相邻网格中查找位置、时间与震级都在容差内的事件，返回最近的一个的指纹"""
+        magnitude = earthquake.magnitude or 0
+        window = self.time_window.total_seconds()
+        best_fingerprint = None
+        best_distance = math.inf
+        for fingerprint in self.index.candidates(
+            earthquake.latitude, earthquake.longitude, timestamp
+        ):
+            existing = self.recent_events[fingerprint]
+            if abs((timestamp - existing["timestamp"]).total_seconds()) > window:
+                continue
+            if abs(magnitude - existing["magnitude"]) > self.magnitude_tolerance:
+                continue
+            distance = haversine_km(
+                earthquake.latitude,
+                earthquake.longitude,
+                existing["latitude"],
+                existing["longitude"],
+            )
+            if distance <= self.location_tolerance and distance < best_distance:
+                best_fingerprint = fingerprint
+                best_distance = distance
+        return best_fingerprint
+
     def _generate_event_fingerprint(self, earthquake: EarthquakeData) -> str:
         """生成事件指纹 - 基于地理位置和震级的简化指纹"""
         if not earthquake.latitude or not earthquake.longitude:
@@ -139,26 +395,31 @@ class EventDeduplicator:
         else:
             # 如果时间解析失败，使用当前时间但标记为特殊值
             # 这样同一批无时间的事件仍然可以被正确去重
-            time_minute = datetime.now().replace(second=0, microsecond=0)
+            time_minute = self.clock().replace(second=0, microsecond=0)
 
         return f"{lat_grid:.3f},{lon_grid:.3f},{mag_grid:.1f},{time_minute.strftime('%Y%m%d%H%M')}"
 
     def cleanup_old_events(self):
-        """清理过期事件"""
-        cutoff_time = datetime.now() - self.time_window * 2  # 保留2倍时间窗口
-
-        old_fingerprints = []
-        for fingerprint, event_info in self.recent_events.items():
-            if event_info["timestamp"] < cutoff_time:
-                old_fingerprints.append(fingerprint)
-
-        for fingerprint in old_fingerprints:
-            del self.recent_events[fingerprint]
+        """清理过期事件：按过期时间从堆顶依次出堆，每条记录只处理一次"""
+        now = self.clock().timestamp()
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, fingerprint = heapq.heappop(heap)
+            if self._discard(fingerprint, expires_at):
+                self.expired_count += 1
 
     def get_deduplication_stats(self) -> dict[str, Any]:
         """获取去重统计"""
         return {
             "recent_events_count": len(self.recent_events),
+            "max_entries": self.max_entries,
+            "expiry_heap_size": len(self._expiry_heap),
+            "expired_count": self.expired_count,
+            "evicted_count": self.evicted_count,
+            "retention_minutes": self.retention.total_seconds() / 60,
+            "bulletins_count": len(self.bulletin_states),
+            "bulletin_resends": self.bulletin_resends,
+            "bulletin_changes": self.bulletin_changes,
             "time_window_minutes": self.time_window.total_seconds() / 60,
             "location_tolerance_km": self.location_tolerance,
             "magnitude_tolerance": self.magnitude_tolerance,
@@ -216,8 +477,7 @@ class EventDeduplicator:
 
     def record_event(self, event: DisasterEvent):
         """记录事件（用于消息管理器调用）"""
-        # 这个方法是为了兼容消息管理器的调用
-        # 这里不需要额外操作，实际的去重逻辑已经在 should_push_event 中处理
-        if event and isinstance(event.data, EarthquakeData):
-            # 可以在这里添加额外的记录逻辑，如果需要的话
-            pass
+        # 地震的去重记录已在 should_push_event 中处理；
+        # 海啸/气象预警在通过推送条件后才记录状态，被过滤的预警不会使之后同一状态的推送被当作重发跳过
+        if event and isinstance(event.data, (TsunamiData, WeatherAlarmData)):
+            self._record_bulletin(event)
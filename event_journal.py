@@ -0,0 +1,368 @@
+"""
+事件状态日志
+去重记录、推送记录和最终报标记原本只在内存中，重启后丢失会导致重复推送和报数重新计数。
+这里把每次变更追加到JSONL日志（按周期批量写入并fsync），日志较长时压缩为快照：
+- events.jsonl：追加写入的变更记录，每条带递增序号
+- snapshot.json：压缩时的完整状态及其包含的最后序号，重放时跳过序号不大于它的记录
+  （压缩写完快照、尚未清空日志时崩溃，重放也不会重复计入）
+超过保留期的记录在重放和压缩时丢弃
+"""
+
+import asyncio
+import gc
+import os
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from astrbot.api import logger
+
+from . import json_codec
+
+_JOURNAL_FILE = "events.jsonl"
+_SNAPSHOT_FILE = "snapshot.json"
+_SNAPSHOT_VERSION = 1
+# 日志中最早的未压缩记录超过该时间（秒）后压缩，空闲时日志也不会无限积累
+_COMPACT_MAX_AGE = 3600.0
+
+# 记录类型
+_KIND_DEDUP = "d"  # 去重指纹
+_KIND_PUSH = "p"  # 推送记录
+_KIND_FINAL = "f"  # 最终报标记
+_KIND_FINAL_CLEAR = "fc"  # 清空最终报标记
+
+
+def _encode(entry: dict[str, Any]) -> dict[str, Any]:
+    """记录中的timestamp转为ISO格式字符串"""
+    timestamp = entry.get("timestamp")
+    if isinstance(timestamp, datetime):
+        return {**entry, "timestamp": timestamp.isoformat()}
+    return entry
+
+
+def _snapshot_push(records: list[dict[str, Any]], cutoff: datetime) -> list[dict[str, Any]]:
+    """快照中的推送记录：丢弃过期记录；恢复关联时只用到最后一次推送时的震源估计，
+    其余记录不再重复保存，缩小快照以加快重放"""
+    kept = [
+        _encode(record)
+        for record in records
+        if record.get("timestamp", cutoff) >= cutoff
+    ]
+    last = max(
+        (index for index, record in enumerate(kept) if record.get("hypocenter")),
+        default=None,
+    )
+    return [
+        record
+        if index == last or "hypocenter" not in record
+        else {key: value for key, value in record.items() if key != "hypocenter"}
+        for index, record in enumerate(kept)
+    ]
+
+
+def _decode(entry: dict[str, Any]) -> dict[str, Any]:
+    timestamp = entry.get("timestamp")
+    if isinstance(timestamp, str):
+        entry["timestamp"] = datetime.fromisoformat(timestamp)
+    return entry
+
+
+class JournalState:
+    """重放得到的状态"""
+
+    def __init__(self):
+        self.dedup: dict[str, dict[str, Any]] = {}
+        self.push: defaultdict[str, list[dict[str, Any]]] = defaultdict(list)
+        self.final: set[str] = set()
+
+    def apply(self, record: dict[str, Any]):
+        kind = record.get("k")
+        if kind == _KIND_DEDUP:
+            self.dedup[record["fp"]] = record["e"]
+        elif kind == _KIND_PUSH:
+            self.push[record["id"]].append(record["r"])
+        elif kind == _KIND_FINAL:
+            self.final.add(record["id"])
+        elif kind == _KIND_FINAL_CLEAR:
+            self.final.clear()
+
+    def prune(self, cutoff: datetime):
+        """丢弃早于cutoff的去重与推送记录，同时把时间字段转回datetime"""
+        self.dedup = {
+            fingerprint: entry
+            for fingerprint, entry in self.dedup.items()
+            if _decode(entry).get("timestamp", cutoff) >= cutoff
+        }
+        push = defaultdict(list)
+        for event_id, records in self.push.items():
+            kept = [
+                record
+                for record in records
+                if _decode(record).get("timestamp", cutoff) >= cutoff
+            ]
+            if kept:
+                push[event_id] = kept
+        self.push = push
+
+
+class EventJournal:
+    """追加写入的事件状态日志"""
+
+    def __init__(
+        self,
+        directory: Path,
+        flush_interval: float = 1.0,
+        compact_threshold: int = 2000,
+        retention_days: int = 7,
+    ):
+        self.directory = Path(directory)
+        self.journal_path = self.directory / _JOURNAL_FILE
+        self.snapshot_path = self.directory / _SNAPSHOT_FILE
+        self.flush_interval = max(0.1, flush_interval)
+        self.compact_threshold = max(1, compact_threshold)
+        self.retention = timedelta(days=retention_days)
+
+        self.seq = 0
+        self._buffer: list[str] = []
+        # 写入与压缩互斥，避免压缩清空日志时另一次写入正在进行
+        self._lock = asyncio.Lock()
+        # 日志中（含缓冲区）尚未压缩的记录数，及其中最早一条的写入时间（单调时钟）
+        self._journal_records = 0
+        self._journal_since: float | None = None
+        # 压缩时获取当前完整状态：返回(去重记录, 推送记录, 最终报标记)
+        self._snapshot_provider: Callable[[], tuple[dict, dict, set]] | None = None
+
+        # 统计信息
+        self.records = 0
+        self.flushes = 0
+        self.compactions = 0
+        self.replayed = 0
+        self.replay_ms = 0.0
+        self.write_errors = 0
+
+    def set_snapshot_provider(self, provider: Callable[[], tuple[dict, dict, set]]):
+        self._snapshot_provider = provider
+
+    # ---- 重放 ----
+
+    def load(self) -> JournalState:
+        """读取快照并重放日志"""
+        started = time.perf_counter()
+        # 解码数万个小对象期间循环垃圾回收会反复扫描新对象（占重放耗时约两成且抖动大），
+        # 重放不产生循环引用，期间暂停
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            state = self._replay()
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        self.replay_ms = (time.perf_counter() - started) * 1000
+        logger.info(
+            f"[灾害预警] 事件状态已恢复：去重记录 {len(state.dedup)} 条，推送记录 {len(state.push)} 个事件，"
+            f"重放日志 {self.replayed} 条，耗时 {self.replay_ms:.1f} 毫秒"
+        )
+        return state
+
+    def _replay(self) -> JournalState:
+        state = JournalState()
+        snapshot_seq = 0
+        try:
+            if self.snapshot_path.exists():
+                snapshot = json_codec.loads(self.snapshot_path.read_bytes())
+                if snapshot.get("version") == _SNAPSHOT_VERSION:
+                    snapshot_seq = snapshot.get("seq", 0)
+                    state.dedup = snapshot.get("dedup", {})
+                    state.push.update(snapshot.get("push", {}))
+                    state.final = set(snapshot.get("final", []))
+        except (OSError, *json_codec.JSONDecodeError) as e:
+            logger.error(f"[灾害预警] 读取事件状态快照失败，仅重放日志: {e}")
+
+        # 序号不大于已应用序号的记录已包含在快照中，或是写入失败重试时重复写入的记录
+        self.seq = snapshot_seq
+        for record in self._read_journal():
+            seq = record.get("n", 0)
+            if seq > self.seq:
+                state.apply(record)
+                self.replayed += 1
+                self.seq = seq
+        self._journal_records = self.replayed
+        self._journal_since = time.monotonic() if self.replayed else None
+
+        state.prune(datetime.now() - self.retention)
+        return state
+
+    def _read_journal(self) -> list[dict[str, Any]]:
+        try:
+            raw = self.journal_path.read_bytes()
+        except FileNotFoundError:
+            return []
+        except OSError as e:
+            logger.error(f"[灾害预警] 读取事件状态日志失败: {e}")
+            return []
+
+        # 忽略空行（如手动编辑或截断留下的），否则整体解码会因多余的逗号失败
+        lines = [line for line in raw.splitlines() if line.strip()]
+        if not lines:
+            return []
+        try:
+            # 整体作为一个数组解码，比逐行解码快得多
+            return json_codec.loads(b"[" + b",".join(lines) + b"]")
+        except json_codec.JSONDecodeError:
+            pass
+
+        # 崩溃时最后一行可能只写了一半，逐行解码并跳过损坏的行
+        records = []
+        for line in lines:
+            try:
+                records.append(json_codec.loads(line))
+            except json_codec.JSONDecodeError:
+                logger.warning("[灾害预警] 跳过损坏的事件状态日志记录")
+        return records
+
+    # ---- 写入 ----
+
+    def _append(self, record: dict[str, Any]):
+        self.seq += 1
+        record["n"] = self.seq
+        if self._journal_since is None:
+            self._journal_since = time.monotonic()
+        self._buffer.append(json_codec.dumps(record))
+        self._journal_records += 1
+        self.records += 1
+
+    def record_dedup(self, fingerprint: str, entry: dict[str, Any]):
+        self._append({"k": _KIND_DEDUP, "fp": fingerprint, "e": _encode(entry)})
+
+    def record_push(self, event_id: str, record: dict[str, Any]):
+        self._append({"k": _KIND_PUSH, "id": event_id, "r": _encode(record)})
+
+    def record_final(self, event_id: str):
+        self._append({"k": _KIND_FINAL, "id": event_id})
+
+    def record_final_clear(self):
+        self._append({"k": _KIND_FINAL_CLEAR})
+
+    async def run(self):
+        """周期性批量写入并fsync，日志过长或过旧时压缩"""
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+                if self.should_compact():
+                    await self.compact()
+            except Exception as e:
+                logger.error(f"[灾害预警] 事件状态日志写入任务出错: {e}")
+
+    def should_compact(self) -> bool:
+        """日志记录数达到压缩阈值，或最早的未压缩记录超过_COMPACT_MAX_AGE时压缩，
+        使重放的日志长度有上限"""
+        if self._journal_records >= self.compact_threshold:
+            return True
+        return (
+            self._journal_since is not None
+            and time.monotonic() - self._journal_since >= _COMPACT_MAX_AGE
+        )
+
+    async def flush(self):
+        """把缓冲区写入日志并fsync"""
+        async with self._lock:
+            await self._flush()
+
+    async def _flush(self):
+        if not self._buffer:
+            return
+        lines, self._buffer = self._buffer, []
+        try:
+            await asyncio.to_thread(self._write_lines, lines)
+            self.flushes += 1
+        except OSError as e:
+            self.write_errors += 1
+            # 写入失败时放回缓冲区，下个周期重试
+            self._buffer[:0] = lines
+            logger.error(f"[灾害预警] 写入事件状态日志失败: {e}")
+
+    def _write_lines(self, lines: list[str]):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def compact(self):
+        """把当前完整状态写入快照并清空日志"""
+        if self._snapshot_provider is None:
+            return
+        async with self._lock:
+            await self._flush()
+            if self._buffer:
+                return  # 写入失败，下次再压缩
+            await self._compact()
+
+    async def _compact(self):
+        dedup, push, final = self._snapshot_provider()
+        cutoff = datetime.now() - self.retention
+        snapshot = {
+            "version": _SNAPSHOT_VERSION,
+            "seq": self.seq,
+            "dedup": {
+                fingerprint: _encode(entry)
+                for fingerprint, entry in dedup.items()
+                if entry.get("timestamp", cutoff) >= cutoff
+            },
+            "push": {
+                event_id: kept
+                for event_id, records in push.items()
+                if (kept := _snapshot_push(records, cutoff))
+            },
+            "final": sorted(final),
+        }
+        compacted_records = self._journal_records
+        try:
+            await asyncio.to_thread(self._write_snapshot, snapshot)
+        except OSError as e:
+            self.write_errors += 1
+            logger.error(f"[灾害预警] 压缩事件状态日志失败: {e}")
+            return
+        # 快照写入期间新增的记录仍在缓冲区中，随后写入清空后的日志
+        self._journal_records -= compacted_records
+        self._journal_since = time.monotonic() if self._journal_records else None
+        self.compactions += 1
+
+    def _write_snapshot(self, snapshot: dict[str, Any]):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temp_path = self.snapshot_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(json_codec.dumps(snapshot))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        # 快照已落盘，日志中的记录序号都不大于快照序号，可以清空
+        with open(self.journal_path, "w", encoding="utf-8") as f:
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def close(self):
+        """停止时写入剩余记录"""
+        await self.flush()
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取日志统计"""
+        try:
+            journal_bytes = self.journal_path.stat().st_size
+        except OSError:
+            journal_bytes = 0
+        return {
+            "records": self.records,
+            "pending": len(self._buffer),
+            "flushes": self.flushes,
+            "compactions": self.compactions,
+            "replayed": self.replayed,
+            "replay_ms": self.replay_ms,
+            "journal_bytes": journal_bytes,
+            "write_errors": self.write_errors,
+        }
@@ -0,0 +1,120 @@
+"""
+入站帧预分类器
+在完整JSON解码之前，按数据源规则识别心跳帧和无需处理的帧，
+这些帧只计数，不记录、不解析、不分发
+"""
+
+import re
+from collections import defaultdict
+
+# 心跳类字段位于顶层对象开头，只扫描帧头部
+_SCAN_PREFIX = 256
+
+# P2P地震情報中不处理的code
+# 554: 緊急地震速報 発表検出, 555: 各地域ピア数, 561: 地震感知情報, 9611: 地震感知情報 評価結果
+P2P_IGNORED_CODES = frozenset({554, 555, 561, 9611})
+
+_P2P_CODE_PATTERN = re.compile(r'"code"\s*:\s*(\d+)')
+_HEARTBEAT_PATTERN = re.compile(r'"type"\s*:\s*"(heartbeat|ping|pong)"')
+
+_P2P_CODE_PATTERN_BYTES = re.compile(rb'"code"\s*:\s*(\d+)')
+_HEARTBEAT_PATTERN_BYTES = re.compile(rb'"type"\s*:\s*"(heartbeat|ping|pong)"')
+
+# Global Quake心跳包，如 "HeartbeatPacket"、"globalquake.core.HeartbeatPacket"
+_GQ_KEEPALIVE_PATTERN = re.compile(
+    r'"(?:type|packet)"\s*:\s*"(?:[\w.]*\.)?(?:heartbeat|keepalive|ping)(?:packet)?"',
+    re.IGNORECASE,
+)
+_GQ_KEEPALIVE_PATTERN_BYTES = re.compile(
+    _GQ_KEEPALIVE_PATTERN.pattern.encode(), re.IGNORECASE
+)
+
+
+def _classify_heartbeat(frame: str | bytes) -> str | None:
+    pattern = (
+        _HEARTBEAT_PATTERN_BYTES if isinstance(frame, bytes) else _HEARTBEAT_PATTERN
+    )
+    if pattern.search(frame, 0, _SCAN_PREFIX):
+        return "heartbeat"
+    return None
+
+
+def _classify_p2p(frame: str | bytes) -> str | None:
+    pattern = _P2P_CODE_PATTERN_BYTES if isinstance(frame, bytes) else _P2P_CODE_PATTERN
+    # P2P的顶层键按字母序排列：551的"code"紧跟"_id"，
+    # 555/9611等帧的"code"排在很长的"areas"/"area_confidences"之后，头部找不到时扫描整帧
+    # （P2P消息的嵌套对象中没有名为"code"的字段）
+    match = pattern.search(frame, 0, _SCAN_PREFIX) or pattern.search(frame)
+    if match and int(match.group(1)) in P2P_IGNORED_CODES:
+        return f"p2p_{int(match.group(1))}"
+    return None
+
+
+def _classify_gq_keepalive(frame: str | bytes) -> str | None:
+    pattern = (
+        _GQ_KEEPALIVE_PATTERN_BYTES
+        if isinstance(frame, bytes)
+        else _GQ_KEEPALIVE_PATTERN
+    )
+    if pattern.search(frame, 0, _SCAN_PREFIX):
+        return "keepalive"
+    return None
+
+
+# 连接名称前缀 -> 分类规则
+FEED_RULES = {
+    "p2p": (_classify_p2p,),
+    "fan_studio": (_classify_heartbeat,),
+    "wolfx": (_classify_heartbeat,),
+    "global_quake": (_classify_gq_keepalive,),
+}
+
+
+class FrameClassifier:
+    """按连接选择规则的帧分类器"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._rules_cache: dict[str, tuple] = {}
+        self.counts: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def _rules_for(self, connection_name: str) -> tuple:
+        rules = self._rules_cache.get(connection_name)
+        if rules is None:
+            rules = ()
+            for prefix, feed_rules in FEED_RULES.items():
+                if connection_name.startswith(prefix):
+                    rules = feed_rules
+                    break
+            self._rules_cache[connection_name] = rules
+        return rules
+
+    def label(self, connection_name: str, frame: str | bytes) -> str | None:
+        """返回心跳类帧的类别，数据帧返回None；不受enabled影响，不计数"""
+        if not frame:
+            return None
+
+        for rule in self._rules_for(connection_name):
+            label = rule(frame)
+            if label:
+                return label
+        return None
+
+    def record(self, connection_name: str, label: str):
+        """记录一个被过滤的帧"""
+        self.counts[connection_name][label] += 1
+
+    def classify(self, connection_name: str, frame: str | bytes) -> str | None:
+        """返回可丢弃帧的类别（并计数），需要正常处理时返回None"""
+        if not self.enabled:
+            return None
+
+        label = self.label(connection_name, frame)
+        if label:
+            self.record(connection_name, label)
+        return label
+
+    def get_stats(self) -> dict[str, dict[str, int]]:
+        """获取每个连接被过滤的帧数"""
+        return {name: dict(labels) for name, labels in self.counts.items()}
+
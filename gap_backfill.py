@@ -0,0 +1,169 @@
+"""
+断线回补
+WebSocket没有重放机制，断线期间发布的消息会丢失。
+连接恢复后按断线区间从对应的HTTP历史接口补拉：
+- CENC/JMA相关连接：Wolfx地震列表（由地震列表差分器输出尚未见过的条目）
+- P2P：/v2/history中断线期间发布的地震情報与津波予報
+补拉的事件与实时事件走同一处理流程，经过去重和过时事件过滤
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from astrbot.api import logger
+
+from .models import MessageEnvelope
+from .websocket_manager import HTTPDataFetcher, Outage
+
+# P2P历史接口：断线期间可能遗漏的地震情報与津波予報
+P2P_HISTORY_URL = "https://api.p2pquake.net/v2/history?codes=551&codes=552&limit=100"
+P2P_HISTORY = "p2p_history"
+
+# 按时间筛选历史消息时向前放宽的时间（秒），覆盖断线被发现之前的静默期
+_WINDOW_MARGIN = 60.0
+
+_P2P_TIMEZONE = timezone(timedelta(hours=9))
+
+
+def _p2p_time(item: dict[str, Any]) -> datetime | None:
+    """P2P消息的发布时间（日本时间，如 2024/01/01 12:34:56.789）"""
+    value = item.get("time")
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.strptime(value[:19], "%Y/%m/%d %H:%M:%S").replace(
+            tzinfo=_P2P_TIMEZONE
+        )
+    except ValueError:
+        return None
+
+
+class _EndpointStats:
+    """单个回补接口的统计"""
+
+    def __init__(self):
+        self.backfills = 0
+        self.events = 0
+        self.failures = 0
+        self.last_gap = 0.0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "backfills": self.backfills,
+            "events": self.events,
+            "failures": self.failures,
+            "last_gap": self.last_gap,
+            "last_duration_ms": self.last_duration * 1000,
+            "max_duration_ms": self.max_duration * 1000,
+        }
+
+
+class GapBackfiller:
+    """连接恢复后回补断线期间的数据
+
+    sources为WebSocket连接 -> 回补接口（地震列表的连接名称或P2P_HISTORY），
+    eqlist_urls为地震列表连接名称 -> URL，
+    process_envelope(handler_name, envelope)处理一条回补消息并返回产生的事件数。
+    同一接口的回补串行执行，执行期间到来的新断线区间合并后再补拉一次
+    """
+
+    def __init__(
+        self,
+        http_fetcher: HTTPDataFetcher,
+        process_envelope: Callable[[str, MessageEnvelope], Awaitable[int]],
+        sources: dict[str, str],
+        eqlist_urls: dict[str, str],
+        enabled: bool = True,
+    ):
+        self.http_fetcher = http_fetcher
+        self.process_envelope = process_envelope
+        self.sources = sources
+        self.eqlist_urls = eqlist_urls
+        self.enabled = enabled
+        # 接口 -> 待回补区间的起点
+        self._pending: dict[str, datetime] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self.stats: dict[str, _EndpointStats] = {}
+
+    def schedule(self, connection_name: str, outage: Outage | None) -> bool:
+        """连接恢复后安排回补，连接没有对应的回补接口时返回False"""
+        endpoint = self.sources.get(connection_name)
+        if not self.enabled or endpoint is None or outage is None:
+            return False
+
+        since = self._pending.get(endpoint)
+        self._pending[endpoint] = min(since, outage.start) if since else outage.start
+        task = self._tasks.get(endpoint)
+        if task is None or task.done():
+            self._tasks[endpoint] = asyncio.create_task(self._run(endpoint))
+        logger.info(
+            f"[灾害预警] {connection_name} 断线 {outage.duration:.1f} 秒，从 {endpoint} 回补"
+        )
+        return True
+
+    async def _run(self, endpoint: str):
+        stats = self.stats.setdefault(endpoint, _EndpointStats())
+        while endpoint in self._pending:
+            since = self._pending.pop(endpoint)
+            started = time.monotonic()
+            try:
+                events = await self._backfill(endpoint, since)
+            except Exception as e:
+                stats.failures += 1
+                logger.error(f"[灾害预警] 回补失败 {endpoint}: {e}")
+                continue
+
+            duration = time.monotonic() - started
+            stats.backfills += 1
+            stats.events += events
+            stats.last_gap = (datetime.now(timezone.utc) - since).total_seconds()
+            stats.last_duration = duration
+            stats.max_duration = max(stats.max_duration, duration)
+            logger.info(
+                f"[灾害预警] {endpoint} 回补完成：{events} 个事件，耗时 {duration * 1000:.0f} 毫秒"
+            )
+
+    async def _backfill(self, endpoint: str, since: datetime) -> int:
+        url = self.eqlist_urls.get(endpoint)
+        if url:
+            # 地震列表由差分器只输出尚未见过的条目；304表示轮询时已处理过当前列表
+            envelope = await self.http_fetcher.fetch_envelope(url, endpoint)
+            if envelope is None:
+                if self.http_fetcher.last_status.get(url) == 304:
+                    return 0
+                raise RuntimeError(f"HTTP状态 {self.http_fetcher.last_status.get(url)}")
+            return await self.process_envelope("wolfx", envelope)
+
+        # P2P历史按发布时间筛选断线期间（含放宽时间）的消息，从旧到新处理
+        items = await self.http_fetcher.fetch_json(P2P_HISTORY_URL)
+        if not isinstance(items, list):
+            raise RuntimeError("历史接口返回格式错误")
+        cutoff = since - timedelta(seconds=_WINDOW_MARGIN)
+        missed = [
+            item
+            for item in items
+            if isinstance(item, dict)
+            and (published := _p2p_time(item)) is not None
+            and published >= cutoff
+        ]
+        events = 0
+        for item in reversed(missed):
+            envelope = MessageEnvelope.from_data(item, "p2p_main", P2P_HISTORY_URL)
+            events += await self.process_envelope("p2p", envelope)
+        return events
+
+    def stop(self):
+        """取消进行中的回补"""
+        self._pending.clear()
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+
+    def get_stats(self) -> dict[str, dict[str, Any]]:
+        """获取各回补接口的统计"""
+        return {endpoint: stats.to_dict() for endpoint, stats in self.stats.items()}
@@ -0,0 +1,208 @@
+"""
+Global Quake TCP协议分帧与包类型识别
+TCP是字节流，一次read可能只包含半个包，也可能包含多个包，
+分帧器缓存未完成的数据，只输出完整的帧。支持两种帧格式：
+- 换行分隔的JSON（中继服务器常用）
+- 4字节大端长度前缀 + JSON
+首个数据块的首字节为0时判定为长度前缀格式（帧长度小于16MB），否则为换行分隔格式。
+超过长度上限的帧整帧跳过（长度前缀格式按声明的长度跳过，换行格式跳到下一个换行符），
+之后的帧仍然对齐
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any
+
+FRAMING_LINE = "line"
+FRAMING_LENGTH = "length"
+
+# 包类型
+PACKET_KEEPALIVE = "keepalive"
+PACKET_HYPOCENTER = "hypocenter"
+PACKET_CLUSTER = "cluster"
+PACKET_UNKNOWN = "unknown"
+
+_LENGTH_PREFIX_SIZE = 4
+
+# 服务器包类型名称（去掉大小写和Packet/Data后缀后比较）-> 包类型
+_PACKET_TYPES = {
+    "heartbeat": PACKET_KEEPALIVE,
+    "keepalive": PACKET_KEEPALIVE,
+    "ping": PACKET_KEEPALIVE,
+    "hypocenter": PACKET_HYPOCENTER,
+    "earthquake": PACKET_HYPOCENTER,
+    "earthquakeinfo": PACKET_HYPOCENTER,
+    "cluster": PACKET_CLUSTER,
+}
+
+# 回复服务器心跳使用的包
+KEEPALIVE_REPLY = b'{"type":"HeartbeatPacket"}'
+
+
+class GlobalQuakeFramer:
+    """增量分帧器 - 每个连接一个实例，重连时调用reset()"""
+
+    def __init__(self, max_frame_size: int = 1024 * 1024):
+        self.max_frame_size = max_frame_size
+        self.framing: str | None = None
+        self._buffer = bytearray()
+        # 换行格式下已确认不含换行符的前缀长度，避免半包时重复扫描
+        self._scan_from = 0
+        # 正在跳过的超长帧：长度前缀格式下剩余的字节数；换行格式下为-1，跳到下一个换行符
+        self._skip = 0
+
+        # 统计信息
+        self.frames = 0
+        self.bytes_received = 0
+        self.oversized = 0
+
+    def reset(self):
+        """丢弃缓存的半包并重新识别帧格式"""
+        self._buffer.clear()
+        self._scan_from = 0
+        self._skip = 0
+        self.framing = None
+
+    @property
+    def pending(self) -> int:
+        """缓存中尚未组成完整帧的字节数"""
+        return len(self._buffer)
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        """追加读取到的数据，返回其中所有完整的帧"""
+        self.bytes_received += len(chunk)
+        self._buffer += chunk
+        if self.framing is None:
+            if not self._buffer:
+                return []
+            self.framing = FRAMING_LENGTH if self._buffer[0] == 0 else FRAMING_LINE
+
+        if self.framing == FRAMING_LENGTH:
+            frames = self._split_length_prefixed()
+        else:
+            frames = self._split_lines()
+
+        self.frames += len(frames)
+        return frames
+
+    def _split_lines(self) -> list[bytes]:
+        buffer = self._buffer
+        frames = []
+        start = 0
+        while True:
+            end = buffer.find(b"\n", max(start, self._scan_from))
+            if end < 0:
+                break
+            if self._skip:
+                # 超长行的剩余部分到此结束
+                self._skip = 0
+            elif end - start > self.max_frame_size:
+                self.oversized += 1
+            else:
+                frame = bytes(buffer[start:end]).strip()
+                if frame:
+                    frames.append(frame)
+            start = end + 1
+
+        if start:
+            del buffer[:start]
+        if len(buffer) > self.max_frame_size or (self._skip and buffer):
+            # 未分隔的数据超过上限：丢弃并跳到下一个换行符
+            if not self._skip:
+                self.oversized += 1
+                self._skip = -1
+            buffer.clear()
+        self._scan_from = len(buffer)
+        return frames
+
+    def _split_length_prefixed(self) -> list[bytes]:
+        buffer = self._buffer
+        frames = []
+        offset = 0
+        total = len(buffer)
+        if self._skip:
+            offset = min(self._skip, total)
+            self._skip -= offset
+        while total - offset >= _LENGTH_PREFIX_SIZE:
+            size = int.from_bytes(
+                buffer[offset : offset + _LENGTH_PREFIX_SIZE], "big"
+            )
+            end = offset + _LENGTH_PREFIX_SIZE + size
+            if size > self.max_frame_size:
+                # 长度已知：跳过整帧（可能跨越多次读取），之后的帧仍然对齐
+                self.oversized += 1
+                self._skip = max(0, end - total)
+                offset = min(end, total)
+                continue
+            if end > total:
+                break
+            if size:
+                frames.append(bytes(buffer[offset + _LENGTH_PREFIX_SIZE : end]))
+            offset = end
+
+        if offset:
+            del buffer[:offset]
+        return frames
+
+    def encode(self, payload: bytes) -> bytes:
+        """按当前连接的帧格式封装待发送的包"""
+        if self.framing == FRAMING_LENGTH:
+            return len(payload).to_bytes(_LENGTH_PREFIX_SIZE, "big") + payload
+        return payload + b"\n"
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取分帧统计"""
+        return {
+            "framing": self.framing,
+            "frames": self.frames,
+            "bytes": self.bytes_received,
+            "pending": self.pending,
+            "oversized": self.oversized,
+        }
+
+
+def packet_type(data: dict[str, Any]) -> str:
+    """识别包类型，如 HypocenterDataPacket -> hypocenter"""
+    name = data.get("type") or data.get("packet")
+    if isinstance(name, str):
+        key = name.rsplit(".", 1)[-1].lower()
+        for suffix in ("packet", "data"):
+            key = key.removesuffix(suffix)
+        return _PACKET_TYPES.get(key, PACKET_UNKNOWN)
+
+    # 无类型字段的旧格式
+    if "earthquake" in data or "magnitude" in data:
+        return PACKET_HYPOCENTER
+    return PACKET_UNKNOWN
+
+
+def packet_payload(data: dict[str, Any]) -> dict[str, Any]:
+    """取出包内容（带类型字段的包内容位于data中）"""
+    for key in ("data", "earthquake", "hypocenter", "cluster"):
+        payload = data.get(key)
+        if isinstance(payload, dict):
+            return payload
+    return data
+
+
+class RevisionTracker:
+    """按事件记录最新修订号，丢弃重复或乱序到达的旧修订（线程安全）"""
+
+    def __init__(self, max_events: int = 256):
+        self.max_events = max_events
+        self._revisions: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stale = 0
+
+    def accept(self, event_id: str, revision: int) -> bool:
+        """修订号比已见过的更新时返回True"""
+        with self._lock:
+            latest = self._revisions.get(event_id)
+            if latest is not None and revision <= latest:
+                self.stale += 1
+                return False
+            self._revisions[event_id] = revision
+            self._revisions.move_to_end(event_id)
+            if len(self._revisions) > self.max_events:
+                self._revisions.popitem(last=False)
+            return True
@@ -0,0 +1,352 @@
+"""
+跨数据源地震关联
+各数据源对同一地震使用不同的事件ID（CENC eventId、Wolfx md5、P2P id、USGS id），
+按数据源ID记录推送时，报数与最终报只在单个数据源内统计。
+这里按距离、时间和震级的似然把各数据源的地震事件归并为同一次地震（incident），
+由各数据源最新测定加权得到最佳震源估计；推送控制、统计和历史都以incident ID为键
+"""
+
+import math
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from .event_deduplicator import SpatialTemporalIndex, haversine_km
+from .models import EarthquakeData, source_timezone
+
+# 关联门限：距离、发震时间或震级之差超出任一门限即视为不同地震
+_MAX_DISTANCE_KM = 80.0
+_MAX_TIME_DIFF = timedelta(seconds=60)
+_MAX_MAGNITUDE_DIFF = 1.0
+# 同一数据源以新事件ID发布的测定，发震时间与该数据源上一次测定之差在此之内时视为同一地震的修订
+# （P2P每条消息的_id不同，Wolfx地震列表的md5在条目修订后改变）
+_SAME_SOURCE_TIME_DIFF = timedelta(seconds=10)
+
+# 似然尺度：各数据源测定偏差的典型值
+_DISTANCE_SCALE_KM = 15.0
+_TIME_SCALE_SECONDS = 5.0
+_MAGNITUDE_SCALE = 0.3
+# 对数似然低于该值时视为新地震（约为单项3倍尺度的偏差）
+_MIN_LOG_LIKELIHOOD = -4.5
+
+# 最后一次报告后超过该时间的地震不再参与关联
+_INCIDENT_TTL = timedelta(hours=2)
+_CLEANUP_INTERVAL = timedelta(minutes=1)
+
+
+def _shock_time_utc(earthquake: EarthquakeData) -> datetime | None:
+    """发震时间（按数据源时区转换为UTC）"""
+    shock_time = earthquake.shock_time
+    if shock_time is None:
+        return None
+    if shock_time.tzinfo is None:
+        shock_time = shock_time.replace(
+            tzinfo=source_timezone(earthquake.source.value)
+        )
+    return shock_time.astimezone(timezone.utc)
+
+
+def _report_weight(earthquake: EarthquakeData) -> float:
+    """测定结果在震源估计中的权重：最终报 > 正式测定 > 自动测定/预警"""
+    if earthquake.is_final:
+        return 3.0
+    info_type = (earthquake.info_type or "").lower()
+    if "正式" in info_type or info_type == "reviewed":
+        return 2.0
+    return 1.0
+
+
+class Incident:
+    """一次地震：各数据源的最新测定与加权震源估计"""
+
+    def __init__(self, incident_id: str):
+        self.incident_id = incident_id
+        # 数据源 -> 该数据源最新一次测定
+        self.reports: dict[str, dict[str, Any]] = {}
+        self.report_count = 0
+        self.latitude: float | None = None
+        self.longitude: float | None = None
+        self.depth: float | None = None
+        self.magnitude: float | None = None
+        self.shock_time: datetime | None = None
+        self.place_name = ""
+        self.updated = datetime.now()
+
+    def update(
+        self,
+        source: str,
+        source_event_id: str,
+        earthquake: EarthquakeData,
+        shock_time: datetime | None,
+    ):
+        weight = _report_weight(earthquake)
+        previous = self.reports.get(source)
+        # 同一数据源的较早测定被新测定取代；最终报之后的非最终报不降低权重
+        if previous and previous["weight"] > weight:
+            weight = previous["weight"]
+        self.reports[source] = {
+            "event_id": source_event_id,
+            "latitude": earthquake.latitude or None,
+            "longitude": earthquake.longitude or None,
+            "depth": earthquake.depth,
+            "magnitude": earthquake.magnitude,
+            "shock_time": shock_time,
+            "place_name": earthquake.place_name,
+            "weight": weight,
+        }
+        self.report_count += 1
+        self.updated = datetime.now()
+        self._estimate()
+
+    def _estimate(self):
+        """按权重合并各数据源的测定"""
+        located = [
+            report
+            for report in self.reports.values()
+            if report["latitude"] is not None and report["longitude"] is not None
+        ]
+        if located:
+            total = sum(report["weight"] for report in located)
+            origin = located[0]["longitude"]
+            self.latitude = (
+                sum(report["latitude"] * report["weight"] for report in located)
+                / total
+            )
+            # 以第一个测定为基准合并经度偏移，避免跨越180°经线时取平均出错
+            offset = (
+                sum(
+                    ((report["longitude"] - origin + 180) % 360 - 180)
+                    * report["weight"]
+                    for report in located
+                )
+                / total
+            )
+            self.longitude = (origin + offset + 180) % 360 - 180
+
+        timed = [r for r in self.reports.values() if r["shock_time"] is not None]
+        if timed:
+            total = sum(report["weight"] for report in timed)
+            origin = timed[0]["shock_time"]
+            self.shock_time = origin + timedelta(
+                seconds=sum(
+                    (report["shock_time"] - origin).total_seconds() * report["weight"]
+                    for report in timed
+                )
+                / total
+            )
+
+        for field in ("magnitude", "depth"):
+            measured = [r for r in self.reports.values() if r[field] is not None]
+            if measured:
+                setattr(
+                    self,
+                    field,
+                    sum(report[field] * report["weight"] for report in measured)
+                    / sum(report["weight"] for report in measured),
+                )
+
+        best = max(self.reports.values(), key=lambda report: report["weight"])
+        self.place_name = best["place_name"] or self.place_name
+
+    def hypocenter(self) -> dict[str, Any] | None:
+        """可持久化的震源估计"""
+        if self.shock_time is None or self.latitude is None:
+            return None
+        return {
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "magnitude": self.magnitude,
+            "shock_time": self.shock_time.isoformat(),
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "incident_id": self.incident_id,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "depth": self.depth,
+            "magnitude": self.magnitude,
+            "shock_time": self.shock_time,
+            "place_name": self.place_name,
+            "sources": sorted(self.reports),
+            "report_count": self.report_count,
+        }
+
+
+class IncidentCorrelator:
+    """把各数据源的地震事件归并为incident"""
+
+    def __init__(self):
+        self.incidents: dict[str, Incident] = {}
+        # (数据源, 数据源事件ID) -> incident ID
+        self.aliases: dict[tuple[str, str], str] = {}
+        self.index = SpatialTemporalIndex(_MAX_DISTANCE_KM, _MAX_TIME_DIFF)
+        self._last_cleanup = datetime.now()
+
+        # 统计信息
+        self.correlated = 0
+        self.created = 0
+        self.merged = 0
+
+    def correlate(self, earthquake: EarthquakeData) -> str:
+        """返回地震事件所属的incident ID"""
+        source = earthquake.source.value
+        source_event_id = earthquake.event_id or earthquake.id
+        shock_time = _shock_time_utc(earthquake)
+        self.correlated += 1
+        self._maybe_cleanup()
+
+        # 同一数据源同一事件的后续报告直接沿用已关联的incident
+        incident_id = self.aliases.get((source, source_event_id))
+        incident = self.incidents.get(incident_id) if incident_id else None
+
+        if (
+            incident_id is None
+            and shock_time is not None
+            and earthquake.latitude
+            and earthquake.longitude
+        ):
+            incident = self._match(earthquake, source, shock_time)
+            if incident:
+                self.merged += 1
+
+        if incident is None:
+            # 首个测定决定ID
+            incident_id = self._new_incident_id(source, source_event_id, shock_time)
+            incident = Incident(incident_id)
+            self.incidents[incident_id] = incident
+            self.created += 1
+
+        self.aliases[(source, source_event_id)] = incident.incident_id
+        incident.update(source, source_event_id, earthquake, shock_time)
+        if incident.shock_time is not None and incident.latitude is not None:
+            self.index.add(
+                incident.incident_id,
+                incident.latitude,
+                incident.longitude,
+                incident.shock_time,
+            )
+        return incident.incident_id
+
+    def _match(
+        self, earthquake: EarthquakeData, source: str, shock_time: datetime
+    ) -> Incident | None:
+        """在相邻网格中找出似然最高且在门限内的incident，都不够可能时返回None"""
+        max_time_diff = _MAX_TIME_DIFF.total_seconds()
+        best_incident = None
+        best_score = _MIN_LOG_LIKELIHOOD
+        for incident_id in self.index.candidates(
+            earthquake.latitude, earthquake.longitude, shock_time
+        ):
+            incident = self.incidents[incident_id]
+            # 同一数据源以不同事件ID报告的，除非是同一地震的修订，否则是另一次地震
+            previous = incident.reports.get(source)
+            if previous is not None and not self._is_revision(previous, shock_time):
+                continue
+            time_diff = abs((shock_time - incident.shock_time).total_seconds())
+            if time_diff > max_time_diff:
+                continue
+            score = -0.5 * (time_diff / _TIME_SCALE_SECONDS) ** 2
+            if earthquake.magnitude is not None and incident.magnitude is not None:
+                magnitude_diff = abs(earthquake.magnitude - incident.magnitude)
+                if magnitude_diff > _MAX_MAGNITUDE_DIFF:
+                    continue
+                score -= 0.5 * (magnitude_diff / _MAGNITUDE_SCALE) ** 2
+            distance = haversine_km(
+                earthquake.latitude,
+                earthquake.longitude,
+                incident.latitude,
+                incident.longitude,
+            )
+            if distance > _MAX_DISTANCE_KM:
+                continue
+            score -= 0.5 * (distance / _DISTANCE_SCALE_KM) ** 2
+            if score >= best_score:
+                best_incident = incident
+                best_score = score
+        return best_incident
+
+    @staticmethod
+    def _is_revision(previous: dict[str, Any], shock_time: datetime) -> bool:
+        """同一数据源的新测定是否为上一次测定的修订（发震时间几乎不变）"""
+        if previous["shock_time"] is None:
+            return False
+        return abs(previous["shock_time"] - shock_time) <= _SAME_SOURCE_TIME_DIFF
+
+    def _new_incident_id(
+        self, source: str, source_event_id: str, shock_time: datetime | None
+    ) -> str:
+        time_part = (shock_time or datetime.now(timezone.utc)).strftime(
+            "%Y%m%d%H%M%S"
+        )
+        digest = zlib.crc32(f"{source}:{source_event_id}".encode()) & 0xFFFFFF
+        return f"EQ{time_part}-{digest:06x}"
+
+    def get(self, incident_id: str) -> Incident | None:
+        return self.incidents.get(incident_id)
+
+    def restore(self, push_records: dict[str, list[dict[str, Any]]]):
+        """从推送记录恢复近期的incident：数据源事件ID映射与推送时的震源估计
+
+        恢复的incident不含各数据源的测定，收到新报告后按新测定重新估计
+        """
+        cutoff = datetime.now() - _INCIDENT_TTL
+        for incident_id, records in push_records.items():
+            for record in records:
+                source_event_id = record.get("source_event_id")
+                if not source_event_id or record["timestamp"] < cutoff:
+                    continue
+                incident = self.incidents.get(incident_id)
+                if incident is None:
+                    incident = self.incidents[incident_id] = Incident(incident_id)
+                    incident.updated = record["timestamp"]
+                incident.updated = max(incident.updated, record["timestamp"])
+                self.aliases[(record["source"], source_event_id)] = incident_id
+
+                hypocenter = record.get("hypocenter")
+                if hypocenter:
+                    incident.latitude = hypocenter["latitude"]
+                    incident.longitude = hypocenter["longitude"]
+                    incident.magnitude = hypocenter["magnitude"]
+                    incident.shock_time = datetime.fromisoformat(
+                        hypocenter["shock_time"]
+                    )
+                    self.index.add(
+                        incident_id,
+                        incident.latitude,
+                        incident.longitude,
+                        incident.shock_time,
+                    )
+
+    def _maybe_cleanup(self):
+        now = datetime.now()
+        if now - self._last_cleanup >= _CLEANUP_INTERVAL:
+            self.cleanup(now)
+
+    def cleanup(self, now: datetime | None = None):
+        """清理超过保留时间的incident及其别名"""
+        now = now or datetime.now()
+        self._last_cleanup = now
+        cutoff = now - _INCIDENT_TTL
+        expired = [
+            incident_id
+            for incident_id, incident in self.incidents.items()
+            if incident.updated < cutoff
+        ]
+        for incident_id in expired:
+            del self.incidents[incident_id]
+            self.index.remove(incident_id)
+        self.aliases = {
+            key: incident_id
+            for key, incident_id in self.aliases.items()
+            if incident_id in self.incidents
+        }
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取关联统计"""
+        return {
+            "correlated": self.correlated,
+            "incidents": len(self.incidents),
+            "created": self.created,
+            "merged": self.merged,
+        }
@@ -0,0 +1,72 @@
+"""
+JSON编解码层
+优先使用 orjson / msgspec（如已安装），否则回退到标准库 json
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - 可选依赖
+    msgspec = None
+
+
+if orjson is not None:
+    BACKEND = "orjson"
+    JSONDecodeError: tuple[type[Exception], ...] = (
+        orjson.JSONDecodeError,
+        json.JSONDecodeError,
+    )
+
+    def loads(data: str | bytes) -> Any:
+        """解码JSON"""
+        return orjson.loads(data)
+
+    def _fast_dumps(obj: Any, indent: bool) -> str:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option).decode("utf-8")
+
+elif msgspec is not None:
+    BACKEND = "msgspec"
+    JSONDecodeError = (msgspec.DecodeError, json.JSONDecodeError)
+    _decoder = msgspec.json.Decoder()
+    _encoder = msgspec.json.Encoder()
+
+    def loads(data: str | bytes) -> Any:
+        """解码JSON"""
+        return _decoder.decode(data)
+
+    def _fast_dumps(obj: Any, indent: bool) -> str:
+        encoded = _encoder.encode(obj)
+        if indent:
+            encoded = msgspec.json.format(encoded, indent=2)
+        return encoded.decode("utf-8")
+
+else:
+    BACKEND = "json"
+    JSONDecodeError = (json.JSONDecodeError,)
+
+    def loads(data: str | bytes) -> Any:
+        """解码JSON"""
+        return json.loads(data)
+
+    _fast_dumps = None
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """编码JSON（保留非ASCII字符），快速后端无法处理的对象回退到标准库"""
+    if _fast_dumps is not None:
+        try:
+            return _fast_dumps(obj, indent)
+        except TypeError:
+            pass
+
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None, default=str)
@@ -0,0 +1,189 @@
+"""
+数据源首达延迟统计
+去重器把同一地震在各数据源的首次到达交给这里记录，
+按数据源和地区统计相对发震时间的延迟，以及相对最先到达数据源的落后时间
+"""
+
+from collections import OrderedDict, defaultdict, deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from . import json_codec
+from .models import CHINA_PROVINCES, DisasterEvent, EarthquakeData, source_timezone
+
+# 每个数据源/地区保留的样本数
+_MAX_SAMPLES = 500
+# 跟踪中的地震数（超过后淘汰最早的）
+_MAX_QUAKES = 512
+# 导出中保留的最近地震数
+_RECENT_QUAKES = 50
+# 有效的发震时间延迟范围（秒）：超出范围多为时区错误或历史列表中的旧地震
+_ORIGIN_LATENCY_RANGE = (-60.0, 3600.0)
+
+
+def region_of(earthquake: EarthquakeData) -> str:
+    """地震所在地区：国内按省份，其余按大致范围"""
+    if earthquake.province:
+        return earthquake.province
+    place_name = earthquake.place_name or ""
+    for province in CHINA_PROVINCES:
+        if place_name.startswith(province):
+            return province
+    latitude = earthquake.latitude or 0
+    longitude = earthquake.longitude or 0
+    if 24 <= latitude <= 46 and 122 <= longitude <= 154:
+        return "日本"
+    return "其他"
+
+
+def _percentile(values: list[float], q: float) -> float | None:
+    """最近秩百分位数"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+class _Quake:
+    """单次地震的各数据源到达记录"""
+
+    def __init__(self, region: str, origin_utc: datetime | None, magnitude):
+        self.region = region
+        self.origin_utc = origin_utc
+        self.magnitude = magnitude
+        self.first_arrival: datetime | None = None
+        # 数据源 -> (到达时间UTC, 发震时间延迟秒)，按到达顺序
+        self.arrivals: dict[str, tuple[datetime, float | None]] = {}
+
+
+class _Samples:
+    """单个数据源在单个地区的延迟样本"""
+
+    def __init__(self):
+        self.origin = deque(maxlen=_MAX_SAMPLES)
+        self.behind_first = deque(maxlen=_MAX_SAMPLES)
+        self.firsts = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        origin = list(self.origin)
+        behind = list(self.behind_first)
+        return {
+            "events": len(behind),
+            "firsts": self.firsts,
+            "origin_p50": _percentile(origin, 0.5),
+            "origin_p95": _percentile(origin, 0.95),
+            "behind_first_p50": _percentile(behind, 0.5),
+            "behind_first_p95": _percentile(behind, 0.95),
+        }
+
+
+class LatencyTracker:
+    """按地震记录各数据源的首次到达顺序与延迟"""
+
+    def __init__(self):
+        self._quakes: OrderedDict[str, _Quake] = OrderedDict()
+        # (数据源, 地区) -> 样本
+        self._samples: defaultdict[tuple[str, str], _Samples] = defaultdict(_Samples)
+
+    def record_arrival(self, key: str, event: DisasterEvent):
+        """记录数据源对某次地震的到达（key为去重器匹配到的同一地震标识）"""
+        earthquake = event.data
+        if not isinstance(earthquake, EarthquakeData):
+            return
+
+        source = event.source.value
+        quake = self._quakes.get(key)
+        if quake is None:
+            origin_utc = (
+                earthquake.shock_time.replace(tzinfo=source_timezone(source))
+                if earthquake.shock_time
+                else None
+            )
+            quake = _Quake(region_of(earthquake), origin_utc, earthquake.magnitude)
+            self._quakes[key] = quake
+            if len(self._quakes) > _MAX_QUAKES:
+                self._quakes.popitem(last=False)
+        elif source in quake.arrivals:
+            # 只统计每个数据源的首次到达，后续报数更新不计入
+            return
+
+        # 接收时间是本机时区的本地时间
+        arrival = (event.receive_time or datetime.now()).astimezone(timezone.utc)
+        origin_latency = None
+        if quake.origin_utc is not None:
+            origin_latency = (arrival - quake.origin_utc).total_seconds()
+            low, high = _ORIGIN_LATENCY_RANGE
+            if not low <= origin_latency <= high:
+                origin_latency = None
+
+        samples = self._samples[(source, quake.region)]
+        if quake.first_arrival is None:
+            quake.first_arrival = arrival
+            samples.firsts += 1
+        samples.behind_first.append((arrival - quake.first_arrival).total_seconds())
+        if origin_latency is not None:
+            samples.origin.append(origin_latency)
+        quake.arrivals[source] = (arrival, origin_latency)
+
+    def get_stats(self) -> dict[str, Any]:
+        """按数据源汇总及按地区细分的延迟统计"""
+        by_source: defaultdict[str, _Samples] = defaultdict(_Samples)
+        by_region: defaultdict[str, dict[str, Any]] = defaultdict(dict)
+        for (source, region), samples in self._samples.items():
+            by_region[region][source] = samples.to_dict()
+            merged = by_source[source]
+            merged.origin.extend(samples.origin)
+            merged.behind_first.extend(samples.behind_first)
+            merged.firsts += samples.firsts
+
+        sources = {source: samples.to_dict() for source, samples in by_source.items()}
+        return {
+            "quakes": len(self._quakes),
+            "sources": dict(
+                sorted(
+                    sources.items(),
+                    key=lambda item: (-item[1]["firsts"], item[1]["behind_first_p50"]),
+                )
+            ),
+            "by_region": dict(by_region),
+        }
+
+    def get_recent_quakes(self, limit: int = _RECENT_QUAKES) -> list[dict[str, Any]]:
+        """最近地震的到达顺序（最新在前）"""
+        recent = []
+        for quake in reversed(self._quakes.values()):
+            if len(recent) >= limit:
+                break
+            recent.append(
+                {
+                    "region": quake.region,
+                    "magnitude": quake.magnitude,
+                    "origin_time": (
+                        quake.origin_utc.isoformat() if quake.origin_utc else None
+                    ),
+                    "arrivals": [
+                        {
+                            "source": source,
+                            "behind_first": (
+                                arrival - quake.first_arrival
+                            ).total_seconds(),
+                            "origin_latency": origin_latency,
+                        }
+                        for source, (arrival, origin_latency) in quake.arrivals.items()
+                    ],
+                }
+            )
+        return recent
+
+    def export_json(self, path: Path) -> Path:
+        """导出统计与最近地震的到达顺序"""
+        report = {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            **self.get_stats(),
+            "recent_quakes": self.get_recent_quakes(),
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json_codec.dumps(report, indent=True), encoding="utf-8")
+        return path
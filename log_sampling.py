@@ -0,0 +1,22 @@
+"""
+高频日志采样
+高频数据源的逐条INFO日志按采样率输出，减少热路径上的字符串构建和日志IO
+"""
+
+import itertools
+from collections import defaultdict
+
+
+class LogSampler:
+    """按键计数的日志采样器 - 每个键每N条输出1条"""
+
+    def __init__(self, rate: int = 1):
+        self.rate = max(1, int(rate or 1))
+        self._counters: defaultdict[str, itertools.count] = defaultdict(itertools.count)
+
+    def should_log(self, key: str) -> bool:
+        """是否输出本条日志（每个键的第1条总是输出）"""
+        if self.rate == 1:
+            return True
+        # itertools.count的next()在CPython中是原子的，线程池中解析时也可安全调用
+        return next(self._counters[key]) % self.rate == 0
@@ -79,6 +79,8 @@ class DisasterWarningPlugin(Star):
 • /灾害预警统计 - 查看推送统计信息
 • /灾害预警配置 查看 - 查看当前配置摘要
 • /灾害预警去重统计 - 查看事件去重统计
+• /灾害预警延迟 [导出] - 查看各数据源首达延迟排行
+• /灾害预警当前气象 [省份] - 查看生效中的气象预警
 • /灾害预警日志 - 查看原始消息日志统计
 • /灾害预警日志开关 - 开关原始消息日志记录
 • /灾害预警日志清除 - 清除所有原始消息日志
@@ -148,6 +150,163 @@ class DisasterWarningPlugin(Star):
   • 连接状态过滤：{filter_stats.get("connection_status_filtered", 0)} 条
   • 总计过滤：{filter_stats.get("total_filtered", 0)} 条"""
 
+            # 启动预热
+            warm_start = status.get("warm_start", {})
+            if warm_start:
+                if warm_start["ready"]:
+                    if warm_start["time_to_ready"] is not None:
+                        status_text += f"\n🌅 启动预热：已完成，用时 {warm_start['time_to_ready']:.1f} 秒"
+                        if warm_start["timed_out"]:
+                            status_text += "（等待超时）"
+                        status_text += f"，未推送旧事件 {warm_start['suppressed']} 条"
+                else:
+                    status_text += f"\n🌅 启动预热中，等待：{', '.join(warm_start['pending'])}"
+
+            # 气象预警生命周期
+            weather_alarms = status.get("weather_alarms", {})
+            if weather_alarms:
+                transitions = weather_alarms["transitions"]
+                status_text += (
+                    f"\n⛈️ 气象预警：生效中 {weather_alarms['active']} 条"
+                    f"，发布 {transitions.get('issue', 0)} / 升级 {transitions.get('upgrade', 0)}"
+                    f" / 降级 {transitions.get('downgrade', 0)} / 解除 {transitions.get('lift', 0)}"
+                    f"，续发未推送 {transitions.get('renew', 0)} 次"
+                )
+
+            # 事件状态日志
+            journal = status.get("journal", {})
+            if journal:
+                status_text += (
+                    f"\n💾 事件状态日志：启动时重放 {journal['replayed']} 条（{journal['replay_ms']:.0f}ms）"
+                    f"，已记录 {journal['records']} 条，压缩 {journal['compactions']} 次"
+                    f"，日志 {journal['journal_bytes'] / 1024:.1f}KB"
+                )
+                if journal["write_errors"]:
+                    status_text += f"，写入失败 {journal['write_errors']} 次"
+
+            # 连接断路状态
+            connection_states = status.get("connection_states", {})
+            feed_activity = status.get("feed_activity", {})
+            if connection_states:
+                state_names = {
+                    "connected": "已连接",
+                    "retrying": "重试中",
+                    "open": "已停止重连",
+                }
+                status_text += "\n🔌 连接状态："
+                for name, state in connection_states.items():
+                    status_text += f"\n  • {name}：{state_names.get(state['state'], state['state'])}"
+                    if state["state"] != "connected" and state["attempts"]:
+                        status_text += f"，连续重试 {state['attempts']} 次"
+                    if state["reconnects"]:
+                        status_text += f"，累计重连 {state['reconnects']} 次"
+                    activity = feed_activity.get(name, {})
+                    if activity.get("last_frame_age") is not None:
+                        status_text += f"，最后消息 {activity['last_frame_age']:.0f} 秒前"
+                    if activity.get("stale_reconnects"):
+                        status_text += f"，静默重连 {activity['stale_reconnects']} 次"
+
+            # 入站队列统计
+            ingress_queues = status.get("ingress_queues", {})
+            if ingress_queues:
+                status_text += "\n📥 入站队列："
+                for name, queue_stats in ingress_queues.items():
+                    status_text += (
+                        f"\n  • {name}：深度 {queue_stats['depth']}/{queue_stats['max_size']}"
+                        f"，平均等待 {queue_stats['avg_wait_ms']:.1f}ms"
+                        f"，最大等待 {queue_stats['max_wait_ms']:.1f}ms"
+                    )
+                    if queue_stats["dropped"]:
+                        status_text += f"，丢弃 {queue_stats['dropped']} 条"
+                        if queue_stats["dropped_data"]:
+                            status_text += f"（其中数据帧 {queue_stats['dropped_data']} 条）"
+                    if queue_stats["blocked"]:
+                        status_text += f"，队列满时读取等待 {queue_stats['blocked']} 次"
+
+            # 读取端预过滤统计
+            prefiltered_frames = status.get("prefiltered_frames", {})
+            if prefiltered_frames:
+                status_text += "\n🧹 读取端预过滤："
+                for name, labels in prefiltered_frames.items():
+                    detail = "，".join(
+                        f"{label} {count} 条" for label, count in labels.items()
+                    )
+                    status_text += f"\n  • {name}：{detail}"
+
+            # 解析耗时统计
+            parse_stats = status.get("parse_stats", {})
+            if parse_stats:
+                inline_stats = parse_stats["inline"]
+                status_text += (
+                    f"\n⏱️ 解析耗时（{parse_stats['mode']}）："
+                    f"\n  • 直接解析：{inline_stats['count']} 条，平均阻塞 {inline_stats['avg_ms']:.2f}ms"
+                    f"，最大阻塞 {inline_stats['max_ms']:.2f}ms"
+                )
+                offloaded_parse = parse_stats["offloaded_parse"]
+                if offloaded_parse["count"]:
+                    offloaded_loop = parse_stats["offloaded_loop"]
+                    status_text += (
+                        f"\n  • 转移解析：{offloaded_parse['count']} 条，解析耗时 平均 {offloaded_parse['avg_ms']:.2f}ms"
+                        f" / 最大 {offloaded_parse['max_ms']:.2f}ms，事件循环阻塞 平均 {offloaded_loop['avg_ms']:.2f}ms"
+                        f" / 最大 {offloaded_loop['max_ms']:.2f}ms"
+                    )
+
+            # 地震列表差分统计
+            eqlist_diff = status.get("eqlist_diff", {})
+            if eqlist_diff.get("snapshots"):
+                status_text += (
+                    f"\n📋 地震列表快照：{eqlist_diff['snapshots']} 份，未变化跳过 {eqlist_diff['unchanged']} 份"
+                    f"，输出新条目 {eqlist_diff['emitted']} 条"
+                )
+
+            # HTTP轮询统计
+            http_stats = status.get("http_stats", {})
+            if http_stats.get("requests"):
+                status_text += (
+                    f"\n📥 HTTP轮询：{http_stats['requests']} 次请求，未变化(304) {http_stats['not_modified']} 次"
+                    f"，失败 {http_stats['errors']} 次"
+                )
+            http_polls = status.get("http_polls", {})
+            for poll_name, poll in http_polls.get("sources", {}).items():
+                status_text += (
+                    f"\n  • {poll_name}：间隔 {poll['interval']:.0f}秒"
+                    f"，{poll['next_in']:.0f}秒后轮询，有更新 {poll['changed']} 次"
+                )
+            if http_polls.get("max_requests_per_hour"):
+                status_text += f"\n  • 近1小时请求 {http_polls['requests_last_hour']}/{http_polls['max_requests_per_hour']} 次"
+
+            # 断线回补统计
+            gap_backfill = status.get("gap_backfill", {})
+            if gap_backfill:
+                status_text += "\n🩹 断线回补："
+                for endpoint, backfill in gap_backfill.items():
+                    status_text += (
+                        f"\n  • {endpoint}：{backfill['backfills']} 次，补回 {backfill['events']} 个事件"
+                        f"，最近断线 {backfill['last_gap']:.0f} 秒，耗时 {backfill['last_duration_ms']:.0f}ms"
+                    )
+                    if backfill["failures"]:
+                        status_text += f"，失败 {backfill['failures']} 次"
+
+            # Global Quake连接统计
+            global_quake = status.get("global_quake", {})
+            if global_quake:
+                status_text += (
+                    f"\n🌐 Global Quake：{'已连接 ' + global_quake['server'] if global_quake['connected'] else '未连接'}"
+                    f"，收到 {global_quake['frames']} 帧，心跳 {global_quake['keepalives']} 次"
+                )
+                if global_quake["oversized"]:
+                    status_text += f"，跳过超长帧 {global_quake['oversized']} 个"
+                reconnect = global_quake["reconnect"]
+                if reconnect["reconnects"] or reconnect["failures"]:
+                    status_text += (
+                        f"，重连 {reconnect['reconnects']} 次，连接失败 {reconnect['failures']} 次"
+                    )
+                for server, server_stats in global_quake["servers"].items():
+                    status_text += (
+                        f"\n  • {server}：在线 {server_stats['uptime_seconds'] / 60:.1f} 分钟"
+                        f"，连接 {server_stats['connects']} 次，失败 {server_stats['failures']} 次"
+                    )
+
             # 最近事件
             recent_events = push_stats.get("recent_events", [])
             if recent_events:
@@ -244,6 +403,7 @@ class DisasterWarningPlugin(Star):
   • 总事件数：{stats["total_events"]}
   • 总推送数：{stats["total_pushes"]}
   • 最终报数：{stats["final_reports_pushed"]}
+  • 跨数据源关联：{stats["incidents"]["correlated"]} 条报告归并为 {stats["incidents"]["created"]} 次地震（合并 {stats["incidents"]["merged"]} 次）
 
 🕐 最近24小时 (插件启动后)：
   • 事件数：{len(stats["recent_events"])}"""
@@ -252,7 +412,14 @@ class DisasterWarningPlugin(Star):
             if stats["recent_events"]:
                 stats_text += "\n\n📋 最近事件："
                 for i, event in enumerate(stats["recent_events"][:5]):
-                    stats_text += f"\n  {i + 1}. {event['event_id']} (推送{event['push_count']}次)"
+                    stats_text += f"\n  {i + 1}. {event['event_id']}"
+                    incident = event["incident"]
+                    if incident and incident["magnitude"] is not None:
+                        stats_text += (
+                            f" {incident['place_name']} M{incident['magnitude']:.1f}"
+                            f" [{', '.join(incident['sources'])}]"
+                        )
+                    stats_text += f" (推送{event['push_count']}次)"
 
             yield event.plain_result(stats_text)
 
@@ -441,13 +608,16 @@ class DisasterWarningPlugin(Star):
 📏 位置容差：{stats["location_tolerance_km"]} 公里
 📊 震级容差：{stats["magnitude_tolerance"]} 级
 
-📈 当前记录：{stats["recent_events_count"]} 个事件
+📈 当前记录：{stats["recent_events_count"]}/{stats["max_entries"]} 个事件
+🗑️ 已过期清理：{stats["expired_count"]} 个，超出上限淘汰：{stats["evicted_count"]} 个（记录保留 {stats["retention_minutes"]:.0f} 分钟）
+🌊 海啸/气象预警：记录 {stats["bulletins_count"]} 条，跳过重发 {stats["bulletin_resends"]} 次，状态更新 {stats["bulletin_changes"]} 次
 
 💡 说明：
 • 同一地震事件只推送最先接收到信息的数据源
 • 时间窗口内（1分钟）的相似事件会被去重
 • 位置差异在20公里内视为同一事件
-• 震级差异在0.5级内视为同一事件"""
+• 震级差异在0.5级内视为同一事件
+• 海啸/气象预警状态未变化的重发不再推送"""
 
             yield event.plain_result(stats_text)
 
@@ -455,6 +625,98 @@ class DisasterWarningPlugin(Star):
             logger.error(f"[灾害预警] 获取去重统计失败: {e}")
             yield event.plain_result(f"❌ 获取去重统计失败: {str(e)}")
 
+    @filter.command("灾害预警当前气象")
+    async def weather_alarm_query(self, event: AstrMessageEvent, province: str = None):
+        """查看生效中的气象预警，指定省份时列出该省的预警"""
+        if not self.disaster_service or not self.disaster_service.message_manager:
+            yield event.plain_result("❌ 气象预警查询不可用")
+            return
+
+        try:
+            tracker = self.disaster_service.message_manager.weather_alarms
+
+            if not province:
+                counts = tracker.province_counts()
+                if not counts:
+                    yield event.plain_result("🌤️ 当前没有生效中的气象预警（插件启动后）")
+                    return
+                stats_text = f"⛈️ 生效中的气象预警：{sum(counts.values())} 条\n"
+                for name, count in sorted(
+                    counts.items(), key=lambda item: item[1], reverse=True
+                ):
+                    stats_text += f"\n  • {name or '未知地区'}：{count} 条"
+                stats_text += "\n\n💡 使用 /灾害预警当前气象 [省份] 查看该省的预警"
+                yield event.plain_result(stats_text)
+                return
+
+            alarms = tracker.active_alarms(province)
+            if not alarms:
+                yield event.plain_result(f"🌤️ {province}当前没有生效中的气象预警")
+                return
+            stats_text = f"⛈️ {province}生效中的气象预警：{len(alarms)} 条\n"
+            for alarm in alarms[:20]:
+                stats_text += f"\n  • {alarm.headline}"
+                if alarm.issued_at:
+                    stats_text += f"（{alarm.issued_at.strftime('%m-%d %H:%M')}）"
+            if len(alarms) > 20:
+                stats_text += f"\n  ...等{len(alarms)}条"
+            yield event.plain_result(stats_text)
+
+        except Exception as e:
+            logger.error(f"[灾害预警] 查询气象预警失败: {e}")
+            yield event.plain_result(f"❌ 查询气象预警失败: {str(e)}")
+
+    @filter.command("灾害预警延迟")
+    async def latency_leaderboard(self, event: AstrMessageEvent, action: str = None):
+        """查看各数据源首达延迟排行，参数"导出"时导出JSON报告"""
+        if not self.disaster_service or not self.disaster_service.message_manager:
+            yield event.plain_result("❌ 延迟统计不可用")
+            return
+
+        try:
+            tracker = self.disaster_service.message_manager.latency_tracker
+
+            if action == "导出":
+                path = tracker.export_json(
+                    self.disaster_service.message_logger.data_dir
+                    / "latency_report.json"
+                )
+                yield event.plain_result(f"✅ 延迟报告已导出：{path}")
+                return
+
+            stats = tracker.get_stats()
+            if not stats["sources"]:
+                yield event.plain_result("📊 暂无延迟数据（插件启动后尚未收到地震事件）")
+                return
+
+            def fmt(value):
+                return f"{value:.1f}s" if value is not None else "-"
+
+            stats_text = f"📊 数据源首达延迟排行（{stats['quakes']} 次地震）\n"
+            for rank, (source, source_stats) in enumerate(
+                stats["sources"].items(), start=1
+            ):
+                stats_text += (
+                    f"\n{rank}. {source}：最先到达 {source_stats['firsts']}/{source_stats['events']} 次"
+                    f"\n   距发震 p50 {fmt(source_stats['origin_p50'])} / p95 {fmt(source_stats['origin_p95'])}"
+                    f"，落后首达 p50 {fmt(source_stats['behind_first_p50'])} / p95 {fmt(source_stats['behind_first_p95'])}"
+                )
+
+            stats_text += "\n\n🗺️ 按地区："
+            for region, sources in stats["by_region"].items():
+                detail = "，".join(
+                    f"{source} {fmt(region_stats['behind_first_p50'])}"
+                    for source, region_stats in sources.items()
+                )
+                stats_text += f"\n  • {region}：{detail}"
+
+            stats_text += "\n\n💡 按地区显示落后首达的p50；使用 /灾害预警延迟 导出 获取完整JSON报告"
+            yield event.plain_result(stats_text)
+
+        except Exception as e:
+            logger.error(f"[灾害预警] 获取延迟统计失败: {e}")
+            yield event.plain_result(f"❌ 获取延迟统计失败: {str(e)}")
+
     @filter.command_group("灾害预警地震白名单")
     async def earthquake_whitelist(self, event: AstrMessageEvent):
         """地震/海啸省份白名单管理"""
@@ -3,13 +3,15 @@
 用于记录所有数据源的原始消息格式，便于分析和开发
 """
 
-import json
 from datetime import datetime
 from typing import Any
 
 from astrbot.api import logger
 from astrbot.api.star import StarTools
 
+from . import json_codec
+from .models import MessageEnvelope
+
 
 class MessageLogger:
     """原始消息格式记录器"""
@@ -88,8 +90,8 @@ class MessageLogger:
             if isinstance(raw_data, str) and raw_data.strip():
                 # 尝试解析JSON数据
                 try:
-                    data = json.loads(raw_data)
-                except json.JSONDecodeError:
+                    data = json_codec.loads(raw_data)
+                except json_codec.JSONDecodeError:
                     # 如果JSON解析失败，记录调试信息但不过滤
                     logger.debug(
                         f"[灾害预警] 消息记录器 - JSON解析失败，消息前100字符: {raw_data[:100]}..."
@@ -140,7 +142,7 @@ class MessageLogger:
                 # 检查WebSocket消息内容（嵌套JSON）
                 if "raw_data" in data and isinstance(data["raw_data"], str):
                     try:
-                        inner_data = json.loads(data["raw_data"])
+                        inner_data = json_codec.loads(data["raw_data"])
                         inner_type = inner_data.get("type", "").lower()
                         if inner_type in self.filter_types:
                             self.filter_stats["heartbeat_filtered"] += 1
@@ -159,7 +161,7 @@ class MessageLogger:
                         ):
                             self.filter_stats["duplicate_events_filtered"] += 1
                             return "内层重复事件"
-                    except (json.JSONDecodeError, AttributeError):
+                    except (*json_codec.JSONDecodeError, AttributeError):
                         pass
 
             elif isinstance(raw_data, dict):
@@ -199,7 +201,7 @@ class MessageLogger:
                     logger.debug("[灾害预警] 消息记录器 - 连接状态消息过滤")
                     return "连接状态消息"
 
-        except (json.JSONDecodeError, KeyError, TypeError):
+        except (*json_codec.JSONDecodeError, KeyError, TypeError):
             # 如果解析失败，不过滤
             pass
 
@@ -470,8 +472,10 @@ class MessageLogger:
 
         return False
 
-    def _format_readable_log(self, log_entry: dict[str, Any]) -> str:
-        """格式化可读性强的日志内容"""
+    def _format_readable_log(
+        self, log_entry: dict[str, Any], decode: bool = True
+    ) -> str:
+        """格式化可读性强的日志内容，decode为False时原样显示字符串数据"""
         try:
             # 基础信息格式化
             timestamp = datetime.fromisoformat(log_entry["timestamp"]).strftime(
@@ -503,12 +507,14 @@ class MessageLogger:
             log_content += "\n📊 原始数据:\n"
 
             # 根据数据类型进行不同的格式化
-            if isinstance(raw_data, str):
+            if isinstance(raw_data, str) and not decode:
+                log_content += f"  {raw_data}\n"
+            elif isinstance(raw_data, str):
                 # 尝试解析JSON字符串
                 try:
-                    parsed_data = json.loads(raw_data)
+                    parsed_data = json_codec.loads(raw_data)
                     log_content += self._format_json_data(parsed_data, indent=2)
-                except json.JSONDecodeError:
+                except json_codec.JSONDecodeError:
                     # 如果不是JSON，直接显示
                     log_content += f"  {raw_data}\n"
             elif isinstance(raw_data, dict):
@@ -529,7 +535,7 @@ class MessageLogger:
         except Exception as e:
             # 如果格式化失败，回退到简单的JSON格式
             logger.warning(f"[灾害预警] 日志格式化失败，使用回退格式: {e}")
-            return json.dumps(log_entry, ensure_ascii=False, indent=2) + "\n\n"
+            return json_codec.dumps(log_entry, indent=True) + "\n\n"
 
     def _format_json_data(self, data: dict[str, Any], indent: int = 0) -> str:
         """递归格式化JSON数据，增加可读性"""
@@ -659,9 +665,19 @@ class MessageLogger:
         if not self.enabled:
             return
 
+        # 消息信封：复用解析时已解码的数据，避免重复JSON解析；
+        # 尚未解码的信封（如在进程池中解析的大消息）直接记录原始文本，不在事件循环中解码
+        decoded = True
+        if isinstance(raw_data, MessageEnvelope):
+            if raw_data.is_decoded and raw_data.data is not None:
+                raw_data = raw_data.data
+            else:
+                decoded = raw_data.is_decoded
+                raw_data = raw_data.text
+
         try:
-            # 检查是否应该过滤该消息
-            filter_reason = self._should_filter_message(raw_data)
+            # 检查是否应该过滤该消息（过滤判断需要解码，未解码的原始文本不过滤）
+            filter_reason = self._should_filter_message(raw_data) if decoded else ""
             if filter_reason:
                 logger.debug(
                     f"[灾害预警] 过滤消息 - 来源: {source}, 类型: {message_type}, 原因: {filter_reason}"
@@ -684,14 +700,14 @@ class MessageLogger:
 
             # 尝试新的可读性格式化
             try:
-                log_content = self._format_readable_log(log_entry)
+                log_content = self._format_readable_log(log_entry, decoded)
             except Exception as format_error:
                 # 如果新格式失败，回退到安全的JSON格式
                 logger.warning(
                     f"[灾害预警] 可读格式失败，回退到JSON格式: {format_error}"
                 )
                 log_content = (
-                    json.dumps(log_entry, ensure_ascii=False, indent=2) + "\n\n"
+                    json_codec.dumps(log_entry, indent=True) + "\n\n"
                 )
 
             # 确保目录存在
@@ -715,7 +731,10 @@ class MessageLogger:
             logger.error(f"[灾害预警] 异常堆栈: {traceback.format_exc()}")
 
     def log_websocket_message(
-        self, connection_name: str, message: str, url: str | None = None
+        self,
+        connection_name: str,
+        message: str | MessageEnvelope,
+        url: str | None = None,
     ):
         """记录WebSocket消息"""
         self.log_raw_message(
@@ -725,18 +744,9 @@ class MessageLogger:
             connection_info={"url": url, "connection_type": "websocket"},
         )
 
-    def log_tcp_message(self, server: str, port: int, message: str):
-        """记录TCP消息"""
-        logger.debug(
-            f"[灾害预警] 准备记录TCP消息 - 服务器: {server}:{port}, 消息: {message[:128]}..."
-        )
-
-        # 先检查过滤情况
-        filter_reason = self._should_filter_message(message)
-        if filter_reason:
-            logger.debug(f"[灾害预警] TCP消息被过滤 - 原因: {filter_reason}")
-        else:
-            logger.debug("[灾害预警] TCP消息未被过滤，将记录到日志")
+    def log_tcp_message(self, server: str, port: int, message: str | MessageEnvelope):
+        """记录TCP消息（过滤判断在log_raw_message中统一进行）"""
+        logger.debug(f"[灾害预警] 准备记录TCP消息 - 服务器: {server}:{port}")
 
         self.log_raw_message(
             source="tcp_global_quake",
@@ -12,25 +12,53 @@ from astrbot.api import logger
 from astrbot.api.event import MessageChain
 
 from .event_deduplicator import EventDeduplicator
+from .event_journal import EventJournal
+from .incident_correlator import IncidentCorrelator
+from .latency_tracker import LatencyTracker
 from .models import (
+    CHINA_PROVINCES,
+    SOURCE_TIMEZONES,
     DataSource,
     DisasterEvent,
     EarthquakeData,
     TsunamiData,
     WeatherAlarmData,
 )
+from .warm_start import WarmStartGate
+from .weather_alarm_tracker import TRANSITION_RENEW, WeatherAlarmTracker
 
 
 class MessagePushManager:
     """消息推送管理器"""
 
-    def __init__(self, config: dict[str, Any], context):
+    def __init__(
+        self,
+        config: dict[str, Any],
+        context,
+        journal: EventJournal | None = None,
+    ):
         self.config = config
         self.context = context
+        # 事件状态日志：去重记录、推送记录与最终报标记的变更写入磁盘，重启后恢复
+        self.journal = journal
 
-        # 初始化事件去重器
+        # 初始化事件去重器（同时记录各数据源的首达延迟）
+        self.latency_tracker = LatencyTracker()
         self.deduplicator = EventDeduplicator(
-            time_window_minutes=1, location_tolerance_km=20.0, magnitude_tolerance=0.5
+            time_window_minutes=1,
+            location_tolerance_km=20.0,
+            magnitude_tolerance=0.5,
+            latency_tracker=self.latency_tracker,
+            journal=journal,
+        )
+        # 跨数据源地震关联：推送记录与最终报以incident ID为键
+        self.correlator = IncidentCorrelator()
+        # 气象预警生命周期：按地区与预警类型跟踪生效中的预警
+        self.weather_alarms = WeatherAlarmTracker()
+
+        # 启动预热：重启后各数据源重放的旧事件只记录不推送
+        self.warm_start = WarmStartGate(
+            config.get("push_frequency_control", {}).get("warm_start_timeout", 30)
         )
 
         # 事件推送记录
@@ -39,6 +67,20 @@ class MessagePushManager:
         # 最终报记录
         self.final_reports: set[str] = set()
 
+        if journal:
+            state = journal.load()
+            self.deduplicator.restore(state.dedup)
+            self.event_push_records.update(state.push)
+            self.final_reports.update(state.final)
+            self.correlator.restore(state.push)
+            journal.set_snapshot_provider(
+                lambda: (
+                    self.deduplicator.recent_events,
+                    self.event_push_records,
+                    self.final_reports,
+                )
+            )
+
         # 推送频率控制配置
         self.push_every_n_reports = config.get("push_frequency_control", {}).get(
             "push_every_n_reports", 1
@@ -228,7 +270,7 @@ class MessagePushManager:
     def _get_event_id(self, event: DisasterEvent) -> str:
         """获取事件ID"""
         if isinstance(event.data, EarthquakeData):
-            return event.data.event_id or event.data.id
+            return event.incident_id or event.data.event_id or event.data.id
         elif isinstance(event.data, (TsunamiData, WeatherAlarmData)):
             return event.data.id
         return event.id
@@ -448,17 +490,7 @@ class MessagePushManager:
                 # 尝试从地名中提取省份
                 # 例如："四川凉山州盐源县" -> "四川"
                 # "新疆巴音郭楞州若羌县" -> "新疆"
-                province_list = [
-                    "北京", "天津", "河北", "山西", "内蒙古",
-                    "辽宁", "吉林", "黑龙江", "上海", "江苏",
-                    "浙江", "安徽", "福建", "江西", "山东",
-                    "河南", "湖北", "湖南", "广东", "广西",
-                    "海南", "重庆", "四川", "贵州", "云南",
-                    "西藏", "陕西", "甘肃", "青海", "宁夏",
-                    "新疆", "台湾", "香港", "澳门"
-                ]
-                
-                for province in province_list:
+                for province in CHINA_PROVINCES:
                     if place_name.startswith(province):
                         return province
                     
@@ -466,17 +498,7 @@ class MessagePushManager:
             # 气象预警通常在标题中包含省份信息
             weather = event.data
             if weather.headline:
-                province_list = [
-                    "北京", "天津", "河北", "山西", "内蒙古",
-                    "辽宁", "吉林", "黑龙江", "上海", "江苏",
-                    "浙江", "安徽", "福建", "江西", "山东",
-                    "河南", "湖北", "湖南", "广东", "广西",
-                    "海南", "重庆", "四川", "贵州", "云南",
-                    "西藏", "陕西", "甘肃", "青海", "宁夏",
-                    "新疆", "台湾", "香港", "澳门"
-                ]
-                
-                for province in province_list:
+                for province in CHINA_PROVINCES:
                     if province in weather.headline or province in weather.title:
                         return province
         
@@ -540,6 +562,10 @@ class MessagePushManager:
         """推送事件"""
         logger.debug(f"[灾害预警] 处理事件推送: {event.id}")
 
+        # 关联到跨数据源的同一次地震
+        if isinstance(event.data, EarthquakeData):
+            event.incident_id = self.correlator.correlate(event.data)
+
         # 先去重检查 - 只推送首次接收的事件
         if not self.deduplicator.should_push_event(event):
             logger.debug(f"[灾害预警] 事件 {event.id} 被去重器过滤")
@@ -550,9 +576,22 @@ class MessagePushManager:
             logger.debug(f"[灾害预警] 事件 {event.id} 未通过推送条件检查")
             return False
 
+        # 气象预警只推送状态转换，同级别续发只延长有效期。
+        # 只跟踪通过推送条件的预警，被过滤的预警的续发不会因此被当作已推送而跳过
+        if isinstance(event.data, WeatherAlarmData):
+            if self.weather_alarms.update(event.data) == TRANSITION_RENEW:
+                logger.info(f"[灾害预警] 气象预警 {event.id} 为同级别续发，不推送")
+                return False
+
         # 记录事件（用于后续去重）
         self.deduplicator.record_event(event)
 
+        # 预热期间的旧事件记入推送记录（后续报数从此累计），但不发送
+        if not self.warm_start.admit(event):
+            self._record_push(event, suppressed=True)
+            logger.info(f"[灾害预警] 启动预热中，事件 {event.id} 只记录不推送")
+            return False
+
         try:
             # 构建消息
             message = self._build_message(event)
@@ -706,8 +745,8 @@ class MessagePushManager:
         """发送消息到指定会话"""
         await self.context.send_message(session, message)
 
-    def _record_push(self, event: DisasterEvent):
-        """记录推送"""
+    def _record_push(self, event: DisasterEvent, suppressed: bool = False):
+        """记录推送（suppressed表示启动预热期间只记录未发送）"""
         event_id = self._get_event_id(event)
 
         # 记录推送信息
@@ -716,18 +755,35 @@ class MessagePushManager:
             "event_id": event_id,
             "disaster_type": event.disaster_type.value,
             "is_final": self._is_final_report(event),
+            "suppressed": suppressed,
         }
+        if isinstance(event.data, EarthquakeData):
+            # 重启后据此恢复数据源事件到incident的关联
+            push_info["source"] = event.source.value
+            push_info["source_event_id"] = event.data.event_id or event.data.id
+            incident = self.correlator.get(event_id)
+            if incident:
+                push_info["hypocenter"] = incident.hypocenter()
 
         self.event_push_records[event_id].append(push_info)
+        if self.journal:
+            self.journal.record_push(event_id, push_info)
 
         # 如果是最终报，标记为已推送最终报
-        if self._is_final_report(event):
+        if push_info["is_final"]:
             self.final_reports.add(event_id)
+            if self.journal:
+                self.journal.record_final(event_id)
 
     def get_push_stats(self) -> dict[str, Any]:
         """获取推送统计"""
         total_events = len(self.event_push_records)
-        total_pushes = sum(len(records) for records in self.event_push_records.values())
+        total_pushes = sum(
+            1
+            for records in self.event_push_records.values()
+            for record in records
+            if not record.get("suppressed")
+        )
         final_reports_pushed = len(self.final_reports)
 
         return {
@@ -735,6 +791,7 @@ class MessagePushManager:
             "total_pushes": total_pushes,
             "final_reports_pushed": final_reports_pushed,
             "recent_events": self._get_recent_events(),
+            "incidents": self.correlator.get_stats(),
         }
 
     def _get_recent_events(self, hours: int = 24) -> list[dict]:
@@ -748,9 +805,11 @@ class MessagePushManager:
             ]
 
             if recent_records:
+                incident = self.correlator.get(event_id)
                 recent_events.append(
                     {
                         "event_id": event_id,
+                        "incident": incident.to_dict() if incident else None,
                         "push_count": len(recent_records),
                         "last_push": max(
                             record["timestamp"] for record in recent_records
@@ -778,6 +837,8 @@ class MessagePushManager:
 
         # 清理最终报记录
         self.final_reports.clear()
+        if self.journal:
+            self.journal.record_final_clear()
 
         logger.info(f"[灾害预警] 已清理 {days} 天前的推送记录")
 
@@ -962,29 +1023,8 @@ class MessageFormatter:
     @staticmethod
     def _get_source_timezone(source) -> str:
         """获取数据源的时区信息 - 基于API文档分析"""
-        # 基于三份API文档的时区分析
-        timezone_mapping = {
-            # P2P地震情報 - UTC+9 (日本标准时间)
-            "p2p_earthquake": "UTC+9",
-            "p2p_eew": "UTC+9",
-            # 日本气象厅 - UTC+9
-            "wolfx_jma_eew": "UTC+9",
-            # 中国数据源 - UTC+8 (北京时间)
-            "fan_studio_cenc": "UTC+8",
-            "fan_studio_cea": "UTC+8",
-            "fan_studio_cwa": "UTC+8",
-            "fan_studio_weather": "UTC+8",
-            "fan_studio_tsunami": "UTC+8",
-            "wolfx_cenc_eew": "UTC+8",
-            "wolfx_cwa_eew": "UTC+8",
-            # USGS - UTC+8 (文档明确说明)
-            "fan_studio_usgs": "UTC+8",
-            # 其他国际数据源 - 默认为UTC+8
-            "global_quake": "UTC+8",
-        }
-
         if hasattr(source, "value"):
-            return timezone_mapping.get(source.value, "UTC+8")
+            return SOURCE_TIMEZONES.get(source.value, "UTC+8")
         return "UTC+8"
 
     @staticmethod
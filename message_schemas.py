@@ -0,0 +1,855 @@
+"""
+上游消息结构声明
+每种上游消息类型声明一份字段映射，一次遍历直接解码为统一数据模型，
+取代各处理器中的 dict.get 链和逐字段的异常处理。
+安装了msgspec时，由字段映射生成msgspec.Struct，在C层一次取出所有声明的字段；
+未安装或消息形状不符合时按字段映射逐字段查找
+"""
+
+import re
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - 可选依赖
+    msgspec = None
+
+from .models import (
+    DataSource,
+    DisasterEvent,
+    DisasterType,
+    EarthquakeData,
+    TsunamiData,
+    WeatherAlarmData,
+)
+
+_MISSING = object()
+
+
+class SchemaError(ValueError):
+    """消息不符合声明的结构"""
+
+
+@dataclass(frozen=True)
+class Field:
+    """字段映射：源数据路径 -> 模型字段"""
+
+    name: str  # 模型字段名
+    path: tuple[str, ...]  # 源数据中的键路径
+    convert: Callable[[Any, Any], Any] | None = None  # (值, 处理器) -> 转换后的值
+    default: Any = None
+    required: bool = False  # 缺失或转换结果为None时整条消息无效
+    default_factory: Callable[[], Any] | None = None  # 可变默认值（如列表）
+
+
+@dataclass(frozen=True)
+class Computed:
+    """派生字段：由整条源数据计算得出"""
+
+    name: str
+    func: Callable[[dict[str, Any], Any], Any]  # (源数据, 处理器) -> 值
+
+
+class MessageSchema:
+    """单一上游消息类型的结构声明"""
+
+    def __init__(
+        self,
+        name: str,
+        model: type,
+        fields: list[Field],
+        constants: dict[str, Any] | None = None,
+        computed: list[Computed] | None = None,
+    ):
+        self.name = name
+        self.model = model
+        # 时间字段绑定各自的格式键，解析器据此记住每个字段的时间格式
+        self.fields = tuple(
+            replace(field, convert=_datetime_converter(f"{name}.{field.name}"))
+            if field.convert is to_datetime
+            else field
+            for field in fields
+        )
+        self.constants = constants or {}
+        self.computed = tuple(computed or ())
+        # 某个字段的路径是另一字段路径的前缀时（同一个键既取整个对象又取其子键）无法生成Struct
+        paths = {field.path for field in self.fields}
+        nested_paths = any(
+            path[:depth] in paths for path in paths for depth in range(1, len(path))
+        )
+        self.struct_decoder = (
+            _StructDecoder(self.fields)
+            if msgspec is not None and not nested_paths
+            else None
+        )
+
+    def decode(self, data: dict[str, Any], ctx: Any = None, raw_data: Any = None):
+        """解码为模型实例，失败时抛出SchemaError"""
+        if not isinstance(data, dict):
+            raise SchemaError(f"{self.name}: 消息体不是对象")
+
+        if self.struct_decoder is not None:
+            try:
+                obj = msgspec.convert(data, self.struct_decoder.struct)
+            except msgspec.ValidationError:
+                # 中间层不是对象（如"earthquake"为字符串），按字段映射处理
+                pass
+            else:
+                return self._decode_struct(obj, data, ctx, raw_data)
+        return self.decode_table(data, ctx, raw_data)
+
+    def decode_table(
+        self, data: dict[str, Any], ctx: Any = None, raw_data: Any = None
+    ):
+        """按字段映射逐字段查找并解码（未安装msgspec时的路径）"""
+        values = dict(self.constants)
+        current = ""
+        try:
+            for field in self.fields:
+                current = field.name
+                value = _lookup(data, field.path)
+                if value is not _MISSING and value is not None and field.convert:
+                    value = field.convert(value, ctx)
+                if value is _MISSING or value is None:
+                    value = self._default(field)
+                values[field.name] = value
+
+            return self._finish(values, data, ctx, raw_data)
+        except SchemaError:
+            raise
+        except (ValueError, TypeError, AttributeError, IndexError) as e:
+            raise self._field_error(current, e) from e
+
+    def _decode_struct(self, obj: Any, data: dict[str, Any], ctx: Any, raw_data: Any):
+        decoder = self.struct_decoder
+        values = msgspec.structs.asdict(obj)
+        current = ""
+        try:
+            for attr in decoder.containers:
+                del values[attr]
+            for name, attrs in decoder.nested:
+                value = obj
+                for attr in attrs:
+                    value = getattr(value, attr)
+                    if value is None:
+                        break
+                values[name] = value
+
+            for field, result_type in decoder.converts:
+                current = field.name
+                value = values[field.name]
+                # 源数据已是转换结果的类型时（如字符串字段给出的就是字符串）转换结果不变，跳过调用
+                if value is not None and type(value) is not result_type:
+                    values[field.name] = field.convert(value, ctx)
+            for field in decoder.defaults:
+                if values[field.name] is None:
+                    values[field.name] = self._default(field)
+
+            values.update(self.constants)
+            return self._finish(values, data, ctx, raw_data)
+        except SchemaError:
+            raise
+        except (ValueError, TypeError, AttributeError, IndexError) as e:
+            raise self._field_error(current, e) from e
+
+    def _default(self, field: Field) -> Any:
+        if field.required:
+            raise SchemaError(f"{self.name}: 缺少必需字段 {field.name}")
+        return field.default_factory() if field.default_factory else field.default
+
+    def _field_error(self, current: str, error: Exception) -> SchemaError:
+        where = f"字段 {current}" if current else "构建模型"
+        return SchemaError(f"{self.name}: {where} 无效 ({error})")
+
+    def _finish(
+        self, values: dict[str, Any], data: dict[str, Any], ctx: Any, raw_data: Any
+    ):
+        """计算派生字段并构建模型"""
+        current = ""
+        try:
+            for field in self.computed:
+                current = field.name
+                values[field.name] = field.func(data, ctx)
+
+            current = ""
+            values["raw_data"] = data if raw_data is None else raw_data
+            return self.model(**values)
+        except SchemaError:
+            raise
+        except (ValueError, TypeError, AttributeError, IndexError) as e:
+            raise self._field_error(current, e) from e
+
+    def decode_event(
+        self, data: dict[str, Any], ctx: Any = None, raw_data: Any = None
+    ) -> DisasterEvent:
+        """解码并包装为统一灾害事件"""
+        obj = self.decode(data, ctx, raw_data)
+        return DisasterEvent(
+            id=obj.id,
+            data=obj,
+            source=obj.source,
+            disaster_type=obj.disaster_type,
+        )
+
+
+class _StructDecoder:
+    """由字段映射生成的msgspec.Struct：只声明用到的键，未声明的键（如P2P的观测点列表）在转换时直接跳过。
+    顶层键的属性直接以模型字段命名，asdict即得到字段值；嵌套路径每层一个Struct"""
+
+    def __init__(self, fields: tuple[Field, ...]):
+        struct_fields: list[tuple[str, Any, None]] = []
+        rename: dict[str, str] = {}
+        top_level: dict[str, str] = {}  # 顶层键 -> 属性名
+        tree: dict[str, Any] = {}
+        for field in fields:
+            if len(field.path) == 1:
+                if field.path[0] not in top_level:
+                    top_level[field.path[0]] = field.name
+                    struct_fields.append((field.name, Any, None))
+                    rename[field.name] = field.path[0]
+            else:
+                node = tree
+                for key in field.path[:-1]:
+                    node = node.setdefault(key, {})
+                node.setdefault(field.path[-1], None)
+
+        # 嵌套对象的属性以下划线开头，不与模型字段重名，解码后从字段值中移除
+        attrs: dict[tuple[str, ...], str] = {
+            (key,): attr for key, attr in top_level.items()
+        }
+        for index, (key, child) in enumerate(tree.items()):
+            attr = f"_n{index}"
+            attrs[(key,)] = attr
+            rename[attr] = key
+            struct_fields.append((attr, self._define(child, (key,), attrs) | None, None))
+        self.struct = msgspec.defstruct("SchemaStruct", struct_fields, rename=rename)
+        self.containers = tuple(f"_n{index}" for index in range(len(tree)))
+
+        # 嵌套路径与共用顶层键的字段：(字段名, 属性路径)
+        self.nested = tuple(
+            (
+                field.name,
+                tuple(attrs[field.path[: depth + 1]] for depth in range(len(field.path))),
+            )
+            for field in fields
+            if len(field.path) > 1 or top_level[field.path[0]] != field.name
+        )
+        # (字段, 转换结果类型)
+        self.converts = tuple(
+            (field, _RESULT_TYPES.get(field.convert))
+            for field in fields
+            if field.convert is not None
+        )
+        # 缺失时需要默认值或必需的字段
+        self.defaults = tuple(
+            field
+            for field in fields
+            if field.required or field.default is not None or field.default_factory
+        )
+
+    @staticmethod
+    def _define(
+        tree: dict[str, Any], prefix: tuple[str, ...], attrs: dict[tuple[str, ...], str]
+    ) -> type:
+        struct_fields = []
+        rename = {}
+        for index, (key, child) in enumerate(tree.items()):
+            # 源数据的键可能不是合法的属性名，属性统一命名后映射回原键
+            attr = f"f{index}"
+            attrs[prefix + (key,)] = attr
+            rename[attr] = key
+            if child is None:
+                struct_fields.append((attr, Any, None))
+            else:
+                nested = _StructDecoder._define(child, prefix + (key,), attrs)
+                struct_fields.append((attr, nested | None, None))
+        return msgspec.defstruct("SchemaStruct", struct_fields, rename=rename)
+
+
+def _lookup(data: Any, path: tuple[str, ...]) -> Any:
+    """按路径取值，任一层缺失时返回_MISSING"""
+    for key in path:
+        if not isinstance(data, dict):
+            return _MISSING
+        data = data.get(key, _MISSING)
+        if data is _MISSING:
+            return _MISSING
+    return data
+
+
+# ========== 通用转换函数 ==========
+
+
+def to_str(value: Any, ctx: Any = None) -> str:
+    return value if isinstance(value, str) else str(value)
+
+
+def to_int(value: Any, ctx: Any = None) -> int:
+    return int(value)
+
+
+def to_bool(value: Any, ctx: Any = None) -> bool:
+    return bool(value)
+
+
+def to_float(value: Any, ctx: Any = None) -> float:
+    """严格浮点转换，无效值使整条消息无效"""
+    return float(value)
+
+
+def to_float_or_none(value: Any, ctx: Any = None) -> float | None:
+    """宽松浮点转换，无效值视为缺失"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def to_rounded_float(value: Any, ctx: Any = None) -> float | None:
+    """宽松浮点转换并保留1位小数"""
+    result = to_float_or_none(value)
+    return round(result, 1) if result is not None else None
+
+
+def to_km_depth(value: Any, ctx: Any = None) -> float | None:
+    """深度转换 - 兼容"20km"字符串格式"""
+    if isinstance(value, str) and value.endswith("km"):
+        value = value[:-2]
+    return to_float_or_none(value)
+
+
+def to_datetime(value: Any, ctx: Any) -> datetime | None:
+    return ctx._parse_datetime(value) if value else None
+
+
+def _datetime_converter(format_key: str) -> Callable[[Any, Any], datetime | None]:
+    def convert(value: Any, ctx: Any) -> datetime | None:
+        return ctx._parse_datetime(value, format_key) if value else None
+
+    return convert
+
+
+_UTC8 = timezone(timedelta(hours=8))
+
+
+def to_epoch_datetime(value: Any, ctx: Any) -> datetime | None:
+    """Unix时间戳（秒或毫秒）转北京时间，字符串按普通时间格式解析"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        # 大于1e11视为毫秒时间戳
+        timestamp = value / 1000 if value > 1e11 else value
+        return datetime.fromtimestamp(timestamp, _UTC8).replace(tzinfo=None)
+    return ctx._parse_datetime(value) if value else None
+
+
+_JMA_SCALE_PATTERN = re.compile(r"(\d+)(弱|強)?")
+
+
+def to_jma_scale(value: Any, ctx: Any = None) -> float | None:
+    """解析日本震度，如 "5弱", "6強", "7" """
+    if not value or not isinstance(value, str):
+        return None
+    match = _JMA_SCALE_PATTERN.search(value)
+    if not match:
+        return None
+    base = int(match.group(1))
+    suffix = match.group(2)
+    if suffix == "弱":
+        return base - 0.5
+    if suffix == "強":
+        return base + 0.5
+    return float(base)
+
+
+# P2P震度值映射表 (根据API文档)
+P2P_SCALE_MAPPING = {
+    10: 1.0,  # 震度1
+    20: 2.0,  # 震度2
+    30: 3.0,  # 震度3
+    40: 4.0,  # 震度4
+    45: 4.5,  # 震度5弱
+    50: 5.0,  # 震度5強
+    55: 5.5,  # 震度6弱
+    60: 6.0,  # 震度6強
+    70: 7.0,  # 震度7
+    -1: None,  # 震度情報不存在
+}
+
+
+# 转换函数 -> 转换结果的类型：源数据已是该类型时转换结果与输入相同
+_RESULT_TYPES: dict[Callable | None, type] = {
+    to_str: str,
+    to_float: float,
+    to_int: int,
+    to_bool: bool,
+}
+
+
+# ========== 派生字段 ==========
+
+
+def _compact_time(time_part: str, min_len: int) -> datetime | None:
+    """解析紧凑时间串，如 20250425123759 / 202507300724"""
+    if len(time_part) < min_len:
+        return None
+    try:
+        return datetime(
+            int(time_part[0:4]),
+            int(time_part[4:6]),
+            int(time_part[6:8]),
+            int(time_part[8:10]),
+            int(time_part[10:12]) if len(time_part) >= 12 else 0,
+            int(time_part[12:14]) if len(time_part) >= 14 else 0,
+        )
+    except ValueError:
+        return None
+
+
+def _weather_issue_time(data: dict[str, Any], ctx: Any) -> datetime | None:
+    """气象预警发布时间 - 从ID中提取（如：44170041600000_20250425123759），失败时使用生效时间"""
+    id_str = str(data.get("id", ""))
+    if "_" in id_str:
+        issue_time = _compact_time(id_str.split("_")[-1], 12)
+        if issue_time:
+            return issue_time
+    return to_datetime(data.get("effective"), ctx)
+
+
+def _fan_tsunami_issue_time(data: dict[str, Any], ctx: Any) -> datetime | None:
+    """海啸发布时间 - 优先timeInfo，其次从code提取，最后使用当前时间"""
+    time_info = data.get("timeInfo") or {}
+    issue_time_str = time_info.get("issueTime") or time_info.get("publishTime")
+    if issue_time_str:
+        return ctx._parse_datetime(issue_time_str)
+    return _compact_time(str(data.get("code", "")), 10) or datetime.now()
+
+
+def _p2p_record_id(data: dict[str, Any], ctx: Any) -> str:
+    """P2P记录ID - WebSocket推送为_id，HTTP历史接口为id"""
+    return str(data.get("_id") or data.get("id") or "")
+
+
+def _p2p_scale(data: dict[str, Any], ctx: Any) -> float | None:
+    max_scale_raw = (data.get("earthquake") or {}).get("maxScale", -1)
+    return P2P_SCALE_MAPPING.get(max_scale_raw) if max_scale_raw != -1 else None
+
+
+def _p2p_tsunami_issue_time(data: dict[str, Any], ctx: Any) -> datetime | None:
+    """津波予報发布时间 - issue.time（如 "2019/06/18 22:24:00"），后备根级别time"""
+    issue_time_str = (data.get("issue") or {}).get("time") or data.get("time")
+    if issue_time_str:
+        return ctx._parse_datetime(issue_time_str)
+    return datetime.now()
+
+
+def _p2p_tsunami_level(data: dict[str, Any], ctx: Any) -> str:
+    areas = data.get("areas") or []
+    return "Warning" if any(area.get("grade") == "Warning" for area in areas) else "Watch"
+
+
+def _p2p_tsunami_forecasts(data: dict[str, Any], ctx: Any) -> list[dict[str, Any]]:
+    return [
+        {
+            "name": area.get("name", ""),
+            "grade": area.get("grade", ""),
+            "immediate": area.get("immediate", False),
+        }
+        for area in data.get("areas") or []
+    ]
+
+
+def _p2p_eew_scale(data: dict[str, Any], ctx: Any) -> float | None:
+    """緊急地震速報最大震度 - scaleTo为P2P震度编码时需要转换"""
+    raw_scales = [
+        area.get("scaleTo", 0)
+        for area in data.get("areas") or []
+        if area.get("scaleTo", 0) > 0
+    ]
+    if not raw_scales:
+        return None
+    max_scale_raw = max(raw_scales)
+    scale = P2P_SCALE_MAPPING.get(max_scale_raw, max_scale_raw)
+    return scale if scale is not None and scale > 0 else None
+
+
+def _cwa_scale(value: Any, ctx: Any = None) -> float | None:
+    """解析台湾震度"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+# ========== FAN Studio ==========
+
+FAN_CENC_SCHEMA = MessageSchema(
+    "FAN Studio CENC",
+    EarthquakeData,
+    constants={
+        "source": DataSource.FAN_STUDIO_CENC,
+        "disaster_type": DisasterType.EARTHQUAKE,
+    },
+    fields=[
+        Field("id", ("id",), to_str, ""),
+        Field("event_id", ("eventId",), to_str, ""),
+        Field("shock_time", ("shockTime",), to_datetime),
+        Field("latitude", ("latitude",), to_float, 0.0),
+        Field("longitude", ("longitude",), to_float, 0.0),
+        Field("depth", ("depth",), to_float_or_none),
+        Field("magnitude", ("magnitude",), to_float_or_none),
+        Field("place_name", ("placeName",), to_str, ""),
+        Field("info_type", ("infoTypeName",), to_str, ""),
+    ],
+)
+
+FAN_CEA_SCHEMA = MessageSchema(
+    "FAN Studio CEA",
+    EarthquakeData,
+    constants={
+        "source": DataSource.FAN_STUDIO_CEA,
+        "disaster_type": DisasterType.EARTHQUAKE_WARNING,
+    },
+    fields=[
+        Field("id", ("id",), to_str, ""),
+        Field("event_id", ("eventId",), to_str, ""),
+        Field("shock_time", ("shockTime",), to_datetime),
+        Field("latitude", ("latitude",), to_float, 0.0),
+        Field("longitude", ("longitude",), to_float, 0.0),
+        Field("depth", ("depth",), to_float_or_none),
+        Field("magnitude", ("magnitude",), to_float_or_none),
+        Field("intensity", ("epiIntensity",), to_float_or_none),
+        Field("place_name", ("placeName",), to_str, ""),
+        Field("province", ("province",), to_str),
+        Field("updates", ("updates",), to_int, 1),
+    ],
+)
+
+FAN_CWA_SCHEMA = MessageSchema(
+    "FAN Studio CWA",
+    EarthquakeData,
+    constants={
+        "source": DataSource.FAN_STUDIO_CWA,
+        "disaster_type": DisasterType.EARTHQUAKE_WARNING,
+    },
+    fields=[
+        Field("id", ("id",), to_str, ""),
+        Field("event_id", ("eventId",), to_str, ""),
+        Field("shock_time", ("shockTime",), to_datetime),
+        Field("create_time", ("createTime",), to_datetime),
+        Field("latitude", ("latitude",), to_float, 0.0),
+        Field("longitude", ("longitude",), to_float, 0.0),
+        Field("depth", ("depth",), to_float_or_none),
+        Field("magnitude", ("magnitude",), to_float_or_none),
+        Field("scale", ("maxIntensity",), to_float_or_none),
+        Field("place_name", ("placeName",), to_str, ""),
+        Field("updates", ("updates",), to_int, 1),
+    ],
+)
+
+FAN_USGS_SCHEMA = MessageSchema(
+    "FAN Studio USGS",
+    EarthquakeData,
+    constants={
+        "source": DataSource.FAN_STUDIO_USGS,
+        "disaster_type": DisasterType.EARTHQUAKE,
+    },
+    fields=[
+        Field("id", ("id",), to_str, ""),
+        Field("event_id", ("id",), to_str, ""),
+        Field("shock_time", ("shockTime",), to_datetime),
+        Field("update_time", ("updateTime",), to_datetime),
+        Field("latitude", ("latitude",), to_float, 0.0),
+        Field("longitude", ("longitude",), to_float, 0.0),
+        # 优化USGS数据精度 - 四舍五入到1位小数
+        Field("depth", ("depth",), to_rounded_float),
+        Field("magnitude", ("magnitude",), to_rounded_float),
+        Field("place_name", ("placeName",), to_str, ""),
+    ],
+)
+
+FAN_WEATHER_SCHEMA = MessageSchema(
+    "FAN Studio 气象预警",
+    WeatherAlarmData,
+    constants={"source": DataSource.FAN_STUDIO_WEATHER},
+    fields=[
+        Field("id", ("id",), to_str, ""),
+        Field("headline", ("headline",), to_str, ""),
+        Field("title", ("title",), to_str, ""),
+        Field("description", ("description",), to_str, ""),
+        Field("type", ("type",), to_str, ""),
+        # API文档中只有effective字段（生效时间），发布时间从ID中提取
+        Field("effective_time", ("effective",), to_datetime),
+        Field("longitude", ("longitude",), to_float_or_none),
+        Field("latitude", ("latitude",), to_float_or_none),
+    ],
+    computed=[Computed("issue_time", _weather_issue_time)],
+)
+
+FAN_TSUNAMI_SCHEMA = MessageSchema(
+    "FAN Studio 海啸预警",
+    TsunamiData,
+    constants={"source": DataSource.FAN_STUDIO_TSUNAMI},
+    fields=[
+        Field("id", ("id",), to_str, ""),
+        Field("code", ("code",), to_str, ""),
+        Field("title", ("warningInfo", "title"), to_str, ""),
+        Field("level", ("warningInfo", "level"), to_str, ""),
+        Field("subtitle", ("warningInfo", "subtitle"), to_str),
+        Field("org_unit", ("warningInfo", "orgUnit"), to_str, ""),
+        Field("forecasts", ("forecasts",), default_factory=list),
+        Field(
+            "monitoring_stations", ("waterLevelMonitoring",), default_factory=list
+        ),
+    ],
+    computed=[Computed("issue_time", _fan_tsunami_issue_time)],
+)
+
+# ========== P2P地震情報 ==========
+
+P2P_EARTHQUAKE_SCHEMA = MessageSchema(
+    "P2P地震情報(551)",
+    EarthquakeData,
+    constants={
+        "source": DataSource.P2P_EARTHQUAKE,
+        "disaster_type": DisasterType.EARTHQUAKE,
+    },
+    fields=[
+        Field("shock_time", ("earthquake", "time"), to_datetime),
+        Field(
+            "latitude",
+            ("earthquake", "hypocenter", "latitude"),
+            to_float_or_none,
+            required=True,
+        ),
+        Field(
+            "longitude",
+            ("earthquake", "hypocenter", "longitude"),
+            to_float_or_none,
+            required=True,
+        ),
+        Field("depth", ("earthquake", "hypocenter", "depth"), to_float_or_none),
+        Field(
+            "magnitude",
+            ("earthquake", "hypocenter", "magnitude"),
+            to_float_or_none,
+            required=True,
+        ),
+        Field("place_name", ("earthquake", "hypocenter", "name"), to_str, "未知地点"),
+        Field("max_scale", ("earthquake", "maxScale"), None, -1),
+        Field("domestic_tsunami", ("earthquake", "domesticTsunami"), to_str),
+        Field("foreign_tsunami", ("earthquake", "foreignTsunami"), to_str),
+    ],
+    computed=[
+        Computed("id", _p2p_record_id),
+        Computed("event_id", _p2p_record_id),
+        Computed("scale", _p2p_scale),
+    ],
+)
+
+P2P_TSUNAMI_SCHEMA = MessageSchema(
+    "P2P津波予報(552)",
+    TsunamiData,
+    constants={"source": DataSource.P2P_EARTHQUAKE},  # P2P的津波也用这个源
+    fields=[
+        Field("id", ("id",), to_str, ""),
+        Field("code", ("code",), to_str, ""),
+        Field("org_unit", ("issue", "source"), to_str, "気象庁"),
+    ],
+    computed=[
+        Computed(
+            "title", lambda data, ctx: f"津波予報 - {(data.get('issue') or {}).get('type', '')}"
+        ),
+        Computed("level", _p2p_tsunami_level),
+        Computed("issue_time", _p2p_tsunami_issue_time),
+        Computed("forecasts", _p2p_tsunami_forecasts),
+    ],
+)
+
+P2P_EEW_SCHEMA = MessageSchema(
+    "P2P緊急地震速報(556)",
+    EarthquakeData,
+    constants={
+        "source": DataSource.P2P_EEW,
+        "disaster_type": DisasterType.EARTHQUAKE_WARNING,
+    },
+    fields=[
+        Field("id", ("id",), to_str, ""),
+        Field("event_id", ("issue", "eventId"), to_str, ""),
+        Field("shock_time", ("earthquake", "originTime"), to_datetime),
+        Field("latitude", ("earthquake", "hypocenter", "latitude"), to_float, 0.0),
+        Field("longitude", ("earthquake", "hypocenter", "longitude"), to_float, 0.0),
+        Field("depth", ("earthquake", "hypocenter", "depth"), to_float_or_none),
+        Field("magnitude", ("earthquake", "hypocenter", "magnitude"), to_float_or_none),
+        Field("place_name", ("earthquake", "hypocenter", "name"), to_str, ""),
+        Field("is_final", ("is_final",), to_bool, False),
+    ],
+    computed=[Computed("scale", _p2p_eew_scale)],
+)
+
+# ========== Wolfx ==========
+
+WOLFX_JMA_EEW_SCHEMA = MessageSchema(
+    "Wolfx JMA EEW",
+    EarthquakeData,
+    constants={
+        "source": DataSource.WOLFX_JMA_EEW,
+        "disaster_type": DisasterType.EARTHQUAKE_WARNING,
+    },
+    fields=[
+        Field("id", ("EventID",), to_str, ""),
+        Field("event_id", ("EventID",), to_str, ""),
+        Field("shock_time", ("OriginTime",), to_datetime),
+        Field("latitude", ("Latitude",), to_float, 0.0),
+        Field("longitude", ("Longitude",), to_float, 0.0),
+        Field("depth", ("Depth",), to_float_or_none),
+        Field("magnitude", ("Magnitude",), to_float_or_none),
+        Field("place_name", ("Hypocenter",), to_str, ""),
+        Field("scale", ("MaxIntensity",), to_jma_scale),
+        Field("updates", ("Serial",), to_int, 1),
+        Field("is_final", ("isFinal",), to_bool, False),
+        Field("is_cancel", ("isCancel",), to_bool, False),
+        Field("is_training", ("isTraining",), to_bool, False),
+    ],
+)
+
+WOLFX_CENC_EEW_SCHEMA = MessageSchema(
+    "Wolfx CENC EEW",
+    EarthquakeData,
+    constants={
+        "source": DataSource.WOLFX_CENC_EEW,
+        "disaster_type": DisasterType.EARTHQUAKE_WARNING,
+    },
+    fields=[
+        Field("id", ("ID",), to_str, ""),
+        Field("event_id", ("EventID",), to_str, ""),
+        Field("shock_time", ("OriginTime",), to_datetime),
+        Field("latitude", ("Latitude",), to_float, 0.0),
+        Field("longitude", ("Longitude",), to_float, 0.0),
+        Field("depth", ("Depth",), to_float_or_none),
+        Field("magnitude", ("Magnitude",), to_float_or_none),
+        Field("intensity", ("MaxIntensity",), to_float_or_none),
+        Field("place_name", ("HypoCenter",), to_str, ""),
+        Field("updates", ("ReportNum",), to_int, 1),
+    ],
+)
+
+WOLFX_CWA_EEW_SCHEMA = MessageSchema(
+    "Wolfx CWA EEW",
+    EarthquakeData,
+    constants={
+        "source": DataSource.WOLFX_CWA_EEW,
+        "disaster_type": DisasterType.EARTHQUAKE_WARNING,
+    },
+    fields=[
+        Field("id", ("ID",), to_str, ""),
+        Field("event_id", ("EventID",), to_str, ""),
+        Field("shock_time", ("OriginTime",), to_datetime),
+        Field("latitude", ("Latitude",), to_float, 0.0),
+        Field("longitude", ("Longitude",), to_float, 0.0),
+        Field("depth", ("Depth",), to_float_or_none),
+        Field("magnitude", ("Magnitude",), to_float_or_none),
+        Field("scale", ("MaxIntensity",), _cwa_scale),
+        Field("place_name", ("HypoCenter",), to_str, ""),
+        Field("updates", ("ReportNum",), to_int, 1),
+    ],
+)
+
+# 地震列表中的单条记录（No1、No2...）
+WOLFX_CENC_EQLIST_SCHEMA = MessageSchema(
+    "Wolfx CENC地震列表",
+    EarthquakeData,
+    constants={
+        "source": DataSource.WOLFX_CENC_EEW,
+        "disaster_type": DisasterType.EARTHQUAKE,
+    },
+    fields=[
+        Field("id", ("md5",), to_str, ""),
+        Field("event_id", ("md5",), to_str, ""),
+        Field("shock_time", ("time",), to_datetime),
+        Field("latitude", ("latitude",), to_float, 0.0),
+        Field("longitude", ("longitude",), to_float, 0.0),
+        Field("depth", ("depth",), to_float_or_none),
+        Field("magnitude", ("magnitude",), to_float_or_none),
+        Field("intensity", ("intensity",), to_float_or_none),
+        Field("place_name", ("location",), to_str, ""),
+        Field("info_type", ("type",), to_str, ""),
+    ],
+)
+
+WOLFX_JMA_EQLIST_SCHEMA = MessageSchema(
+    "Wolfx JMA地震列表",
+    EarthquakeData,
+    constants={
+        "source": DataSource.WOLFX_JMA_EEW,
+        "disaster_type": DisasterType.EARTHQUAKE,
+    },
+    fields=[
+        Field("id", ("md5",), to_str, ""),
+        Field("event_id", ("md5",), to_str, ""),
+        Field("shock_time", ("time",), to_datetime),
+        Field("latitude", ("latitude",), to_float_or_none),
+        Field("longitude", ("longitude",), to_float_or_none),
+        # 修复深度字段格式 - 处理"20km"字符串格式
+        Field("depth", ("depth",), to_km_depth),
+        Field("magnitude", ("magnitude",), to_float_or_none),
+        Field("scale", ("shindo",), to_jma_scale),
+        Field("place_name", ("location",), to_str, ""),
+    ],
+)
+
+
+# ========== Global Quake ==========
+
+GLOBAL_QUAKE_HYPOCENTER_SCHEMA = MessageSchema(
+    "Global Quake震源",
+    EarthquakeData,
+    constants={
+        "source": DataSource.GLOBAL_QUAKE,
+        "disaster_type": DisasterType.EARTHQUAKE,
+    },
+    fields=[
+        Field("id", ("uuid",), to_str, required=True),
+        Field("event_id", ("uuid",), to_str, ""),
+        Field("updates", ("revisionID",), to_int, 1),
+        Field("shock_time", ("origin",), to_epoch_datetime),
+        Field("latitude", ("lat",), to_float),
+        Field("longitude", ("lon",), to_float),
+        Field("depth", ("depth",), to_float_or_none),
+        Field("magnitude", ("magnitude",), to_rounded_float),
+        Field("max_intensity", ("maxIntensity",), to_float_or_none),
+        Field("place_name", ("regionName",), to_str, ""),
+    ],
+)
+
+# 无类型字段的旧格式
+GLOBAL_QUAKE_LEGACY_SCHEMA = MessageSchema(
+    "Global Quake地震",
+    EarthquakeData,
+    constants={
+        "source": DataSource.GLOBAL_QUAKE,
+        "disaster_type": DisasterType.EARTHQUAKE,
+    },
+    fields=[
+        Field("id", ("id",), to_str, ""),
+        Field("event_id", ("event_id",), to_str, ""),
+        Field("shock_time", ("time",), to_datetime),
+        Field("latitude", ("latitude",), to_float, 0),
+        Field("longitude", ("longitude",), to_float, 0),
+        Field("depth", ("depth",), to_float_or_none),
+        Field("magnitude", ("magnitude",), to_float_or_none),
+        Field("intensity", ("intensity",), to_float_or_none),
+        Field("place_name", ("location",), to_str, ""),
+    ],
+)
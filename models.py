@@ -3,10 +3,12 @@
 """
 
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 from typing import Any
 
+from . import json_codec
+
 
 class DisasterType(Enum):
     """灾害类型"""
@@ -34,6 +36,57 @@ class DataSource(Enum):
     GLOBAL_QUAKE = "global_quake"  # Global Quake服务器
 
 
+# 各数据源时间字段所用的时区（基于API文档分析）
+SOURCE_TIMEZONES = {
+    # P2P地震情報 - UTC+9 (日本标准时间)
+    "p2p_earthquake": "UTC+9",
+    "p2p_eew": "UTC+9",
+    # 日本气象厅 - UTC+9
+    "wolfx_jma_eew": "UTC+9",
+    # 中国数据源 - UTC+8 (北京时间)
+    "fan_studio_cenc": "UTC+8",
+    "fan_studio_cea": "UTC+8",
+    "fan_studio_cwa": "UTC+8",
+    "fan_studio_weather": "UTC+8",
+    "fan_studio_tsunami": "UTC+8",
+    "wolfx_cenc_eew": "UTC+8",
+    "wolfx_cwa_eew": "UTC+8",
+    # USGS - UTC+8 (文档明确说明)
+    "fan_studio_usgs": "UTC+8",
+    # 其他国际数据源 - 默认为UTC+8
+    "global_quake": "UTC+8",
+}
+
+
+def source_timezone(source_value: str) -> timezone:
+    """数据源时间字段的时区（未知数据源按UTC+8）"""
+    tz_name = SOURCE_TIMEZONES.get(source_value, "UTC+8")
+    return timezone(timedelta(hours=int(tz_name[3:] or 0)))
+
+
+# 省份名称（用于从地名、预警标题中提取省份）
+CHINA_PROVINCES = (
+    "北京", "天津", "河北", "山西", "内蒙古",
+    "辽宁", "吉林", "黑龙江", "上海", "江苏",
+    "浙江", "安徽", "福建", "江西", "山东",
+    "河南", "湖北", "湖南", "广东", "广西",
+    "海南", "重庆", "四川", "贵州", "云南",
+    "西藏", "陕西", "甘肃", "青海", "宁夏",
+    "新疆", "台湾", "香港", "澳门",
+)  # fmt: skip
+
+# 行政区划代码前两位 -> 省份名称（与CHINA_PROVINCES一致）
+PROVINCE_CODES = {
+    "11": "北京", "12": "天津", "13": "河北", "14": "山西", "15": "内蒙古",
+    "21": "辽宁", "22": "吉林", "23": "黑龙江", "31": "上海", "32": "江苏",
+    "33": "浙江", "34": "安徽", "35": "福建", "36": "江西", "37": "山东",
+    "41": "河南", "42": "湖北", "43": "湖南", "44": "广东", "45": "广西",
+    "46": "海南", "50": "重庆", "51": "四川", "52": "贵州", "53": "云南",
+    "54": "西藏", "61": "陕西", "62": "甘肃", "63": "青海", "64": "宁夏",
+    "65": "新疆", "71": "台湾", "81": "香港", "82": "澳门",
+}  # fmt: skip
+
+
 @dataclass
 class EarthquakeData:
     """地震数据"""
@@ -68,6 +121,7 @@ class EarthquakeData:
     updates: int = 1
     is_final: bool = False
     is_cancel: bool = False
+    is_training: bool = False  # 训练/演练报
 
     # 其他信息
     info_type: str = ""  # 测定类型：自动/正式等
@@ -145,3 +199,58 @@ class DisasterEvent:
     source: DataSource
     disaster_type: DisasterType
     receive_time: datetime = field(default_factory=datetime.now)
+    # 跨数据源关联后的地震ID（仅地震事件）
+    incident_id: str | None = None
+
+
+_UNDECODED = object()
+
+
+@dataclass
+class MessageEnvelope:
+    """入站消息信封 - 每帧只解码一次，在记录器、处理器和去重之间共享"""
+
+    raw: str | bytes | None
+    connection_name: str
+    receive_time: datetime = field(default_factory=datetime.now)
+    url: str | None = None
+
+    # 解码结果缓存（首次访问data时填充）
+    _data: Any = field(default=_UNDECODED, repr=False)
+    decode_error: Exception | None = field(default=None, repr=False)
+
+    @classmethod
+    def from_data(
+        cls, data: Any, connection_name: str, url: str | None = None
+    ) -> "MessageEnvelope":
+        """由已解码的数据构建信封（如HTTP响应、数据快照）"""
+        return cls(raw=None, connection_name=connection_name, url=url, _data=data)
+
+    @property
+    def text(self) -> str:
+        """原始消息文本"""
+        if isinstance(self.raw, bytes):
+            return self.raw.decode("utf-8", errors="replace")
+        if self.raw is None:
+            return json_codec.dumps(self._data) if self.is_decoded else ""
+        return self.raw
+
+    @property
+    def is_decoded(self) -> bool:
+        return self._data is not _UNDECODED
+
+    @property
+    def data(self) -> Any:
+        """解码后的数据，解析失败时为None（错误保存在decode_error中）"""
+        if self._data is _UNDECODED:
+            try:
+                self._data = json_codec.loads(self.raw) if self.raw else None
+            except (*json_codec.JSONDecodeError, UnicodeDecodeError, TypeError) as e:
+                self._data = None
+                self.decode_error = e
+        return self._data
+
+    @property
+    def size(self) -> int:
+        """原始消息长度"""
+        return len(self.raw) if self.raw else 0
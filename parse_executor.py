@@ -0,0 +1,192 @@
+"""
+消息解析执行器
+大消息（P2P地震情報观测点、海啸预报区域、地震列表等）转移到线程池或进程池中解析，
+小的预警帧仍在事件循环中直接解析以保证最低延迟，同时统计解析对事件循环的阻塞时间
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+from astrbot.api import logger
+
+from .data_handlers import DATA_HANDLERS, BaseDataHandler, ParseResult
+from .models import DataSource, MessageEnvelope
+
+MODE_INLINE = "inline"
+MODE_THREAD = "thread"
+MODE_PROCESS = "process"
+
+# 进程池中按处理器类型缓存的无记录器处理器实例
+_worker_handlers: dict[str, BaseDataHandler] = {}
+
+
+def _decode_in_thread(
+    handler: BaseDataHandler, envelope: MessageEnvelope, source: DataSource | None
+) -> tuple[ParseResult, float]:
+    start = time.perf_counter()
+    event = handler.decode_message(envelope, source)
+    return event, time.perf_counter() - start
+
+
+def _decode_in_process(
+    handler_name: str,
+    raw: str | bytes,
+    connection_name: str,
+    url: str | None,
+    source_value: str | None,
+) -> tuple[ParseResult, float]:
+    """进程池任务 - 只传递可序列化的原始数据"""
+    start = time.perf_counter()
+    handler = _worker_handlers.get(handler_name)
+    if handler is None:
+        handler = DATA_HANDLERS[handler_name]()
+        _worker_handlers[handler_name] = handler
+
+    envelope = MessageEnvelope(raw=raw, connection_name=connection_name, url=url)
+    source = DataSource(source_value) if source_value else None
+    event = handler.decode_message(envelope, source)
+    return event, time.perf_counter() - start
+
+
+class _TimingStats:
+    """耗时统计"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed: float):
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg_ms": (self.total / self.count * 1000) if self.count else 0.0,
+            "max_ms": self.max * 1000,
+        }
+
+
+class ParseExecutor:
+    """按消息大小选择解析位置的执行器"""
+
+    def __init__(self, config: dict[str, Any]):
+        mode = config.get("parse_executor_mode", MODE_INLINE)
+        self.mode = mode if mode in (MODE_THREAD, MODE_PROCESS) else MODE_INLINE
+        self.threshold = max(0, config.get("parse_offload_threshold_kb", 16)) * 1024
+        self.max_workers = max(1, config.get("parse_workers", 2))
+        self._executor: Executor | None = None
+        # 进程模式下不能跨进程执行的处理器使用的线程池
+        self._thread_executor: Executor | None = None
+
+        # 在事件循环中直接解析的阻塞时间
+        self.inline_stats = _TimingStats()
+        # 转移解析的消息：实际解析耗时（即不转移时会阻塞事件循环的时间）
+        self.offload_parse_stats = _TimingStats()
+        # 转移解析的消息：事件循环上的实际阻塞时间（提交任务与接收结果）
+        self.offload_loop_stats = _TimingStats()
+
+    def _get_thread_executor(self) -> Executor:
+        if self.mode == MODE_THREAD:
+            return self._get_executor()
+        if self._thread_executor is None:
+            self._thread_executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="disaster_parse"
+            )
+        return self._thread_executor
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == MODE_PROCESS:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="disaster_parse"
+                )
+            logger.info(
+                f"[灾害预警] 解析执行器已启动: {self.mode}，工作者 {self.max_workers} 个，转移阈值 {self.threshold} 字节"
+            )
+        return self._executor
+
+    def _should_offload(self, envelope: MessageEnvelope) -> bool:
+        return (
+            self.mode != MODE_INLINE
+            and envelope.raw is not None
+            and envelope.size >= self.threshold
+        )
+
+    async def parse(
+        self,
+        handler_name: str,
+        handler: BaseDataHandler,
+        envelope: MessageEnvelope,
+        source: DataSource | None = None,
+    ) -> ParseResult:
+        """解析并记录原始消息，大消息转移到执行器中解析
+
+        转移解析的消息在解析完成后才记录：线程池中解码的结果缓存在信封中由记录器复用，
+        进程池模式下信封未在主进程解码，记录器直接记录原始文本
+        """
+        if not self._should_offload(envelope):
+            start = time.perf_counter()
+            event = handler.parse_message(envelope, source)
+            self.inline_stats.add(time.perf_counter() - start)
+            return event
+
+        loop = asyncio.get_running_loop()
+        loop_start = time.perf_counter()
+        if self.mode == MODE_PROCESS and handler.process_safe:
+            future = loop.run_in_executor(
+                self._get_executor(),
+                _decode_in_process,
+                handler_name,
+                envelope.raw,
+                envelope.connection_name,
+                envelope.url,
+                source.value if source else None,
+            )
+        else:
+            future = loop.run_in_executor(
+                self._get_thread_executor(), _decode_in_thread, handler, envelope, source
+            )
+        loop_blocked = time.perf_counter() - loop_start
+
+        try:
+            event, parse_elapsed = await future
+        except Exception as e:
+            logger.error(
+                f"[灾害预警] 执行器解析失败 {envelope.connection_name}，改为直接解析: {e}"
+            )
+            return handler.parse_message(envelope, source)
+
+        # 原始消息记录涉及文件IO和共享状态，保留在主线程
+        log_start = time.perf_counter()
+        handler.log_raw_message(envelope, source)
+        loop_blocked += time.perf_counter() - log_start
+
+        self.offload_parse_stats.add(parse_elapsed)
+        self.offload_loop_stats.add(loop_blocked)
+        return event
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取解析耗时统计"""
+        return {
+            "mode": self.mode,
+            "threshold_bytes": self.threshold,
+            "inline": self.inline_stats.to_dict(),
+            "offloaded_parse": self.offload_parse_stats.to_dict(),
+            "offloaded_loop": self.offload_loop_stats.to_dict(),
+        }
+
+    def shutdown(self):
+        """关闭执行器"""
+        for executor in (self._executor, self._thread_executor):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._thread_executor = None
@@ -0,0 +1,212 @@
+"""
+HTTP轮询调度器
+所有HTTP轮询数据源由同一个循环调度：
+- 列表有新内容、相关WebSocket断线或收到相关地震时缩短间隔（可能有遗漏的数据）
+- 列表持续未变化时逐步放宽间隔
+- 每个数据源有各自的最小/最大间隔，所有数据源共享每小时请求预算
+"""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from astrbot.api import logger
+
+# 列表未变化时间隔的放宽倍数，请求失败时的放宽倍数
+_UNCHANGED_BACKOFF = 1.5
+_FAILURE_BACKOFF = 2.0
+# 请求预算的统计窗口（秒）
+_BUDGET_WINDOW = 3600.0
+
+# 轮询结果
+POLL_CHANGED = "changed"  # 有新内容
+POLL_UNCHANGED = "unchanged"  # 内容未变化（含304）
+POLL_FAILED = "failed"  # 请求失败
+
+
+class PollSource:
+    """单个HTTP轮询数据源"""
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[], Awaitable[str]],
+        min_interval: float,
+        max_interval: float,
+        base_interval: float,
+        initial_delay: float | None = None,
+    ):
+        self.name = name
+        self.fetch = fetch
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.interval = min(max(base_interval, self.min_interval), self.max_interval)
+        self.next_due = time.monotonic() + (
+            self.interval if initial_delay is None else initial_delay
+        )
+        self.last_poll: float | None = None
+
+        # 统计信息
+        self.polls = 0
+        self.results: dict[str, int] = {
+            POLL_CHANGED: 0,
+            POLL_UNCHANGED: 0,
+            POLL_FAILED: 0,
+        }
+        self.nudges = 0
+
+    @property
+    def completed(self) -> int:
+        """已完成的轮询次数"""
+        return sum(self.results.values())
+
+    def to_dict(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "interval": self.interval,
+            "next_in": max(0.0, self.next_due - now),
+            "last_poll_age": now - self.last_poll if self.last_poll else None,
+            "polls": self.polls,
+            "nudges": self.nudges,
+            **self.results,
+        }
+
+
+class PollScheduler:
+    """自适应HTTP轮询调度器"""
+
+    def __init__(self, config: dict[str, Any]):
+        self.config = config
+        self.max_requests_per_hour = max(0, config.get("max_requests_per_hour", 120))
+        self.sources: dict[str, PollSource] = {}
+        self._request_times: deque[float] = deque()
+        self._wake = asyncio.Event()
+        self.budget_deferrals = 0
+
+    def register(
+        self,
+        name: str,
+        fetch: Callable[[], Awaitable[str]],
+        min_interval: float | None = None,
+        max_interval: float | None = None,
+        base_interval: float | None = None,
+        initial_delay: float | None = None,
+    ):
+        """注册轮询数据源，fetch返回POLL_CHANGED/POLL_UNCHANGED/POLL_FAILED
+
+        initial_delay为首次轮询前的等待时间，默认等待一个初始间隔
+        """
+        self.sources[name] = PollSource(
+            name,
+            fetch,
+            min_interval or self.config.get("min_interval", 60),
+            max_interval or self.config.get("max_interval", 900),
+            base_interval or self.config.get("base_interval", 300),
+            initial_delay,
+        )
+
+    def nudge(self, name: str, reason: str):
+        """提示某数据源可能有遗漏的数据：间隔降到最小值，在最小间隔允许时立即轮询"""
+        source = self.sources.get(name)
+        if source is None:
+            return
+
+        source.nudges += 1
+        source.interval = source.min_interval
+        earliest = (
+            source.last_poll + source.min_interval
+            if source.last_poll
+            else time.monotonic()
+        )
+        if earliest < source.next_due:
+            source.next_due = earliest
+            logger.debug(
+                "[灾害预警] HTTP轮询提前: %s（%s），%.0f秒后执行",
+                name,
+                reason,
+                max(0.0, earliest - time.monotonic()),
+            )
+            self._wake.set()
+
+    def _take_budget(self, now: float) -> bool:
+        """占用一次请求预算，预算用尽时返回False"""
+        if not self.max_requests_per_hour:
+            return True
+        while self._request_times and now - self._request_times[0] >= _BUDGET_WINDOW:
+            self._request_times.popleft()
+        if len(self._request_times) >= self.max_requests_per_hour:
+            return False
+        self._request_times.append(now)
+        return True
+
+    async def run(self):
+        """调度循环"""
+        while True:
+            now = time.monotonic()
+            due = [source for source in self.sources.values() if source.next_due <= now]
+            if due:
+                ready = []
+                for source in due:
+                    if self._take_budget(now):
+                        ready.append(source)
+                    else:
+                        # 预算用尽，推迟到窗口中最早的请求过期之后
+                        self.budget_deferrals += 1
+                        source.next_due = self._request_times[0] + _BUDGET_WINDOW
+                        logger.warning(
+                            f"[灾害预警] HTTP请求预算已用尽（每小时 {self.max_requests_per_hour} 次），推迟轮询 {source.name}"
+                        )
+                await asyncio.gather(*(self._poll(source) for source in ready))
+                continue
+
+            if not self.sources:
+                delay = None
+            else:
+                delay = min(source.next_due for source in self.sources.values()) - now
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self, source: PollSource):
+        """执行一次轮询并按结果调整间隔"""
+        source.polls += 1
+        source.last_poll = time.monotonic()
+        nudges = source.nudges
+        try:
+            result = await source.fetch()
+        except Exception as e:
+            logger.error(f"[灾害预警] HTTP轮询失败 {source.name}: {e}")
+            result = POLL_FAILED
+
+        if result not in source.results:
+            result = POLL_FAILED
+        source.results[result] += 1
+
+        if result == POLL_CHANGED:
+            # 有新内容时保持最短间隔（余震序列等活跃期）
+            source.interval = source.min_interval
+        elif result == POLL_UNCHANGED:
+            source.interval = min(
+                source.max_interval, source.interval * _UNCHANGED_BACKOFF
+            )
+        else:
+            source.interval = min(source.max_interval, source.interval * _FAILURE_BACKOFF)
+        if source.nudges != nudges:
+            # 轮询期间收到提示：本次结果可能早于遗漏的数据，按最小间隔再轮询一次
+            source.interval = source.min_interval
+        source.next_due = source.last_poll + source.interval
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取轮询调度统计"""
+        now = time.monotonic()
+        recent = sum(1 for t in self._request_times if now - t < _BUDGET_WINDOW)
+        return {
+            "requests_last_hour": recent,
+            "max_requests_per_hour": self.max_requests_per_hour,
+            "budget_deferrals": self.budget_deferrals,
+            "sources": {name: source.to_dict() for name, source in self.sources.items()},
+        }
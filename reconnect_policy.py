@@ -0,0 +1,127 @@
+"""
+重连策略
+带抖动的指数退避：连续失败时等待时间按倍数增长并封顶，
+连接稳定运行一段时间后重试计数清零，短暂断线后可以立即以最短间隔重连
+"""
+
+import random
+import time
+from typing import Any
+
+# 断路状态
+STATE_CONNECTED = "connected"  # 已连接
+STATE_RETRYING = "retrying"  # 正在重试
+STATE_OPEN = "open"  # 已达到最大重试次数，停止重连
+
+
+class ReconnectPolicy:
+    """单个连接的重连策略"""
+
+    def __init__(
+        self,
+        initial_delay: float = 1.0,
+        max_delay: float = 60.0,
+        multiplier: float = 2.0,
+        jitter: float = 0.2,
+        stable_after: float = 60.0,
+        max_retries: int = 0,
+    ):
+        self.initial_delay = max(0.0, initial_delay)
+        self.max_delay = max(self.initial_delay, max_delay)
+        self.multiplier = max(1.0, multiplier)
+        self.jitter = min(max(0.0, jitter), 1.0)
+        self.stable_after = stable_after
+        self.max_retries = max(0, max_retries)  # 0表示不限次数
+
+        self.attempts = 0
+        self.state = STATE_RETRYING
+        self.connected_at: float | None = None
+        self.last_delay = 0.0
+        self._ever_connected = False
+        self._immediate_used = False
+
+        # 统计信息
+        self.total_reconnects = 0
+        self.total_failures = 0
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any], **defaults) -> "ReconnectPolicy":
+        """从配置读取退避参数，未配置的项使用defaults或类默认值"""
+        options = {
+            "initial_delay": "reconnect_initial_delay",
+            "max_delay": "reconnect_max_delay",
+            "jitter": "reconnect_jitter",
+            "stable_after": "reconnect_stable_after",
+            "max_retries": "max_reconnect_retries",
+        }
+        kwargs = dict(defaults)
+        for name, key in options.items():
+            if key in config:
+                kwargs[name] = config[key]
+        return cls(**kwargs)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.state == STATE_OPEN
+
+    def next_delay(self) -> float | None:
+        """记录一次重试并返回等待时间，达到最大重试次数时返回None"""
+        if self.max_retries and self.attempts >= self.max_retries:
+            self.state = STATE_OPEN
+            return None
+
+        base = min(
+            self.max_delay, self.initial_delay * self.multiplier**self.attempts
+        )
+        self.attempts += 1
+        self.state = STATE_RETRYING
+        # 抖动只向下取值，避免多个连接在同一时刻集中重连
+        self.last_delay = base * (1 - self.jitter * random.random())
+        return self.last_delay
+
+    def immediate(self) -> float | None:
+        """跳过退避立即重试一次（如上游计划内重启）
+
+        连接未稳定前再次请求立即重试时回到正常退避，避免上游反复重启时形成重连风暴
+        """
+        if self._immediate_used:
+            return self.next_delay()
+        self._immediate_used = True
+        self.state = STATE_RETRYING
+        self.last_delay = 0.0
+        return 0.0
+
+    def record_connected(self):
+        """连接成功"""
+        if self._ever_connected:
+            self.total_reconnects += 1
+        self._ever_connected = True
+        self.connected_at = time.monotonic()
+        self.state = STATE_CONNECTED
+
+    def record_failure(self):
+        """连接尝试失败"""
+        self.total_failures += 1
+        self.state = STATE_RETRYING
+
+    def record_disconnected(self) -> float:
+        """连接断开，返回本次连接的持续时间；稳定运行足够久时重试计数清零"""
+        if self.connected_at is None:
+            return 0.0
+        uptime = time.monotonic() - self.connected_at
+        self.connected_at = None
+        self.state = STATE_RETRYING
+        if uptime >= self.stable_after:
+            self.attempts = 0
+            self._immediate_used = False
+        return uptime
+
+    def get_state(self) -> dict[str, Any]:
+        """获取断路状态"""
+        return {
+            "state": self.state,
+            "attempts": self.attempts,
+            "last_delay": self.last_delay,
+            "reconnects": self.total_reconnects,
+            "failures": self.total_failures,
+        }
@@ -0,0 +1,53 @@
+"""
+测试配置：以包的形式加载插件目录（插件模块使用相对导入），
+未安装AstrBot时提供只含logger、消息组件与消息链的astrbot.api替身；基准脚本目录加入导入路径，供测试复用样例与数据生成
+"""
+
+import importlib.util
+import logging
+import sys
+import types
+from pathlib import Path
+
+PLUGIN_DIR = Path(__file__).resolve().parent.parent
+PACKAGE = "astrbot_plugin_disaster_warning"
+
+sys.path.insert(0, str(PLUGIN_DIR / "bench"))
+
+try:
+    import astrbot.api  # noqa: F401
+except ImportError:
+    _astrbot = types.ModuleType("astrbot")
+    _api = types.ModuleType("astrbot.api")
+    _api.logger = logging.getLogger("astrbot")
+    _astrbot.api = _api
+
+    # 消息推送管理器用到的消息组件与消息链
+    class _Plain:
+        def __init__(self, text: str):
+            self.text = text
+
+    class _MessageChain:
+        def __init__(self, chain: list | None = None):
+            self.chain = chain or []
+
+    _components = types.ModuleType("astrbot.api.message_components")
+    _components.Plain = _Plain
+    _event = types.ModuleType("astrbot.api.event")
+    _event.MessageChain = _MessageChain
+    _api.message_components = _components
+    _api.event = _event
+    sys.modules["astrbot"] = _astrbot
+    sys.modules["astrbot.api"] = _api
+    sys.modules["astrbot.api.message_components"] = _components
+    sys.modules["astrbot.api.event"] = _event
+
+if PACKAGE not in sys.modules:
+    _spec = importlib.util.spec_from_file_location(
+        PACKAGE,
+        PLUGIN_DIR / "__init__.py",
+        submodule_search_locations=[str(PLUGIN_DIR)],
+    )
+    _package = importlib.util.module_from_spec(_spec)
+    sys.modules[PACKAGE] = _package
+    _spec.loader.exec_module(_package)
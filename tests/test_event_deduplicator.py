@@ -0,0 +1,190 @@
+"""去重器：假时钟下模拟数周运行，记录、过期堆与索引保持有界；记录更新后堆中的旧条目被跳过"""
+
+import random
+from datetime import datetime, timedelta
+
+from astrbot_plugin_disaster_warning.event_deduplicator import EventDeduplicator
+from astrbot_plugin_disaster_warning.models import (
+    DataSource,
+    DisasterEvent,
+    DisasterType,
+    EarthquakeData,
+    TsunamiData,
+)
+
+_SOURCES = (
+    DataSource.FAN_STUDIO_CENC,
+    DataSource.FAN_STUDIO_CEA,
+    DataSource.WOLFX_CENC_EEW,
+    DataSource.GLOBAL_QUAKE,
+)
+
+
+class _Clock:
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+def _event(
+    source: DataSource,
+    shock_time: datetime,
+    latitude: float,
+    longitude: float,
+    magnitude: float,
+    updates: int = 1,
+) -> DisasterEvent:
+    data = EarthquakeData(
+        id=f"{source.value}-{shock_time.timestamp()}",
+        event_id=f"{shock_time.timestamp()}",
+        source=source,
+        disaster_type=DisasterType.EARTHQUAKE,
+        shock_time=shock_time,
+        latitude=latitude,
+        longitude=longitude,
+        magnitude=magnitude,
+        place_name="",
+        updates=updates,
+    )
+    return DisasterEvent(
+        id=data.id, data=data, source=source, disaster_type=DisasterType.EARTHQUAKE
+    )
+
+
+def test_soak_stays_bounded_over_weeks():
+    rng = random.Random(3)
+    clock = _Clock(datetime(2025, 1, 1))
+    max_entries = 100
+    deduplicator = EventDeduplicator(
+        retention_minutes=65, max_entries=max_entries, clock=clock
+    )
+    end = clock.now + timedelta(weeks=2)
+    calls = 0
+    max_heap = 0
+
+    while clock.now < end:
+        clock.now += timedelta(minutes=rng.uniform(0, 10))
+        # 平时零星几次地震，偶尔出现远超记录上限的地震群
+        quakes = rng.randint(150, 300) if rng.random() < 0.01 else rng.randint(0, 3)
+        for _ in range(quakes):
+            shock_time = clock.now - timedelta(seconds=rng.uniform(0, 60))
+            latitude, longitude = rng.uniform(-60, 60), rng.uniform(-180, 180)
+            magnitude = round(rng.uniform(3, 7), 1)
+            # 多个数据源报告，其中一部分带有后续报
+            for source in rng.sample(_SOURCES, rng.randint(1, len(_SOURCES))):
+                for updates in range(1, rng.choice((1, 1, 2, 4)) + 1):
+                    deduplicator.should_push_event(
+                        _event(
+                            source,
+                            shock_time + timedelta(seconds=updates),
+                            latitude,
+                            longitude,
+                            magnitude,
+                            updates,
+                        )
+                    )
+                    calls += 1
+
+                    records = len(deduplicator.recent_events)
+                    heap = len(deduplicator._expiry_heap)
+                    max_heap = max(max_heap, heap)
+                    assert records <= max_entries
+                    assert heap <= 2 * records + 65
+                    assert len(deduplicator.index.keys) == records
+
+    stats = deduplicator.get_deduplication_stats()
+    assert calls > 10000
+    assert stats["expired_count"] > 0
+    assert stats["evicted_count"] > 0
+    assert max_heap <= 2 * max_entries + 65
+    # 索引中不残留空网格
+    assert sum(len(bucket) for bucket in deduplicator.index.cells.values()) == len(
+        deduplicator.recent_events
+    )
+    assert all(deduplicator.index.cells.values())
+
+    # 安静数小时后全部过期
+    clock.now += timedelta(hours=2)
+    deduplicator.cleanup_old_events()
+    assert not deduplicator.recent_events
+    assert not deduplicator._expiry_heap
+    assert not deduplicator.index.keys
+
+
+def test_refreshed_entry_skips_stale_heap_entry():
+    start = datetime(2025, 1, 1, 12, 0)
+    clock = _Clock(start)
+    deduplicator = EventDeduplicator(retention_minutes=65, clock=clock)
+
+    assert deduplicator.should_push_event(
+        _event(DataSource.FAN_STUDIO_CEA, start, 36.5, 78.1, 4.9, updates=1)
+    )
+    # 第2报：同一记录更新为更晚的时间，堆中保留第1报的旧条目
+    assert deduplicator.should_push_event(
+        _event(
+            DataSource.FAN_STUDIO_CEA,
+            start + timedelta(seconds=30),
+            36.5,
+            78.1,
+            4.9,
+            updates=2,
+        )
+    )
+    (fingerprint,) = deduplicator.recent_events
+    assert len(deduplicator._expiry_heap) == 2
+
+    # 旧条目到期：出堆但不删除已更新的记录
+    clock.now = start + timedelta(minutes=65, seconds=10)
+    deduplicator.cleanup_old_events()
+    assert fingerprint in deduplicator.recent_events
+    assert len(deduplicator._expiry_heap) == 1
+    assert deduplicator.expired_count == 0
+    assert not deduplicator.should_push_event(
+        _event(
+            DataSource.WOLFX_CENC_EEW,
+            start + timedelta(seconds=20),
+            36.52,
+            78.12,
+            4.8,
+        )
+    )
+
+    # 更新后的记录到期
+    clock.now = start + timedelta(minutes=65, seconds=31)
+    deduplicator.cleanup_old_events()
+    assert not deduplicator.recent_events
+    assert not deduplicator._expiry_heap
+    assert deduplicator.expired_count == 1
+
+
+def _bulletin(level: str) -> DisasterEvent:
+    data = TsunamiData(
+        id="tsunami-1",
+        code="202512080001",
+        source=DataSource.FAN_STUDIO_TSUNAMI,
+        title="海啸预警",
+        level=level,
+    )
+    return DisasterEvent(
+        id=data.id, data=data, source=data.source, disaster_type=DisasterType.TSUNAMI
+    )
+
+
+def test_bulletin_state_is_recorded_only_by_record_event():
+    deduplicator = EventDeduplicator()
+    # 检查不记录状态：未通过推送条件的预警再次到达时仍然放行
+    assert deduplicator.should_push_event(_bulletin("黄色"))
+    assert deduplicator.should_push_event(_bulletin("黄色"))
+    assert not deduplicator.bulletin_states
+
+    deduplicator.record_event(_bulletin("黄色"))
+    assert not deduplicator.should_push_event(_bulletin("黄色"))
+    assert deduplicator.bulletin_resends == 1
+
+    assert deduplicator.should_push_event(_bulletin("橙色"))
+    assert deduplicator.bulletin_changes == 0
+    deduplicator.record_event(_bulletin("橙色"))
+    assert deduplicator.bulletin_changes == 1
+    assert len(deduplicator.bulletin_states) == 1
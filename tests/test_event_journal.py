@@ -0,0 +1,147 @@
+"""事件状态日志：空行容错与写入任务出错后继续运行"""
+
+import asyncio
+from datetime import datetime
+
+from astrbot_plugin_disaster_warning.event_journal import EventJournal
+
+
+def test_replay_ignores_blank_lines(tmp_path):
+    journal = EventJournal(tmp_path)
+    journal.record_final("eq-1")
+    journal.record_push("eq-2", {"timestamp": datetime.now(), "updates": 1})
+    asyncio.run(journal.flush())
+    # 手动编辑或截断留下的空行
+    text = journal.journal_path.read_text(encoding="utf-8")
+    journal.journal_path.write_text("\n" + text.replace("\n", "\n\n"), encoding="utf-8")
+
+    reloaded = EventJournal(tmp_path)
+    state = reloaded.load()
+    assert state.final == {"eq-1"}
+    assert state.push["eq-2"][0]["updates"] == 1
+    assert reloaded.replayed == 2
+
+
+def test_run_survives_errors(tmp_path):
+    def broken_snapshot():
+        raise RuntimeError("snapshot provider failed")
+
+    async def scenario():
+        journal = EventJournal(tmp_path, flush_interval=0.1, compact_threshold=1)
+        journal.set_snapshot_provider(broken_snapshot)
+        task = asyncio.create_task(journal.run())
+        for n in range(3):
+            journal.record_final(f"eq-{n}")
+            await asyncio.sleep(0.12)
+        alive = not task.done()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return journal, alive
+
+    journal, alive = asyncio.run(scenario())
+    assert alive
+    assert journal.flushes == 3
+
+
+def _push_record(updates: int) -> dict:
+    return {"timestamp": datetime.now(), "updates": updates}
+
+
+def test_torn_last_line_is_skipped(tmp_path):
+    journal = EventJournal(tmp_path)
+    journal.record_push("eq-1", _push_record(1))
+    journal.record_push("eq-1", _push_record(2))
+    asyncio.run(journal.flush())
+    # 崩溃时最后一行只写了一半
+    with open(journal.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"k":"p","id":"eq-1","r":{"upda')
+
+    reloaded = EventJournal(tmp_path)
+    state = reloaded.load()
+    assert [record["updates"] for record in state.push["eq-1"]] == [1, 2]
+    assert reloaded.replayed == 2
+    assert reloaded.seq == 2
+
+
+def test_crash_between_snapshot_and_truncate_skips_compacted_records(tmp_path):
+    push: dict[str, list[dict]] = {}
+    journal = EventJournal(tmp_path)
+    journal.set_snapshot_provider(lambda: ({}, push, {"eq-1"}))
+    for updates in (1, 2):
+        push.setdefault("eq-1", []).append(_push_record(updates))
+        journal.record_push("eq-1", push["eq-1"][-1])
+    journal.record_final("eq-1")
+    asyncio.run(journal.flush())
+    stale_journal = journal.journal_path.read_bytes()
+
+    # 快照已写入，清空日志之前崩溃：日志中仍是已压缩的记录
+    asyncio.run(journal.compact())
+    journal.journal_path.write_bytes(stale_journal)
+
+    reloaded = EventJournal(tmp_path)
+    state = reloaded.load()
+    assert reloaded.replayed == 0
+    assert [record["updates"] for record in state.push["eq-1"]] == [1, 2]
+    assert state.final == {"eq-1"}
+
+    # 重启后的新记录序号接在快照之后，下次启动照常重放
+    reloaded.record_push("eq-1", _push_record(3))
+    asyncio.run(reloaded.flush())
+    again = EventJournal(tmp_path)
+    state = again.load()
+    assert again.replayed == 1
+    assert [record["updates"] for record in state.push["eq-1"]] == [1, 2, 3]
+
+
+def test_should_compact_on_threshold_or_age(tmp_path, monkeypatch):
+    from astrbot_plugin_disaster_warning import event_journal
+
+    now = [1000.0]
+    monkeypatch.setattr(event_journal.time, "monotonic", lambda: now[0])
+    journal = EventJournal(tmp_path, compact_threshold=3)
+    journal.set_snapshot_provider(lambda: ({}, {}, set()))
+    assert not journal.should_compact()
+
+    journal.record_final("eq-1")
+    now[0] += event_journal._COMPACT_MAX_AGE - 1
+    assert not journal.should_compact()
+    # 最早的未压缩记录超过最长保留时间
+    now[0] += 1
+    assert journal.should_compact()
+    asyncio.run(journal.compact())
+    assert not journal.should_compact()
+
+    # 记录数达到阈值
+    for n in range(3):
+        journal.record_final(f"eq-{n}")
+    assert journal.should_compact()
+
+
+def test_snapshot_keeps_only_latest_hypocenter(tmp_path):
+    hypocenter = {"latitude": 36.5, "longitude": 78.1, "magnitude": 4.8}
+    records = [
+        {"timestamp": datetime.now(), "updates": n, "hypocenter": dict(hypocenter, magnitude=m)}
+        for n, m in ((1, 4.6), (2, 4.8))
+    ] + [{"timestamp": datetime.now(), "updates": 3}]
+    journal = EventJournal(tmp_path)
+    journal.set_snapshot_provider(lambda: ({}, {"eq-1": records}, set()))
+    asyncio.run(journal.compact())
+
+    state = EventJournal(tmp_path).load()
+    assert ["hypocenter" in record for record in state.push["eq-1"]] == [False, True, False]
+    assert state.push["eq-1"][1]["hypocenter"]["magnitude"] == 4.8
+    # 内存中的记录不受影响
+    assert "hypocenter" in records[0]
+
+
+def test_week_of_records_replays_within_budget(tmp_path):
+    import bench_journal
+    from astrbot_plugin_disaster_warning import event_journal
+
+    # 每天500次事件，压缩前日志达到默认阈值的最坏情况
+    threshold = EventJournal(tmp_path).compact_threshold
+    pending = bench_journal.write_week(event_journal, tmp_path, 500, threshold)
+    assert pending >= threshold - 1
+    elapsed, state = bench_journal.replay_ms(event_journal, tmp_path)
+    assert len(state.push) > 3000
+    assert elapsed < bench_journal.BUDGET_MS
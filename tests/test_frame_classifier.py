@@ -0,0 +1,46 @@
+"""入站帧预分类器：使用基准测试的P2P/FAN Studio/Wolfx样例帧"""
+
+from payloads import load_frames
+
+from astrbot_plugin_disaster_warning.frame_classifier import FrameClassifier
+
+_FRAMES = {feed: raw for feed, _, _, raw in load_frames()}
+
+
+def test_p2p_ignored_codes_match_anywhere_in_frame():
+    classifier = FrameClassifier()
+    # 555/9611的"code"排在很长的"areas"/"area_confidences"之后，超出帧头部扫描范围
+    assert _FRAMES["p2p_555"].find('"code"') > 256
+    assert _FRAMES["p2p_9611"].find('"code"') > 256
+    for feed in ("p2p_555", "p2p_561", "p2p_9611"):
+        raw = _FRAMES[feed]
+        assert classifier.classify("p2p_main", raw) == feed
+        assert classifier.classify("p2p_main", raw.encode()) == feed
+    assert classifier.get_stats() == {
+        "p2p_main": {"p2p_555": 2, "p2p_561": 2, "p2p_9611": 2}
+    }
+
+
+def test_p2p_earthquake_frames_pass_through():
+    classifier = FrameClassifier()
+    raw = _FRAMES["p2p_551"]
+    assert classifier.classify("p2p_main", raw) is None
+    assert classifier.classify("p2p_main", raw.encode()) is None
+    assert classifier.get_stats() == {}
+
+
+def test_heartbeats_are_matched_per_feed():
+    classifier = FrameClassifier()
+    heartbeat = '{"type": "heartbeat", "timestamp": 1764842881}'
+    assert classifier.classify("fan_studio_all", heartbeat) == "heartbeat"
+    assert classifier.classify("wolfx_jma_eew", heartbeat.encode()) == "heartbeat"
+    # P2P连接不使用心跳规则，数据帧不被误判
+    assert classifier.classify("p2p_main", heartbeat) is None
+    for feed in ("fan_studio_usgs", "wolfx_jma_eew", "wolfx_cenc_eqlist"):
+        assert classifier.classify(feed, _FRAMES[feed]) is None
+
+
+def test_disabled_classifier_passes_everything():
+    classifier = FrameClassifier(enabled=False)
+    assert classifier.classify("p2p_main", _FRAMES["p2p_555"]) is None
+    assert classifier.get_stats() == {}
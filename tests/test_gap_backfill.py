@@ -0,0 +1,145 @@
+"""断线回补：本地WebSocket与P2P历史接口替身，正常断开与看门狗强制重连后都补拉断线期间的消息"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from aiohttp import web
+
+from astrbot_plugin_disaster_warning import gap_backfill, websocket_manager
+from astrbot_plugin_disaster_warning.gap_backfill import P2P_HISTORY, GapBackfiller
+from astrbot_plugin_disaster_warning.websocket_manager import (
+    HTTPDataFetcher,
+    WebSocketManager,
+)
+
+_JST = timezone(timedelta(hours=9))
+
+
+def _quake(quake_id: str, minutes_ago: float) -> dict:
+    published = datetime.now(_JST) - timedelta(minutes=minutes_ago)
+    return {
+        "id": quake_id,
+        "code": 551,
+        "time": published.strftime("%Y/%m/%d %H:%M:%S.000"),
+        "earthquake": {"time": published.strftime("%Y/%m/%d %H:%M:%S")},
+    }
+
+
+class _P2PStandIn:
+    """首个连接推送一条消息后按mode断开（close）或保持静默（silent），
+    断线期间发布的消息只出现在历史接口中"""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.live = _quake("live", 0.5)
+        self.missed = _quake("missed", 0.1)
+        self.stale = _quake("stale", 30)
+        self.connections = 0
+
+    async def websocket(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        if self.connections == 1:
+            await ws.send_json(self.live)
+            if self.mode == "close":
+                await ws.close()
+                return ws
+        # 半开连接：不再发送任何帧（仍自动应答ping）
+        async for _ in ws:
+            pass
+        return ws
+
+    async def history(self, request):
+        # 新的在前
+        return web.json_response([self.missed, self.live, self.stale])
+
+
+async def _run(mode: str, monkeypatch) -> dict:
+    stand_in = _P2PStandIn(mode)
+    app = web.Application()
+    app.router.add_get("/ws", stand_in.websocket)
+    app.router.add_get("/v2/history", stand_in.history)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    monkeypatch.setattr(
+        gap_backfill, "P2P_HISTORY_URL", f"http://127.0.0.1:{port}/v2/history"
+    )
+    monkeypatch.setattr(websocket_manager, "_WATCHDOG_TICK", 0.05)
+    monkeypatch.setitem(websocket_manager.FEED_SILENCE_BUDGETS, "p2p", 0.3)
+
+    manager = WebSocketManager(
+        {
+            "liveness_probe_interval": 0,
+            "reconnect_initial_delay": 0.05,
+            "reconnect_interval": 0.2,
+        }
+    )
+    received: list[str] = []
+    backfilled: list[str] = []
+    notifications: list[bool] = []
+
+    async def on_message(envelope, connection_name=None):
+        received.append(envelope.data["id"])
+
+    async def process_envelope(handler_name, envelope):
+        backfilled.append(envelope.data["id"])
+        return 1
+
+    fetcher = HTTPDataFetcher({})
+    backfiller = GapBackfiller(
+        fetcher, process_envelope, sources={"p2p_main": P2P_HISTORY}, eqlist_urls={}
+    )
+
+    def on_connection_state(name, connected, outage):
+        notifications.append(connected)
+        if connected:
+            backfiller.schedule(name, outage)
+
+    manager.register_handler("p2p", on_message)
+    manager.add_connection_listener(on_connection_state)
+    await manager.start()
+    task = asyncio.create_task(manager.connect("p2p_main", f"ws://127.0.0.1:{port}/ws"))
+    try:
+        deadline = asyncio.get_running_loop().time() + 5
+        while not backfilled:
+            assert asyncio.get_running_loop().time() < deadline, "未触发回补"
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(0.1)
+        return {
+            "received": received,
+            "backfilled": backfilled,
+            "notifications": notifications,
+            "outages": manager.get_outages()["p2p_main"],
+            "activity": manager.get_feed_activity()["p2p_main"],
+            "stats": backfiller.get_stats()[P2P_HISTORY],
+        }
+    finally:
+        backfiller.stop()
+        await manager.stop()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await fetcher.close()
+        await runner.cleanup()
+
+
+@pytest.mark.parametrize("mode", ["close", "silent"])
+def test_outage_is_backfilled_after_reconnect(mode, monkeypatch):
+    result = asyncio.run(_run(mode, monkeypatch))
+
+    assert result["received"] == ["live"]
+    # 断开与恢复各通知一次，恢复时带上已结束的断线区间
+    assert result["notifications"][:3] == [True, False, True]
+    outage = result["outages"][0]
+    assert outage["end"] is not None
+    # 历史接口中断线期间（含放宽时间）的消息从旧到新处理，过早的消息不补拉
+    assert result["backfilled"] == ["live", "missed"]
+    assert result["stats"]["backfills"] == 1
+    assert result["stats"]["events"] == 2
+    if mode == "silent":
+        assert result["activity"]["stale_reconnects"] >= 1
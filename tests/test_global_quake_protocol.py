@@ -0,0 +1,181 @@
+"""Global Quake分帧器与TCP客户端：半包、粘包、超长帧，以及对本地假服务器的高速重放"""
+
+import asyncio
+import json
+import random
+
+import pytest
+
+from astrbot_plugin_disaster_warning.data_handlers import GlobalQuakeHandler
+from astrbot_plugin_disaster_warning.global_quake_protocol import (
+    FRAMING_LENGTH,
+    FRAMING_LINE,
+    KEEPALIVE_REPLY,
+    GlobalQuakeFramer,
+)
+from astrbot_plugin_disaster_warning.websocket_manager import GlobalQuakeClient
+
+
+def _encode(payloads: list[bytes], framing: str) -> bytes:
+    if framing == FRAMING_LENGTH:
+        return b"".join(len(p).to_bytes(4, "big") + p for p in payloads)
+    return b"".join(p + b"\n" for p in payloads)
+
+
+def _packets(count: int, seed: int = 7) -> list[dict]:
+    """模拟录制的数据流：心跳、测站聚类与多次修订的震源更新"""
+    rng = random.Random(seed)
+    revisions: dict[str, int] = {}
+    packets = []
+    for index in range(count):
+        roll = rng.random()
+        if roll < 0.2:
+            packets.append({"type": "HeartbeatPacket"})
+        elif roll < 0.5:
+            packets.append(
+                {
+                    "type": "ClusterPacket",
+                    "data": {"id": index, "level": 2, "lat": 35.0, "lon": 139.0},
+                }
+            )
+        else:
+            uuid = f"quake-{rng.randrange(20)}"
+            revisions[uuid] = revisions.get(uuid, 0) + 1
+            packets.append(
+                {
+                    "type": "HypocenterDataPacket",
+                    "data": {
+                        "uuid": uuid,
+                        "revisionID": revisions[uuid],
+                        "lat": 35.1,
+                        "lon": 139.2,
+                        "depth": 10.0,
+                        "magnitude": 5.23,
+                        "origin": 1760000000000,
+                        "regionName": "Near Coast of Honshu, Japan",
+                    },
+                }
+            )
+    return packets
+
+
+@pytest.mark.parametrize("framing", [FRAMING_LINE, FRAMING_LENGTH])
+def test_split_frames_byte_by_byte(framing):
+    payloads = [b'{"a":1}', b'{"b":[1,2,3]}', b'{"c":"\xe5\x9c\xb0\xe9\x9c\x87"}']
+    framer = GlobalQuakeFramer()
+    frames = []
+    for byte in _encode(payloads, framing):
+        frames += framer.feed(bytes([byte]))
+    assert frames == payloads
+    assert framer.framing == framing
+    assert framer.pending == 0
+
+
+@pytest.mark.parametrize("framing", [FRAMING_LINE, FRAMING_LENGTH])
+def test_coalesced_frames(framing):
+    payloads = [json.dumps({"n": n}).encode() for n in range(100)]
+    framer = GlobalQuakeFramer()
+    stream = _encode(payloads, framing)
+    # 99个完整帧加上最后一帧的一半
+    head, tail = stream[:-4], stream[-4:]
+    assert framer.feed(head) == payloads[:-1]
+    assert framer.feed(tail) == payloads[-1:]
+    assert framer.frames == 100
+
+
+@pytest.mark.parametrize("framing", [FRAMING_LINE, FRAMING_LENGTH])
+def test_oversized_frame_is_skipped_and_stream_stays_aligned(framing):
+    framer = GlobalQuakeFramer(max_frame_size=64)
+    payloads = [b'{"before":1}', b'{"big":"' + b"x" * 500 + b'"}', b'{"after":2}']
+    stream = _encode(payloads, framing)
+    frames = []
+    # 超长帧跨越多次读取
+    for offset in range(0, len(stream), 37):
+        frames += framer.feed(stream[offset : offset + 37])
+    assert frames == [payloads[0], payloads[2]]
+    assert framer.oversized == 1
+    assert framer.pending == 0
+
+
+def test_line_framing_complete_oversized_line_in_one_chunk():
+    framer = GlobalQuakeFramer(max_frame_size=16)
+    assert framer.feed(b'{"x":"' + b"y" * 40 + b'"}\n{"ok":1}\n') == [b'{"ok":1}']
+    assert framer.oversized == 1
+
+
+async def _replay(framing: str, packets: list[dict], oversized_at: int):
+    payloads = [json.dumps(packet).encode() for packet in packets]
+    # 在数据流中间插入一个超过上限的帧
+    payloads.insert(oversized_at, json.dumps({"type": "Junk", "x": "z" * 10000}).encode())
+    stream = _encode(payloads, framing)
+    heartbeats = sum(1 for packet in packets if packet["type"] == "HeartbeatPacket")
+    expected_replies = len(_encode([KEEPALIVE_REPLY], framing)) * heartbeats
+    replies = bytearray()
+    rng = random.Random(1)
+
+    async def serve(reader, writer):
+        # 以随机大小的块尽快发送，制造半包与粘包
+        position = 0
+        while position < len(stream):
+            size = rng.randint(1, 700)
+            writer.write(stream[position : position + size])
+            position += size
+            if rng.random() < 0.05:
+                await writer.drain()
+        await writer.drain()
+        # 等待客户端应答完所有心跳
+        while len(replies) < expected_replies:
+            chunk = await asyncio.wait_for(reader.read(1 << 20), 5)
+            if not chunk:
+                break
+            replies.extend(chunk)
+        writer.close()
+
+    server = await asyncio.start_server(serve, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    handler = GlobalQuakeHandler()
+    events = []
+
+    async def on_message(envelope):
+        event = handler.parse_message(envelope)
+        if event:
+            events.append(event)
+
+    client = GlobalQuakeClient(
+        {"primary_server": "127.0.0.1", "primary_port": port, "secondary_enabled": False}
+    )
+    client.framer.max_frame_size = 4096
+    client.register_handler(on_message)
+    try:
+        assert await client.connect()
+        client.running = True
+        await asyncio.wait_for(client.listen(), 10)
+    finally:
+        server.close()
+        await server.wait_closed()
+    return client, events, bytes(replies)
+
+
+@pytest.mark.parametrize("framing", [FRAMING_LINE, FRAMING_LENGTH])
+def test_replay_captured_stream_against_fake_server(framing):
+    packets = _packets(5000)
+    client, events, replies = asyncio.run(_replay(framing, packets, oversized_at=2500))
+
+    hypocenters = [p["data"] for p in packets if p["type"] == "HypocenterDataPacket"]
+    heartbeats = sum(1 for p in packets if p["type"] == "HeartbeatPacket")
+    stats = client.get_stats()
+    assert stats["framing"] == framing
+    assert stats["frames"] == len(packets)
+    assert stats["oversized"] == 1
+    assert stats["keepalives"] == heartbeats
+
+    # 每次修订都输出一报，报数即修订号
+    assert len(events) == len(hypocenters)
+    assert [(e.data.event_id, e.data.updates) for e in events] == [
+        (h["uuid"], h["revisionID"]) for h in hypocenters
+    ]
+    assert events[-1].data.magnitude == 5.2
+
+    # 心跳按当前连接的帧格式应答
+    expected_reply = _encode([KEEPALIVE_REPLY], framing)
+    assert replies == expected_reply * heartbeats
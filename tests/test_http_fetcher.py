@@ -0,0 +1,177 @@
+"""HTTP数据获取器：本地HTTP替身下的条件请求（ETag/Last-Modified与304）、错误计数与连接复用"""
+
+import asyncio
+
+from aiohttp import web
+
+from astrbot_plugin_disaster_warning.websocket_manager import HTTPDataFetcher
+
+
+class _ListStandIn:
+    """按ETag或Last-Modified应答条件请求的地震列表"""
+
+    def __init__(self):
+        self.version = 1
+        self.status = 200
+        self.requests: list[dict[str, str | None]] = []
+        self.peers: set[int] = set()
+
+    def _etag(self) -> str:
+        return f'"v{self.version}"'
+
+    async def by_etag(self, request):
+        self._record(request)
+        if self.status != 200:
+            return web.Response(status=self.status)
+        if request.headers.get("If-None-Match") == self._etag():
+            return web.Response(status=304)
+        return web.json_response(
+            {"version": self.version}, headers={"ETag": self._etag()}
+        )
+
+    async def by_date(self, request):
+        self._record(request)
+        last_modified = f"Tue, 02 Dec 2025 11:4{self.version}:00 GMT"
+        if request.headers.get("If-Modified-Since") == last_modified:
+            return web.Response(status=304)
+        return web.json_response(
+            {"version": self.version}, headers={"Last-Modified": last_modified}
+        )
+
+    def _record(self, request):
+        self.peers.add(request.transport.get_extra_info("peername")[1])
+        self.requests.append(
+            {
+                "If-None-Match": request.headers.get("If-None-Match"),
+                "If-Modified-Since": request.headers.get("If-Modified-Since"),
+            }
+        )
+
+
+async def _serve(scenario):
+    stand_in = _ListStandIn()
+    app = web.Application()
+    app.router.add_get("/etag.json", stand_in.by_etag)
+    app.router.add_get("/date.json", stand_in.by_date)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    fetcher = HTTPDataFetcher({})
+    await fetcher.start()
+    try:
+        return await scenario(fetcher, stand_in, f"http://127.0.0.1:{port}")
+    finally:
+        await fetcher.close()
+        await runner.cleanup()
+
+
+def test_unchanged_etag_returns_none_on_304():
+    async def scenario(fetcher, stand_in, base):
+        url = f"{base}/etag.json"
+        first = await fetcher.fetch_envelope(url, "wolfx_cenc_eqlist")
+        second = await fetcher.fetch_envelope(url, "wolfx_cenc_eqlist")
+        stand_in.version = 2
+        changed = await fetcher.fetch_envelope(url, "wolfx_cenc_eqlist")
+        return fetcher, stand_in, url, first, second, changed
+
+    fetcher, stand_in, url, first, second, changed = asyncio.run(_serve(scenario))
+
+    assert first.data == {"version": 1}
+    assert first.connection_name == "wolfx_cenc_eqlist"
+    assert first.url == url
+    # 第二次带上ETag，内容未变化时不返回信封
+    assert second is None
+    assert [request["If-None-Match"] for request in stand_in.requests] == [
+        None,
+        '"v1"',
+        '"v1"',
+    ]
+    # 内容变化后返回新内容并记住新的ETag
+    assert changed.data == {"version": 2}
+    assert fetcher._validators[url] == ('"v2"', None)
+    assert fetcher.last_status[url] == 200
+    assert fetcher.get_stats() == {
+        "requests": 3,
+        "not_modified": 1,
+        "errors": 0,
+        "bytes": len(first.raw) + len(changed.raw),
+    }
+
+
+def test_last_modified_is_sent_back():
+    async def scenario(fetcher, stand_in, base):
+        url = f"{base}/date.json"
+        await fetcher.fetch_envelope(url, "wolfx_jma_eqlist")
+        result = await fetcher.fetch_envelope(url, "wolfx_jma_eqlist")
+        return fetcher, stand_in, url, result
+
+    fetcher, stand_in, url, result = asyncio.run(_serve(scenario))
+
+    assert result is None
+    assert stand_in.requests[1]["If-Modified-Since"] == "Tue, 02 Dec 2025 11:41:00 GMT"
+    assert stand_in.requests[1]["If-None-Match"] is None
+    assert fetcher.last_status[url] == 304
+
+
+def test_unconditional_requests_always_download():
+    async def scenario(fetcher, stand_in, base):
+        url = f"{base}/etag.json"
+        await fetcher.fetch_envelope(url, "wolfx_cenc_eqlist")
+        envelope = await fetcher.fetch_envelope(
+            url, "wolfx_cenc_eqlist", conditional=False
+        )
+        data = await fetcher.fetch_json(url)
+        return fetcher, stand_in, envelope, data
+
+    fetcher, stand_in, envelope, data = asyncio.run(_serve(scenario))
+
+    assert envelope.data == data == {"version": 1}
+    assert [request["If-None-Match"] for request in stand_in.requests] == [None] * 3
+    assert fetcher.not_modified == 0
+
+
+def test_errors_are_counted_and_validators_kept():
+    async def scenario(fetcher, stand_in, base):
+        url = f"{base}/etag.json"
+        await fetcher.fetch_envelope(url, "wolfx_cenc_eqlist")
+        stand_in.status = 502
+        failed = await fetcher.fetch_envelope(url, "wolfx_cenc_eqlist")
+        failed_status = fetcher.last_status[url]
+        stand_in.status = 200
+        recovered = await fetcher.fetch_envelope(url, "wolfx_cenc_eqlist")
+        unreachable = await fetcher.fetch_envelope(
+            "http://127.0.0.1:1/etag.json", "wolfx_cenc_eqlist"
+        )
+        return fetcher, stand_in, failed, failed_status, recovered, unreachable
+
+    fetcher, stand_in, failed, failed_status, recovered, unreachable = asyncio.run(
+        _serve(scenario)
+    )
+
+    assert failed is None and failed_status == 502
+    # 失败后仍使用之前的ETag，内容未变化时返回304
+    assert recovered is None
+    assert stand_in.requests[2]["If-None-Match"] == '"v1"'
+    assert unreachable is None
+    assert fetcher.last_status["http://127.0.0.1:1/etag.json"] is None
+    assert fetcher.errors == 2
+
+
+def test_pooled_session_reuses_the_connection():
+    async def scenario(fetcher, stand_in, base):
+        session = fetcher.session
+        for _ in range(5):
+            await fetcher.fetch_envelope(f"{base}/etag.json", "wolfx_cenc_eqlist")
+            await fetcher.fetch_envelope(f"{base}/date.json", "wolfx_jma_eqlist")
+        # 重复start不替换现有会话
+        await fetcher.start()
+        return session is fetcher.session, stand_in.peers
+
+    same_session, peers = asyncio.run(_serve(scenario))
+
+    assert same_session
+    # 顺序请求复用同一个keep-alive连接
+    assert len(peers) == 1
@@ -0,0 +1,216 @@
+"""跨数据源地震关联：门限、似然选择、同一数据源的修订、恢复与过期清理"""
+
+import json
+from datetime import datetime, timedelta
+
+from astrbot_plugin_disaster_warning.data_handlers import P2PDataHandler
+from astrbot_plugin_disaster_warning.incident_correlator import IncidentCorrelator
+from astrbot_plugin_disaster_warning.models import (
+    DataSource,
+    DisasterType,
+    EarthquakeData,
+    MessageEnvelope,
+)
+
+# 北京时间 2025-12-02 19:45:32
+_SHOCK = datetime(2025, 12, 2, 19, 45, 32)
+
+
+def _quake(
+    source: DataSource = DataSource.FAN_STUDIO_CENC,
+    event_id: str = "cenc-1",
+    seconds: float = 0,
+    latitude: float = 36.51,
+    longitude: float = 78.15,
+    magnitude: float | None = 4.8,
+    info_type: str = "",
+) -> EarthquakeData:
+    return EarthquakeData(
+        id=event_id,
+        event_id=event_id,
+        source=source,
+        disaster_type=DisasterType.EARTHQUAKE,
+        shock_time=_SHOCK + timedelta(seconds=seconds),
+        latitude=latitude,
+        longitude=longitude,
+        place_name="新疆和田地区皮山县",
+        magnitude=magnitude,
+        info_type=info_type,
+    )
+
+
+def _p2p_551(record_id: str, magnitude: float, points: int) -> EarthquakeData:
+    """经P2P处理器解析的551消息：每条消息的_id不同"""
+    message = {
+        "_id": record_id,
+        "code": 551,
+        "earthquake": {
+            "domesticTsunami": "None",
+            "foreignTsunami": "Unknown",
+            "hypocenter": {
+                "depth": 50,
+                "latitude": 42.8,
+                "longitude": 143.2,
+                "magnitude": magnitude,
+                "name": "十勝地方中部",
+            },
+            "maxScale": 20,
+            "time": "2025/12/04 18:04:00",
+        },
+        "issue": {"correct": "None", "source": "気象庁", "type": "DetailScale"},
+        "points": [
+            {"addr": f"観測点{n}", "isArea": False, "pref": "北海道", "scale": 10}
+            for n in range(points)
+        ],
+        "time": "2025/12/04 18:06:55.246",
+    }
+    event = P2PDataHandler().parse_message(
+        MessageEnvelope(raw=json.dumps(message), connection_name="p2p_main")
+    )
+    return event.data
+
+
+def test_sources_within_gates_share_an_incident():
+    correlator = IncidentCorrelator()
+    first = correlator.correlate(_quake())
+    second = correlator.correlate(
+        _quake(
+            DataSource.FAN_STUDIO_CEA,
+            "cea-1",
+            seconds=2,
+            latitude=36.55,
+            longitude=78.2,
+            magnitude=4.9,
+        )
+    )
+    assert first == second
+    assert correlator.get(first).to_dict()["sources"] == [
+        "fan_studio_cea",
+        "fan_studio_cenc",
+    ]
+    assert correlator.get_stats()["merged"] == 1
+
+
+def test_gates_separate_different_quakes():
+    correlator = IncidentCorrelator()
+    base = correlator.correlate(_quake())
+    # 距离约100公里、发震时间相差90秒、震级相差1.5，各自超出一项门限
+    far = _quake(DataSource.FAN_STUDIO_CEA, "cea-far", latitude=37.41)
+    late = _quake(DataSource.WOLFX_CENC_EEW, "wolfx-late", seconds=90)
+    larger = _quake(DataSource.GLOBAL_QUAKE, "gq-larger", magnitude=6.3)
+    incidents = {correlator.correlate(quake) for quake in (far, late, larger)}
+    assert base not in incidents
+    assert len(incidents) == 3
+    assert correlator.get_stats()["created"] == 4
+
+
+def test_timezones_are_normalised_before_matching():
+    correlator = IncidentCorrelator()
+    cenc = correlator.correlate(_quake())
+    # 同一时刻的日本时间比北京时间快1小时
+    jma = correlator.correlate(
+        _quake(DataSource.WOLFX_JMA_EEW, "jma-1", seconds=3600 + 1)
+    )
+    assert cenc == jma
+
+
+def test_most_likely_incident_is_chosen():
+    correlator = IncidentCorrelator()
+    near = correlator.correlate(_quake(event_id="cenc-near"))
+    far = correlator.correlate(
+        _quake(DataSource.FAN_STUDIO_CEA, "cea-far", seconds=40, latitude=36.9)
+    )
+    assert near != far
+    # 与两者都在门限内，时间与位置更接近第一个
+    chosen = correlator.correlate(
+        _quake(DataSource.GLOBAL_QUAKE, "gq-1", seconds=3, latitude=36.55)
+    )
+    assert chosen == near
+
+
+def test_p2p_reports_with_new_record_ids_join_one_incident():
+    correlator = IncidentCorrelator()
+    reports = [
+        _p2p_551("69314fccc58757000701eb4d", 3.6, 3),
+        _p2p_551("69314fd9c58757000701eb4f", 3.7, 12),
+        _p2p_551("69315002c58757000701eb51", 3.7, 40),
+    ]
+    assert len({report.event_id for report in reports}) == 3
+    incidents = {correlator.correlate(report) for report in reports}
+    assert len(incidents) == 1
+    incident = correlator.get(incidents.pop())
+    assert incident.report_count == 3
+    assert incident.magnitude == 3.7
+
+
+def test_wolfx_eqlist_revision_joins_the_eew_incident():
+    correlator = IncidentCorrelator()
+    source = DataSource.WOLFX_CENC_EEW
+    # 预警、自动测定、正式测定：地震列表条目修订后md5改变，发震时间略有调整
+    eew = correlator.correlate(_quake(source, "202512021945.0001", magnitude=5.1))
+    automatic = correlator.correlate(
+        _quake(source, "md5-auto", seconds=1, magnitude=4.9, info_type="自动测定")
+    )
+    formal = correlator.correlate(
+        _quake(source, "md5-formal", seconds=-1, magnitude=4.8, info_type="正式测定")
+    )
+    assert eew == automatic == formal
+    assert correlator.get(eew).report_count == 3
+    assert correlator.get_stats()["created"] == 1
+
+
+def test_same_source_quakes_seconds_apart_stay_separate():
+    correlator = IncidentCorrelator()
+    source = DataSource.WOLFX_CENC_EEW
+    first = correlator.correlate(_quake(source, "md5-first"))
+    # 同一数据源30秒后在附近测定到另一次地震
+    second = correlator.correlate(_quake(source, "md5-second", seconds=30))
+    assert first != second
+
+
+def test_restore_maps_source_ids_and_hypocenter():
+    correlator = IncidentCorrelator()
+    incident_id = correlator.correlate(_quake())
+    hypocenter = correlator.get(incident_id).hypocenter()
+
+    restored = IncidentCorrelator()
+    restored.restore(
+        {
+            incident_id: [
+                {
+                    "timestamp": datetime.now(),
+                    "source": "fan_studio_cenc",
+                    "source_event_id": "cenc-1",
+                    "hypocenter": hypocenter,
+                },
+                # 超过保留时间的记录不恢复
+                {
+                    "timestamp": datetime.now() - timedelta(hours=3),
+                    "source": "fan_studio_cea",
+                    "source_event_id": "cea-old",
+                },
+            ]
+        }
+    )
+    assert restored.aliases == {("fan_studio_cenc", "cenc-1"): incident_id}
+    # 同一数据源事件的后续报告与其他数据源的报告都归入恢复的incident
+    assert restored.correlate(_quake(magnitude=4.9)) == incident_id
+    assert (
+        restored.correlate(_quake(DataSource.FAN_STUDIO_CEA, "cea-2", seconds=2))
+        == incident_id
+    )
+
+
+def test_cleanup_drops_expired_incidents_and_aliases():
+    correlator = IncidentCorrelator()
+    old = correlator.correlate(_quake())
+    recent = correlator.correlate(_quake(DataSource.GLOBAL_QUAKE, "gq-2", seconds=600))
+    correlator.get(old).updated = datetime.now() - timedelta(hours=3)
+
+    correlator.cleanup()
+    assert correlator.get(old) is None
+    assert correlator.get(recent) is not None
+    assert ("fan_studio_cenc", "cenc-1") not in correlator.aliases
+    assert old not in correlator.index.keys
+    # 过期后同一事件ID的报告开启新的incident
+    assert correlator.correlate(_quake()) != recent
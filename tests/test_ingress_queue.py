@@ -0,0 +1,133 @@
+"""入站队列：各溢出策略下的丢弃、等待与统计"""
+
+import asyncio
+
+from astrbot_plugin_disaster_warning.websocket_manager import (
+    OVERFLOW_AUTO,
+    OVERFLOW_BLOCK,
+    OVERFLOW_DROP_OLDEST,
+    IngressQueue,
+    WebSocketManager,
+)
+
+
+async def _drain(queue: IngressQueue) -> list:
+    items = []
+    while len(queue._items):
+        items.append(await queue.get())
+        queue.task_done()
+    return items
+
+
+def test_drop_oldest_drops_regardless_of_class():
+    async def scenario():
+        queue = IngressQueue("fan_studio_weather", 2, OVERFLOW_DROP_OLDEST)
+        for item in ("a", "b", "c"):
+            await queue.put(item)
+        return queue, await _drain(queue)
+
+    queue, items = asyncio.run(scenario())
+    assert items == ["b", "c"]
+    stats = queue.get_stats()
+    assert stats["dropped"] == stats["dropped_data"] == 1
+    assert stats["enqueued"] == 3
+    assert stats["blocked"] == 0
+    assert queue.idle
+
+
+def test_auto_evicts_oldest_heartbeat_and_never_drops_data():
+    async def scenario():
+        queue = IngressQueue("p2p_main", 3, OVERFLOW_AUTO)
+        await queue.put("555-a", droppable=True)
+        await queue.put("551", droppable=False)
+        await queue.put("555-b", droppable=True)
+        # 队列已满：数据帧挤掉最旧的心跳类帧
+        await queue.put("556", droppable=False)
+        # 心跳类帧挤掉剩下的心跳类帧
+        await queue.put("561", droppable=True)
+        return queue, await _drain(queue)
+
+    queue, items = asyncio.run(scenario())
+    assert items == ["551", "556", "561"]
+    stats = queue.get_stats()
+    assert stats["dropped"] == 2
+    assert stats["dropped_data"] == 0
+    assert stats["blocked"] == 0
+    assert queue.idle
+
+
+def test_auto_drops_incoming_heartbeat_when_queue_holds_only_data():
+    async def scenario():
+        queue = IngressQueue("p2p_main", 2, OVERFLOW_AUTO)
+        await queue.put("551-a")
+        await queue.put("551-b")
+        await queue.put("555", droppable=True)
+        return queue, await _drain(queue)
+
+    queue, items = asyncio.run(scenario())
+    assert items == ["551-a", "551-b"]
+    stats = queue.get_stats()
+    assert stats["dropped"] == 1
+    assert stats["dropped_data"] == 0
+    assert stats["enqueued"] == 2
+    assert queue.idle
+
+
+def test_data_frame_waits_for_room_when_full_of_data():
+    async def scenario():
+        queue = IngressQueue("p2p_main", 2, OVERFLOW_AUTO)
+        await queue.put("551-a")
+        await queue.put("551-b")
+        producer = asyncio.create_task(queue.put("551-c"))
+        await asyncio.sleep(0.05)
+        waiting = not producer.done()
+        first = await queue.get()
+        queue.task_done()
+        await asyncio.wait_for(producer, 1)
+        return queue, waiting, [first, *await _drain(queue)]
+
+    queue, waiting, items = asyncio.run(scenario())
+    assert waiting
+    assert items == ["551-a", "551-b", "551-c"]
+    stats = queue.get_stats()
+    assert stats["dropped"] == 0
+    assert stats["blocked"] == 1
+    assert stats["blocked_ms"] >= 40
+    assert stats["processed"] == 3
+
+
+def test_block_policy_waits_even_for_heartbeats():
+    async def scenario():
+        queue = IngressQueue("fan_studio_cea", 1, OVERFLOW_BLOCK)
+        await queue.put("heartbeat-a", droppable=True)
+        producer = asyncio.create_task(queue.put("heartbeat-b", droppable=True))
+        await asyncio.sleep(0.02)
+        waiting = not producer.done()
+        consumed = [await queue.get()]
+        queue.task_done()
+        await asyncio.wait_for(producer, 1)
+        return queue, waiting, consumed + await _drain(queue)
+
+    queue, waiting, items = asyncio.run(scenario())
+    assert waiting
+    assert items == ["heartbeat-a", "heartbeat-b"]
+    assert queue.get_stats()["dropped"] == 0
+
+
+def test_idle_tracks_in_flight_messages():
+    async def scenario():
+        queue = IngressQueue("wolfx_japan_jma_eew", 4, OVERFLOW_AUTO)
+        await queue.put("eew")
+        busy_queued = queue.idle
+        await queue.get()
+        busy_processing = queue.idle
+        queue.task_done()
+        return busy_queued, busy_processing, queue.idle
+
+    assert asyncio.run(scenario()) == (False, False, True)
+
+
+def test_overflow_policy_no_longer_depends_on_connection_name():
+    assert WebSocketManager({})._get_overflow_policy() == OVERFLOW_AUTO
+    manager = WebSocketManager({"ingress_overflow_policy": OVERFLOW_BLOCK})
+    assert manager._get_overflow_policy() == OVERFLOW_BLOCK
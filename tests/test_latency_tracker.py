@@ -0,0 +1,170 @@
+"""首达延迟统计：到达顺序与落后时间、各数据源时区、后续报不重复计入、异常延迟丢弃、地区与上限"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+from astrbot_plugin_disaster_warning import latency_tracker
+from astrbot_plugin_disaster_warning.event_deduplicator import EventDeduplicator
+from astrbot_plugin_disaster_warning.latency_tracker import LatencyTracker, region_of
+from astrbot_plugin_disaster_warning.models import (
+    DataSource,
+    DisasterEvent,
+    DisasterType,
+    EarthquakeData,
+)
+
+_UTC = timezone.utc
+# 北京时间 2025-12-02 19:45:32（各数据源以本地时间给出，不带时区）
+_SHOCK_UTC = datetime(2025, 12, 2, 11, 45, 32, tzinfo=_UTC)
+
+
+def _event(
+    source: DataSource,
+    received_after: float,
+    event_id: str = "quake-1",
+    latitude: float = 36.51,
+    longitude: float = 78.15,
+    place_name: str = "新疆和田地区皮山县",
+    updates: int = 1,
+    shock_hours: int = 8,
+) -> DisasterEvent:
+    """发震后received_after秒收到的报告；shock_hours为数据源时间字段的UTC偏移"""
+    shock_time = (_SHOCK_UTC + timedelta(hours=shock_hours)).replace(tzinfo=None)
+    data = EarthquakeData(
+        id=f"{source.value}-{event_id}",
+        event_id=event_id,
+        source=source,
+        disaster_type=DisasterType.EARTHQUAKE,
+        shock_time=shock_time,
+        latitude=latitude,
+        longitude=longitude,
+        magnitude=4.8,
+        place_name=place_name,
+        updates=updates,
+    )
+    return DisasterEvent(
+        id=data.id,
+        data=data,
+        source=source,
+        disaster_type=DisasterType.EARTHQUAKE,
+        receive_time=_SHOCK_UTC + timedelta(seconds=received_after),
+    )
+
+
+def test_first_arrival_order_and_lag():
+    tracker = LatencyTracker()
+    tracker.record_arrival("q1", _event(DataSource.FAN_STUDIO_CEA, 10))
+    tracker.record_arrival("q1", _event(DataSource.WOLFX_CENC_EEW, 12.5))
+
+    stats = tracker.get_stats()
+    assert stats["quakes"] == 1
+    # 最先到达的数据源排在前面
+    assert list(stats["sources"]) == ["fan_studio_cea", "wolfx_cenc_eew"]
+    cea, wolfx = stats["sources"].values()
+    assert (cea["firsts"], cea["behind_first_p50"], cea["origin_p50"]) == (1, 0, 10)
+    assert (wolfx["firsts"], wolfx["behind_first_p50"], wolfx["origin_p50"]) == (
+        0,
+        2.5,
+        12.5,
+    )
+    assert set(stats["by_region"]["新疆"]) == {"fan_studio_cea", "wolfx_cenc_eew"}
+
+    (recent,) = tracker.get_recent_quakes()
+    assert datetime.fromisoformat(recent["origin_time"]) == _SHOCK_UTC
+    assert [arrival["source"] for arrival in recent["arrivals"]] == [
+        "fan_studio_cea",
+        "wolfx_cenc_eew",
+    ]
+
+
+def test_origin_time_uses_source_timezone():
+    tracker = LatencyTracker()
+    # 日本数据源的发震时间是日本时间：同一时刻比北京时间快1小时
+    japan = {
+        "latitude": 42.8,
+        "longitude": 143.2,
+        "place_name": "十勝地方中部",
+        "shock_hours": 9,
+    }
+    tracker.record_arrival("q1", _event(DataSource.WOLFX_JMA_EEW, 5, **japan))
+    tracker.record_arrival("q1", _event(DataSource.P2P_EARTHQUAKE, 90, **japan))
+
+    sources = tracker.get_stats()["sources"]
+    assert sources["wolfx_jma_eew"]["origin_p50"] == 5.0
+    assert sources["p2p_earthquake"]["origin_p50"] == 90.0
+    assert sources["p2p_earthquake"]["behind_first_p50"] == 85.0
+    assert list(tracker.get_stats()["by_region"]) == ["日本"]
+
+
+def test_later_updates_are_not_counted_again():
+    tracker = LatencyTracker()
+    tracker.record_arrival("q1", _event(DataSource.FAN_STUDIO_CEA, 10))
+    tracker.record_arrival("q1", _event(DataSource.FAN_STUDIO_CEA, 40, updates=2))
+    tracker.record_arrival("q1", _event(DataSource.FAN_STUDIO_CEA, 70, updates=3))
+
+    cea = tracker.get_stats()["sources"]["fan_studio_cea"]
+    assert (cea["events"], cea["firsts"], cea["origin_p95"]) == (1, 1, 10.0)
+
+
+def test_out_of_range_origin_latency_is_dropped():
+    tracker = LatencyTracker()
+    # 历史列表中数小时前的地震只计入落后时间，不计入发震时间延迟
+    tracker.record_arrival("q1", _event(DataSource.FAN_STUDIO_CENC, 3 * 3600))
+
+    cenc = tracker.get_stats()["sources"]["fan_studio_cenc"]
+    assert cenc["events"] == 1
+    assert cenc["origin_p50"] is None
+    (recent,) = tracker.get_recent_quakes()
+    assert recent["arrivals"][0]["origin_latency"] is None
+
+
+def test_region_of():
+    def region(place_name, latitude, longitude, province=None):
+        earthquake = _event(
+            DataSource.FAN_STUDIO_USGS,
+            0,
+            latitude=latitude,
+            longitude=longitude,
+            place_name=place_name,
+        ).data
+        earthquake.province = province
+        return region_of(earthquake)
+
+    assert region("四川雅安市芦山县", 30.3, 102.9) == "四川"
+    assert region("某地", 30.3, 102.9, province="云南") == "云南"
+    assert region("福島県沖", 37.7, 141.6) == "日本"
+    assert region("Tonga", -20.1, -174.5) == "其他"
+
+
+def test_tracked_quakes_are_capped(monkeypatch):
+    monkeypatch.setattr(latency_tracker, "_MAX_QUAKES", 3)
+    tracker = LatencyTracker()
+    for index in range(5):
+        tracker.record_arrival(f"q{index}", _event(DataSource.FAN_STUDIO_CEA, 10))
+
+    assert tracker.get_stats()["quakes"] == 3
+    assert len(tracker.get_recent_quakes(limit=2)) == 2
+    # 淘汰的地震再次到达时按新地震记录
+    tracker.record_arrival("q0", _event(DataSource.FAN_STUDIO_CEA, 20))
+    assert tracker.get_stats()["sources"]["fan_studio_cea"]["firsts"] == 6
+
+
+def test_deduplicator_feeds_arrivals_of_one_quake(tmp_path):
+    tracker = LatencyTracker()
+    deduplicator = EventDeduplicator(latency_tracker=tracker)
+
+    # 第二个数据源的报告作为重复事件被抑制，但其到达仍然计入
+    assert deduplicator.should_push_event(_event(DataSource.FAN_STUDIO_CEA, 10))
+    deduplicator.should_push_event(
+        _event(DataSource.WOLFX_CENC_EEW, 12, event_id="wolfx-1", latitude=36.52)
+    )
+
+    stats = tracker.get_stats()
+    assert stats["quakes"] == 1
+    assert stats["sources"]["wolfx_cenc_eew"]["behind_first_p50"] == 2.0
+
+    report = json.loads(
+        tracker.export_json(tmp_path / "latency_report.json").read_text("utf-8")
+    )
+    assert report["quakes"] == 1
+    assert len(report["recent_quakes"][0]["arrivals"]) == 2
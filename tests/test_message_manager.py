@@ -0,0 +1,63 @@
+"""推送流程：海啸/气象预警状态在通过推送条件后才记录"""
+
+import asyncio
+from datetime import datetime
+
+from astrbot_plugin_disaster_warning.message_manager import MessagePushManager
+from astrbot_plugin_disaster_warning.models import (
+    DataSource,
+    DisasterEvent,
+    DisasterType,
+    TsunamiData,
+)
+
+
+class _Context:
+    def __init__(self):
+        self.sent: list[tuple[str, object]] = []
+
+    async def send_message(self, session: str, message):
+        self.sent.append((session, message))
+
+
+def _manager(**config) -> tuple[MessagePushManager, _Context]:
+    context = _Context()
+    manager = MessagePushManager(
+        {"target_groups": ["10001"], "platform_name": "aiocqhttp", **config}, context
+    )
+    return manager, context
+
+
+def _tsunami(level: str = "Watch") -> DisasterEvent:
+    data = TsunamiData(
+        id="552-20251208",
+        code="552",
+        source=DataSource.P2P_EARTHQUAKE,
+        title="津波予報 - Focus",
+        level=level,
+        issue_time=datetime.now(),
+        forecasts=[{"name": "北海道太平洋沿岸中部", "grade": level, "immediate": False}],
+    )
+    return DisasterEvent(
+        id=data.id, data=data, source=data.source, disaster_type=DisasterType.TSUNAMI
+    )
+
+
+def test_filtered_bulletin_does_not_suppress_later_push():
+    manager, context = _manager(earthquake_whitelist_include_international=False)
+    # 无法提取省份且未开启国际事件：被白名单过滤
+    assert not asyncio.run(manager.push_event(_tsunami()))
+    assert not manager.deduplicator.bulletin_states
+
+    # 开启国际事件后，同一状态的预警照常推送
+    manager.earthquake_whitelist_include_international = True
+    assert asyncio.run(manager.push_event(_tsunami()))
+    assert len(context.sent) == 1
+    assert len(manager.deduplicator.bulletin_states) == 1
+
+    # 推送之后同一状态的重发才被跳过
+    assert not asyncio.run(manager.push_event(_tsunami()))
+    assert manager.deduplicator.bulletin_resends == 1
+    assert asyncio.run(manager.push_event(_tsunami("Warning")))
+    assert manager.deduplicator.bulletin_changes == 1
+    assert len(context.sent) == 2
@@ -0,0 +1,103 @@
+"""结构解码：msgspec.Struct路径与逐字段查找路径结果一致，缺失、null与形状不符的字段按声明处理"""
+
+import dataclasses
+import json
+
+import pytest
+from payloads import load_frames
+
+from astrbot_plugin_disaster_warning import message_schemas
+from astrbot_plugin_disaster_warning.data_handlers import (
+    FanStudioHandler,
+    P2PDataHandler,
+    WolfxDataHandler,
+)
+from astrbot_plugin_disaster_warning.message_schemas import (
+    FAN_CENC_SCHEMA,
+    FAN_USGS_SCHEMA,
+    P2P_EARTHQUAKE_SCHEMA,
+    WOLFX_CENC_EQLIST_SCHEMA,
+    WOLFX_JMA_EEW_SCHEMA,
+    SchemaError,
+)
+
+requires_msgspec = pytest.mark.skipif(
+    message_schemas.msgspec is None, reason="未安装msgspec"
+)
+
+_BODIES = {feed: json.loads(raw) for feed, _, _, raw in load_frames()}
+
+_CASES = [
+    (FAN_USGS_SCHEMA, FanStudioHandler, _BODIES["fan_studio_usgs"]["Data"]),
+    (FAN_CENC_SCHEMA, FanStudioHandler, _BODIES["fan_studio_cenc"]["Data"]),
+    (P2P_EARTHQUAKE_SCHEMA, P2PDataHandler, _BODIES["p2p_551"]),
+    (WOLFX_JMA_EEW_SCHEMA, WolfxDataHandler, _BODIES["wolfx_jma_eew"]),
+    (WOLFX_CENC_EQLIST_SCHEMA, WolfxDataHandler, _BODIES["wolfx_cenc_eqlist"]["No1"]),
+]
+
+
+def _fields(obj) -> dict:
+    values = dataclasses.asdict(obj)
+    values.pop("receive_time", None)
+    return values
+
+
+def _both(schema, handler, data):
+    """(msgspec.Struct路径结果, 逐字段查找路径结果)，失败时为SchemaError"""
+    results = []
+    for decode in (schema.decode, schema.decode_table):
+        try:
+            results.append(_fields(decode(data, handler)))
+        except SchemaError as e:
+            results.append(type(e))
+    return results
+
+
+@requires_msgspec
+@pytest.mark.parametrize("schema, handler_cls, data", _CASES)
+def test_struct_path_matches_table(schema, handler_cls, data):
+    assert schema.struct_decoder is not None
+    struct_result, table_result = _both(schema, handler_cls(), data)
+    assert struct_result == table_result
+
+
+@requires_msgspec
+def test_nulls_wrong_types_and_missing_fields_match_table():
+    handler = FanStudioHandler()
+    base = _BODIES["fan_studio_cenc"]["Data"]
+    variants = [
+        # null与缺失使用声明的默认值
+        dict(base, id=None, placeName=None, latitude=None),
+        {key: value for key, value in base.items() if key not in ("id", "depth")},
+        # 数值以字符串给出、字符串字段给出数值
+        dict(base, latitude="36.51", depth="", eventId=12345),
+        # 严格数值字段无效时整条拒绝
+        dict(base, latitude="北纬36度"),
+    ]
+    for data in variants:
+        struct_result, table_result = _both(FAN_CENC_SCHEMA, handler, data)
+        assert struct_result == table_result
+    assert _both(FAN_CENC_SCHEMA, handler, variants[-1]) == [SchemaError, SchemaError]
+
+
+@requires_msgspec
+def test_nested_shape_mismatch_falls_back_to_table():
+    handler = P2PDataHandler()
+    base = _BODIES["p2p_551"]
+    # 中间层不是对象：Struct转换失败，按字段映射处理（必需的震源字段缺失）
+    broken = dict(base, earthquake="unknown")
+    assert _both(P2P_EARTHQUAKE_SCHEMA, handler, broken) == [SchemaError, SchemaError]
+    # 中间层为null与缺失的可选字段
+    earthquake = dict(base["earthquake"], maxScale=None, domesticTsunami=None)
+    struct_result, table_result = _both(
+        P2P_EARTHQUAKE_SCHEMA, handler, dict(base, earthquake=earthquake)
+    )
+    assert struct_result == table_result
+    assert struct_result["max_scale"] == -1
+
+
+def test_decode_without_msgspec(monkeypatch):
+    monkeypatch.setattr(FAN_CENC_SCHEMA, "struct_decoder", None)
+    obj = FAN_CENC_SCHEMA.decode(_BODIES["fan_studio_cenc"]["Data"], FanStudioHandler())
+    assert obj.place_name == "新疆和田地区皮山县"
+    assert obj.depth == 18.0
@@ -0,0 +1,161 @@
+"""HTTP轮询调度：间隔边界、首次轮询时间、请求预算；轮询进行中收到的提示不被本次结果覆盖"""
+
+import asyncio
+import time
+
+from astrbot_plugin_disaster_warning import poll_scheduler
+from astrbot_plugin_disaster_warning.poll_scheduler import (
+    POLL_CHANGED,
+    POLL_FAILED,
+    POLL_UNCHANGED,
+    PollScheduler,
+)
+
+
+def _scheduler(fetch):
+    scheduler = PollScheduler({"max_requests_per_hour": 0})
+    scheduler.register(
+        "eqlist", fetch, min_interval=60, max_interval=900, base_interval=300
+    )
+    return scheduler, scheduler.sources["eqlist"]
+
+
+def test_unchanged_result_backs_off():
+    async def fetch():
+        return POLL_UNCHANGED
+
+    scheduler, source = _scheduler(fetch)
+    asyncio.run(scheduler._poll(source))
+    assert source.interval == 450
+    assert source.next_due == source.last_poll + 450
+
+
+def test_nudge_during_fetch_keeps_minimum_interval():
+    async def fetch():
+        # 请求发出后WebSocket断线，提示可能有遗漏的数据
+        scheduler.nudge("eqlist", "连接断开")
+        return POLL_UNCHANGED
+
+    scheduler, source = _scheduler(fetch)
+    asyncio.run(scheduler._poll(source))
+    assert source.nudges == 1
+    assert source.interval == source.min_interval
+    assert source.next_due == source.last_poll + source.min_interval
+
+
+def test_nudge_before_poll_is_not_repeated():
+    results = iter([POLL_CHANGED, POLL_UNCHANGED])
+
+    async def fetch():
+        return next(results)
+
+    scheduler, source = _scheduler(fetch)
+    scheduler.nudge("eqlist", "收到相关地震")
+    asyncio.run(scheduler._poll(source))
+    asyncio.run(scheduler._poll(source))
+    assert source.interval == 90
+
+
+def test_intervals_are_clamped_to_bounds():
+    async def fetch():
+        return POLL_UNCHANGED
+
+    scheduler = PollScheduler({"min_interval": 60, "max_interval": 900})
+    scheduler.register("slow", fetch, base_interval=5000)
+    scheduler.register("fast", fetch, base_interval=10)
+    # 最大间隔小于最小间隔时以最小间隔为准
+    scheduler.register(
+        "fixed", fetch, min_interval=120, max_interval=30, base_interval=60
+    )
+    sources = scheduler.sources
+    assert sources["slow"].interval == 900
+    assert sources["fast"].interval == 60
+    assert (sources["fixed"].interval, sources["fixed"].max_interval) == (120, 120)
+
+    # 持续未变化时放宽到最大间隔为止
+    for _ in range(10):
+        asyncio.run(scheduler._poll(sources["fast"]))
+    assert sources["fast"].interval == 900
+
+
+def test_initial_delay_sets_first_poll():
+    async def fetch():
+        return POLL_UNCHANGED
+
+    scheduler = PollScheduler({})
+    before = time.monotonic()
+    scheduler.register("eqlist", fetch, base_interval=300, initial_delay=0)
+    scheduler.register("default", fetch, base_interval=300)
+    after = time.monotonic()
+    # 启动时立即轮询一次；未指定时等待一个初始间隔
+    assert before <= scheduler.sources["eqlist"].next_due <= after
+    assert before + 300 <= scheduler.sources["default"].next_due <= after + 300
+
+
+def test_failures_back_off_and_bad_results_count_as_failures():
+    results = iter([POLL_CHANGED, "bogus", None])
+
+    async def fetch():
+        result = next(results)
+        if result is None:
+            raise RuntimeError("连接重置")
+        return result
+
+    scheduler, source = _scheduler(fetch)
+    asyncio.run(scheduler._poll(source))
+    assert source.interval == 60
+    asyncio.run(scheduler._poll(source))
+    asyncio.run(scheduler._poll(source))
+    assert source.interval == 240
+    assert source.results == {POLL_CHANGED: 1, POLL_UNCHANGED: 0, POLL_FAILED: 2}
+
+
+def test_nudge_waits_for_minimum_interval_after_recent_poll():
+    async def fetch():
+        return POLL_UNCHANGED
+
+    scheduler, source = _scheduler(fetch)
+    asyncio.run(scheduler._poll(source))
+    scheduler.nudge("eqlist", "连接断开")
+    scheduler.nudge("unknown", "连接断开")
+    assert source.next_due == source.last_poll + source.min_interval
+
+
+def test_budget_window_expires():
+    scheduler = PollScheduler({"max_requests_per_hour": 2})
+    assert scheduler._take_budget(0.0)
+    assert scheduler._take_budget(10.0)
+    assert not scheduler._take_budget(20.0)
+    # 窗口中最早的请求过期后恢复预算
+    assert scheduler._take_budget(3600.0)
+    assert not scheduler._take_budget(3605.0)
+
+
+def test_exhausted_budget_defers_due_sources():
+    polled: list[str] = []
+
+    def fetcher(name):
+        async def fetch():
+            polled.append(name)
+            return POLL_UNCHANGED
+
+        return fetch
+
+    async def run():
+        scheduler = PollScheduler({"max_requests_per_hour": 2})
+        for name in ("cenc", "jma", "usgs"):
+            scheduler.register(name, fetcher(name), initial_delay=0)
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    assert polled == ["cenc", "jma"]
+    assert scheduler.budget_deferrals == 1
+    # 推迟到窗口中最早的请求过期之后
+    first_request = scheduler._request_times[0]
+    deferred = scheduler.sources["usgs"]
+    assert deferred.next_due == first_request + poll_scheduler._BUDGET_WINDOW
+    assert scheduler.get_stats()["requests_last_hour"] == 2
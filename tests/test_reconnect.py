@@ -0,0 +1,172 @@
+"""Global Quake连接监督：对本地TCP替身测量重连时间（抖动退避、稳定后清零、主备切换与切回）"""
+
+import asyncio
+import socket
+import time
+
+from astrbot_plugin_disaster_warning.reconnect_policy import ReconnectPolicy
+from astrbot_plugin_disaster_warning.websocket_manager import GlobalQuakeClient
+
+INITIAL_DELAY = 0.05
+MAX_DELAY = 0.4
+JITTER = 0.2
+STABLE_AFTER = 0.3
+# 事件循环调度与本机TCP握手的余量
+SLACK = 0.08
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _client(primary_port: int, secondary_port: int | None = None, **config):
+    client = GlobalQuakeClient(
+        {
+            "primary_server": "127.0.0.1",
+            "primary_port": primary_port,
+            "secondary_server": "127.0.0.1",
+            "secondary_port": secondary_port or primary_port,
+            "secondary_enabled": secondary_port is not None,
+            "connect_timeout": 1,
+            "reconnect_initial_delay": INITIAL_DELAY,
+            "reconnect_max_delay": MAX_DELAY,
+            "reconnect_jitter": JITTER,
+            "reconnect_stable_after": STABLE_AFTER,
+            **config,
+        }
+    )
+    # 记录每次连接尝试的时间和端口
+    attempts: list[tuple[float, int]] = []
+    connect_to = client._connect_to
+
+    async def tracked(server, port):
+        attempts.append((time.monotonic(), port))
+        return await connect_to(server, port)
+
+    client._connect_to = tracked
+    return client, attempts
+
+
+async def _hold_server(holds: list[float], connected: list[float]):
+    """依次按holds中的时长保持每个连接后断开，用完后保持连接"""
+
+    async def serve(reader, writer):
+        connected.append(time.monotonic())
+        index = len(connected) - 1
+        await asyncio.sleep(holds[index] if index < len(holds) else 3600)
+        writer.close()
+
+    return await asyncio.start_server(serve, "127.0.0.1", 0)
+
+
+async def _wait_for(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "等待超时"
+        await asyncio.sleep(0.01)
+
+
+async def _stop(client: GlobalQuakeClient, task: asyncio.Task):
+    client.running = False
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+def test_jittered_exponential_backoff_while_server_is_down():
+    async def scenario():
+        client, attempts = _client(_free_port())
+        task = asyncio.create_task(client.run())
+        await _wait_for(lambda: len(attempts) >= 7)
+        await _stop(client, task)
+        return client, attempts
+
+    client, attempts = asyncio.run(scenario())
+    gaps = [b[0] - a[0] for a, b in zip(attempts, attempts[1:])]
+    for index, gap in enumerate(gaps):
+        base = min(MAX_DELAY, INITIAL_DELAY * 2**index)
+        # 抖动只向下取值：等待时间落在 [base*(1-jitter), base] 内
+        assert base * (1 - JITTER) - 0.005 <= gap <= base + SLACK, (index, gap)
+    # 最后一次尝试可能在失败计数前被取消
+    assert client.reconnect_policy.total_failures >= len(attempts) - 1
+    stats = client.server_stats[f"127.0.0.1:{attempts[0][1]}"].to_dict()
+    assert stats["failures"] >= len(attempts) - 1
+
+
+def test_jitter_spreads_delays():
+    policy = ReconnectPolicy(initial_delay=1.0, max_delay=1.0, jitter=0.5)
+    delays = {round(policy.next_delay(), 6) for _ in range(50)}
+    assert len(delays) > 40
+    assert all(0.5 <= delay <= 1.0 for delay in delays)
+
+
+def test_backoff_resets_after_stable_connection():
+    async def scenario():
+        connected: list[float] = []
+        # 前4次连接立即断开（退避逐次增长），第5次稳定运行后断开
+        server = await _hold_server([0, 0, 0, 0, STABLE_AFTER + 0.1], connected)
+        port = server.sockets[0].getsockname()[1]
+        client, attempts = _client(port)
+        task = asyncio.create_task(client.run())
+        await _wait_for(lambda: len(connected) >= 6)
+        await _stop(client, task)
+        server.close()
+        await server.wait_closed()
+        return connected
+
+    connected = asyncio.run(scenario())
+    flap_gaps = [b - a for a, b in zip(connected[:5], connected[1:5])]
+    # 连续闪断：等待时间按倍数增长
+    assert flap_gaps[-1] >= INITIAL_DELAY * 2**3 * (1 - JITTER) - 0.005
+    # 稳定运行后断开：计数已清零，以最短间隔重连
+    reconnect_time = connected[5] - (connected[4] + STABLE_AFTER + 0.1)
+    assert reconnect_time <= INITIAL_DELAY + SLACK, reconnect_time
+
+
+def test_failover_to_secondary_and_back_to_primary():
+    async def scenario():
+        primary_port = _free_port()
+        secondary_connected: list[float] = []
+        secondary = await _hold_server([], secondary_connected)
+        secondary_port = secondary.sockets[0].getsockname()[1]
+        client, attempts = _client(
+            primary_port, secondary_port, primary_recheck_interval=0.2
+        )
+        started = time.monotonic()
+        task = asyncio.create_task(client.run())
+
+        # 主服务器不可用：直接切换到备用服务器，不等待退避
+        await _wait_for(lambda: secondary_connected)
+        failover_time = secondary_connected[0] - started
+
+        # 主服务器恢复：在下一次检查时切回
+        primary_connected: list[float] = []
+        await asyncio.sleep(0.3)
+        primary = await asyncio.start_server(
+            lambda r, w: primary_connected.append(time.monotonic()),
+            "127.0.0.1",
+            primary_port,
+        )
+        primary_up = time.monotonic()
+        await _wait_for(lambda: client.current_server == ("127.0.0.1", primary_port))
+        await _wait_for(lambda: primary_connected)
+        failback_time = primary_connected[-1] - primary_up
+        stats = client.get_stats()
+
+        await _stop(client, task)
+        for server in (primary, secondary):
+            server.close()
+        return failover_time, failback_time, stats, primary_port, secondary_port
+
+    failover_time, failback_time, stats, primary_port, secondary_port = asyncio.run(
+        scenario()
+    )
+    assert failover_time <= SLACK
+    assert failback_time <= 0.2 + SLACK
+    servers = stats["servers"]
+    assert servers[f"127.0.0.1:{primary_port}"]["failures"] >= 1
+    assert servers[f"127.0.0.1:{primary_port}"]["connected"]
+    # 备用服务器在线时长已累计
+    assert servers[f"127.0.0.1:{secondary_port}"]["uptime_seconds"] >= 0.3
+    assert not servers[f"127.0.0.1:{secondary_port}"]["connected"]
@@ -0,0 +1,133 @@
+"""静默看门狗：本地WebSocket替身下，应用层心跳计入活动，超过静默预算或ping无响应时强制重连"""
+
+import asyncio
+import time
+
+from aiohttp import WSMsgType, web
+
+from astrbot_plugin_disaster_warning import websocket_manager
+from astrbot_plugin_disaster_warning.websocket_manager import WebSocketManager
+
+SILENCE_BUDGET = 0.3
+TICK = 0.05
+# 事件循环调度与本机握手的余量
+SLACK = 0.15
+
+
+class _StandIn:
+    """首个连接按mode表现异常，之后的连接正常应答（持续发送心跳）"""
+
+    def __init__(self, mode: str, heartbeats: int = 0):
+        self.mode = mode
+        self.heartbeats = heartbeats
+        self.connected: list[float] = []
+        self.silent_since: float | None = None
+
+    async def websocket(self, request):
+        first = not self.connected
+        # 半开连接：不自动应答ping
+        ws = web.WebSocketResponse(autoping=not (first and self.mode == "no_pong"))
+        await ws.prepare(request)
+        self.connected.append(time.monotonic())
+        sender = None
+        if self.mode == "heartbeat_then_silent":
+            if first:
+                await self._send_heartbeats(ws, self.heartbeats)
+                self.silent_since = time.monotonic()
+            else:
+                sender = asyncio.create_task(self._send_heartbeats(ws))
+        async for message in ws:
+            if message.type == WSMsgType.ERROR:
+                break
+        if sender:
+            sender.cancel()
+        return ws
+
+    @staticmethod
+    async def _send_heartbeats(ws, count: int | None = None):
+        sent = 0
+        while count is None or sent < count:
+            await ws.send_json({"type": "heartbeat"})
+            sent += 1
+            await asyncio.sleep(TICK)
+
+
+async def _run(
+    name: str, stand_in: _StandIn, monkeypatch, budget=SILENCE_BUDGET, **config
+) -> dict:
+    app = web.Application()
+    app.router.add_get("/ws", stand_in.websocket)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    monkeypatch.setattr(websocket_manager, "_WATCHDOG_TICK", TICK)
+    monkeypatch.setitem(websocket_manager.FEED_SILENCE_BUDGETS, "wolfx", budget)
+
+    manager = WebSocketManager(
+        {
+            "reconnect_initial_delay": 0.05,
+            "reconnect_interval": 0.2,
+            "reconnect_jitter": 0,
+            **config,
+        }
+    )
+    await manager.start()
+    task = asyncio.create_task(manager.connect(name, f"ws://127.0.0.1:{port}/ws"))
+    try:
+        deadline = time.monotonic() + 5
+        while len(stand_in.connected) < 2:
+            assert time.monotonic() < deadline, "看门狗未强制重连"
+            await asyncio.sleep(0.01)
+        # 等待第二个连接上的探测完成
+        await asyncio.sleep(0.3)
+        return {
+            "connected": stand_in.connected,
+            "activity": manager.get_feed_activity()[name],
+            "outages": manager.get_outages()[name],
+        }
+    finally:
+        await manager.stop()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await runner.cleanup()
+
+
+def test_heartbeats_count_as_activity_until_feed_goes_silent(monkeypatch):
+    # 心跳持续时间是静默预算的两倍：期间不重连，停止后在预算内强制重连
+    stand_in = _StandIn("heartbeat_then_silent", heartbeats=12)
+    result = asyncio.run(
+        _run("wolfx_test", stand_in, monkeypatch, liveness_probe_interval=0)
+    )
+
+    reconnected_after = result["connected"][1] - stand_in.silent_since
+    assert stand_in.silent_since - result["connected"][0] > 2 * SILENCE_BUDGET
+    assert SILENCE_BUDGET <= reconnected_after < SILENCE_BUDGET + TICK + SLACK
+    assert result["activity"]["stale_reconnects"] == 1
+    assert result["activity"]["last_heartbeat_age"] is not None
+    # 强制重连同样记录断线区间（触发回补）
+    assert result["outages"][0]["end"] is not None
+
+
+def test_unanswered_ping_forces_reconnect(monkeypatch):
+    # 预警类连接（名称含eew）静默预算充足，只能由主动探测发现半开连接
+    stand_in = _StandIn("no_pong")
+    probe_interval, probe_timeout = 0.1, 0.2
+    result = asyncio.run(
+        _run(
+            "wolfx_jma_eew",
+            stand_in,
+            monkeypatch,
+            budget=60,
+            liveness_probe_interval=probe_interval,
+            connection_timeout=probe_timeout,
+        )
+    )
+
+    gap = result["connected"][1] - result["connected"][0]
+    assert probe_interval + probe_timeout <= gap < 1.0
+    assert result["activity"]["stale_reconnects"] == 1
+    # 正常应答的连接上记录探测往返时间
+    assert result["activity"]["probe_rtt_ms"] is not None
@@ -0,0 +1,203 @@
+"""启动预热：预热期间只推送启动后发生的事件（按数据源时区换算），全部就绪或超时后开放推送"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from astrbot_plugin_disaster_warning.message_manager import MessagePushManager
+from astrbot_plugin_disaster_warning.models import (
+    DataSource,
+    DisasterEvent,
+    DisasterType,
+    EarthquakeData,
+    TsunamiData,
+    WeatherAlarmData,
+)
+from astrbot_plugin_disaster_warning.warm_start import WarmStartGate
+
+_BEIJING = timezone(timedelta(hours=8))
+_JST = timezone(timedelta(hours=9))
+
+
+def _local(tz: timezone, seconds_ago: float) -> datetime:
+    """数据源本地时间（不带时区，与处理器解析结果一致）"""
+    return (datetime.now(tz) - timedelta(seconds=seconds_ago)).replace(tzinfo=None)
+
+
+def _quake(
+    seconds_ago: float,
+    source: DataSource = DataSource.FAN_STUDIO_CENC,
+    tz: timezone = _BEIJING,
+) -> DisasterEvent:
+    data = EarthquakeData(
+        id=f"{source.value}-{seconds_ago}",
+        event_id=f"{seconds_ago}",
+        source=source,
+        disaster_type=DisasterType.EARTHQUAKE,
+        shock_time=_local(tz, seconds_ago),
+        latitude=36.51,
+        longitude=78.15,
+        magnitude=4.8,
+        place_name="新疆和田地区皮山县",
+    )
+    return DisasterEvent(
+        id=data.id, data=data, source=source, disaster_type=DisasterType.EARTHQUAKE
+    )
+
+
+def _tsunami(issue_time: datetime | None, level: str = "Watch") -> DisasterEvent:
+    data = TsunamiData(
+        id="552-20251208",
+        code="552",
+        source=DataSource.P2P_EARTHQUAKE,
+        title="津波予報 - Focus",
+        level=level,
+        issue_time=issue_time,
+        forecasts=[{"name": "北海道太平洋沿岸中部", "grade": level, "immediate": False}],
+    )
+    return DisasterEvent(
+        id=data.id, data=data, source=data.source, disaster_type=DisasterType.TSUNAMI
+    )
+
+
+def _weather(seconds_ago: float) -> DisasterEvent:
+    data = WeatherAlarmData(
+        id="44030041600000_20251202194532",
+        source=DataSource.FAN_STUDIO_WEATHER,
+        headline="深圳市气象台发布暴雨黄色预警信号",
+        title="暴雨黄色预警",
+        description="",
+        type="11B03",
+        effective_time=_local(_BEIJING, seconds_ago),
+    )
+    return DisasterEvent(
+        id=data.id,
+        data=data,
+        source=data.source,
+        disaster_type=DisasterType.WEATHER_ALARM,
+    )
+
+
+def _warming(*sources: str, timeout: float = 30) -> WarmStartGate:
+    gate = WarmStartGate(timeout)
+    gate.begin(set(sources) or {"p2p_main"})
+    return gate
+
+
+def test_gate_is_open_before_begin():
+    gate = WarmStartGate()
+    assert gate.ready
+    assert gate.admit(_quake(1200))
+    assert gate.get_stats()["time_to_ready"] is None
+
+
+def test_zero_timeout_or_no_sources_opens_immediately():
+    no_sources = WarmStartGate()
+    no_sources.begin(set())
+    for gate in (_warming("p2p_main", timeout=0), no_sources):
+        assert gate.ready
+        assert gate.time_to_ready is not None
+        assert gate.admit(_quake(1200))
+
+
+def test_old_events_are_suppressed_during_warm_up():
+    gate = _warming()
+    # 重放的20分钟前的地震、海啸与气象预警
+    assert not gate.admit(_quake(1200))
+    assert not gate.admit(_tsunami(_local(_JST, 1200)))
+    assert not gate.admit(_weather(1200))
+    # 没有发震/发布时间的事件无法判断新旧
+    assert not gate.admit(_tsunami(None))
+    assert gate.suppressed == 4
+
+
+def test_events_after_start_are_admitted_within_margin():
+    gate = _warming()
+    assert gate.admit(_quake(0))
+    assert gate.admit(_weather(0))
+    # 启动前不超过30秒的地震仍视为新事件，更早的不推送
+    assert gate.admit(_quake(20))
+    assert not gate.admit(_quake(40))
+    # 带时区的时间直接换算
+    assert gate.admit(_tsunami(datetime.now(timezone.utc) - timedelta(seconds=10)))
+    assert gate.suppressed == 1
+
+
+def test_source_timezone_is_applied():
+    gate = _warming()
+    # 日本数据源的本地时间按日本时间换算：若按北京时间读取，40分钟前会被当作20分钟后
+    assert not gate.admit(_quake(2400, DataSource.WOLFX_JMA_EEW, _JST))
+    assert gate.admit(_quake(10, DataSource.WOLFX_JMA_EEW, _JST))
+    # 北京时间若按日本时间读取会被当作1小时前
+    assert gate.admit(_quake(10, DataSource.FAN_STUDIO_CEA, _BEIJING))
+
+
+def test_opens_when_every_source_reports():
+    gate = _warming("p2p_main", "wolfx_cenc_eqlist")
+    gate.expect("global_quake")
+    gate.report("unknown_source")
+    gate.report("p2p_main")
+    gate.report("p2p_main")
+    gate.report("wolfx_cenc_eqlist")
+    assert not gate.ready
+    assert gate.get_stats()["pending"] == ["global_quake"]
+
+    gate.report("global_quake")
+    assert gate.ready and not gate.timed_out
+    assert set(gate.get_stats()["reported"]) == {
+        "p2p_main",
+        "wolfx_cenc_eqlist",
+        "global_quake",
+    }
+    # 开放后不再追加等待的数据源，旧事件照常推送
+    gate.expect("late_source")
+    assert "late_source" not in gate.expected
+    assert gate.admit(_quake(1200))
+    assert gate.suppressed == 0
+
+
+def test_opens_on_timeout_with_pending_sources():
+    gate = _warming("p2p_main", "wolfx_cenc_eqlist")
+    gate.report("p2p_main")
+    assert not gate.check()
+
+    gate.started_at -= 31
+    assert gate.check()
+    stats = gate.get_stats()
+    assert stats["timed_out"]
+    assert stats["pending"] == ["wolfx_cenc_eqlist"]
+    assert stats["time_to_ready"] >= 30
+
+
+def test_suppressed_event_is_recorded_but_not_sent():
+    class _Context:
+        def __init__(self):
+            self.sent = []
+
+        async def send_message(self, session, message):
+            self.sent.append((session, message))
+
+    context = _Context()
+    manager = MessagePushManager(
+        {
+            "target_groups": ["10001"],
+            "platform_name": "aiocqhttp",
+            "earthquake_whitelist_include_international": True,
+        },
+        context,
+    )
+    manager.warm_start.begin({"p2p_main"})
+
+    # 重启前已推送过的海啸预报：预热期间只记录
+    replayed = _tsunami(_local(_JST, 1200))
+    assert not asyncio.run(manager.push_event(replayed))
+    assert manager.warm_start.suppressed == 1
+    assert not context.sent
+
+    # 开放推送后同一预报的重发不被当作新事件
+    manager.warm_start.report("p2p_main")
+    assert not asyncio.run(manager.push_event(replayed))
+    assert not context.sent
+    assert manager.deduplicator.bulletin_resends == 1
+    # 状态变化照常推送
+    assert asyncio.run(manager.push_event(_tsunami(_local(_JST, 60), "Warning")))
+    assert len(context.sent) == 1
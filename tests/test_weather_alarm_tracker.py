@@ -0,0 +1,224 @@
+"""气象预警生命周期：地区与颜色解析、状态转换、假时钟下的有效期与数量上限、按省份查询"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from astrbot_plugin_disaster_warning.message_manager import MessagePushManager
+from astrbot_plugin_disaster_warning.models import (
+    DataSource,
+    DisasterEvent,
+    DisasterType,
+    WeatherAlarmData,
+)
+from astrbot_plugin_disaster_warning.weather_alarm_tracker import (
+    TRANSITION_DOWNGRADE,
+    TRANSITION_ISSUE,
+    TRANSITION_LIFT,
+    TRANSITION_RENEW,
+    TRANSITION_UNTRACKED,
+    TRANSITION_UPGRADE,
+    WeatherAlarmTracker,
+    parse_alarm,
+)
+
+_START = datetime(2025, 6, 1, 8, 0)
+
+
+class _Clock:
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+def _alarm(
+    headline: str,
+    region: str = "440300",
+    issued: datetime = _START,
+    title: str | None = None,
+) -> WeatherAlarmData:
+    """CMA预警：ID为14位行政区划等代码加发布时间，续发时发布时间变化"""
+    return WeatherAlarmData(
+        id=f"{region}41600000_{issued:%Y%m%d%H%M%S}",
+        source=DataSource.FAN_STUDIO_WEATHER,
+        headline=headline,
+        title=title if title is not None else headline[-8:],
+        description="",
+        type="11B03",
+        effective_time=issued,
+    )
+
+
+def test_parse_alarm_region_kind_and_colour():
+    assert parse_alarm(_alarm("深圳市气象台发布暴雨黄色预警信号")) == (
+        "440300",
+        "暴雨",
+        "黄色",
+        False,
+    )
+    # 较长的类型名优先，颜色取最后出现的（"由黄色升级为橙色"）
+    assert parse_alarm(
+        _alarm("北京市气象台将雷雨大风预警由黄色升级为橙色", region="110000")
+    ) == ("110000", "雷雨大风", "橙色", False)
+    assert parse_alarm(_alarm("深圳市气象台解除暴雨黄色预警信号"))[2:] == (
+        "黄色",
+        True,
+    )
+    # 标题中没有已知类型时使用类型编码
+    assert parse_alarm(_alarm("某气象台发布预警", title="预警"))[1:3] == (
+        "11B03",
+        None,
+    )
+
+
+def test_unrecognised_ids_are_untracked():
+    tracker = WeatherAlarmTracker()
+    for alarm_id in ("test-alarm", "44030_abc", "4403004160000020250601080000"):
+        data = _alarm("深圳市气象台发布暴雨黄色预警信号")
+        data.id = alarm_id
+        assert parse_alarm(data) is None
+        assert tracker.update(data) == TRANSITION_UNTRACKED
+    assert not tracker.active
+    assert tracker.get_stats()["transitions"] == {TRANSITION_UNTRACKED: 3}
+
+
+def test_lifecycle_transitions():
+    clock = _Clock(_START)
+    tracker = WeatherAlarmTracker(clock=clock)
+    steps = [
+        ("发布暴雨黄色预警信号", TRANSITION_ISSUE),
+        ("继续发布暴雨黄色预警信号", TRANSITION_RENEW),
+        ("暴雨预警由黄色升级为红色", TRANSITION_UPGRADE),
+        ("暴雨预警由红色降级为橙色", TRANSITION_DOWNGRADE),
+        ("解除暴雨橙色预警信号", TRANSITION_LIFT),
+    ]
+    for minutes, (text, expected) in enumerate(steps):
+        clock.now = _START + timedelta(minutes=30 * minutes)
+        data = _alarm(f"深圳市气象台{text}", issued=clock.now)
+        assert tracker.update(data) == expected, text
+        if expected != TRANSITION_LIFT:
+            (alarm,) = tracker.active.values()
+            assert alarm.alarm_id == data.id
+            assert alarm.issued_at == clock.now
+
+    assert not tracker.active
+    assert not tracker.by_province
+    # 同一地区的其他类型互不影响；未生效的预警被解除也照常记为解除
+    assert tracker.update(_alarm("深圳市气象台发布大风蓝色预警信号")) == TRANSITION_ISSUE
+    assert tracker.update(_alarm("深圳市气象台解除高温预警信号")) == TRANSITION_LIFT
+    assert list(tracker.active) == [("440300", "大风")]
+
+
+def test_unlifted_alarms_expire_after_ttl():
+    clock = _Clock(_START)
+    tracker = WeatherAlarmTracker(ttl_hours=24, clock=clock)
+    tracker.update(_alarm("深圳市气象台发布高温橙色预警信号"))
+    tracker.update(_alarm("北京市气象台发布高温黄色预警信号", region="110000"))
+
+    # 续发延长有效期，堆中旧条目到期时被跳过
+    clock.now = _START + timedelta(hours=20)
+    assert (
+        tracker.update(_alarm("深圳市气象台发布高温橙色预警信号", issued=clock.now))
+        == TRANSITION_RENEW
+    )
+    clock.now = _START + timedelta(hours=24, seconds=1)
+    assert tracker.province_counts() == {"广东": 1}
+    assert tracker.expired == 1
+
+    clock.now = _START + timedelta(hours=44, seconds=1)
+    assert tracker.province_counts() == {}
+    assert tracker.expired == 2
+    assert not tracker._expiry_heap
+    # 失效后再次发布按新预警处理
+    assert tracker.update(_alarm("深圳市气象台发布高温橙色预警信号")) == TRANSITION_ISSUE
+
+
+def test_cap_evicts_earliest_expiring():
+    clock = _Clock(_START)
+    tracker = WeatherAlarmTracker(max_active=3, clock=clock)
+    regions = ("440300", "440100", "110000", "510100")
+    for minutes, region in enumerate(regions):
+        clock.now = _START + timedelta(minutes=minutes)
+        tracker.update(_alarm("气象台发布暴雨蓝色预警信号", region=region))
+    assert set(tracker.active) == {(region, "暴雨") for region in regions[1:]}
+    assert tracker.evicted == 1
+
+    # 续发更新到期时间后，淘汰顺序随之改变
+    clock.now = _START + timedelta(minutes=10)
+    tracker.update(_alarm("气象台发布暴雨蓝色预警信号", region="440100"))
+    tracker.update(_alarm("气象台发布暴雨蓝色预警信号", region="440300"))
+    assert ("110000", "暴雨") not in tracker.active
+    assert tracker.get_stats() == {
+        "active": 3,
+        "max_active": 3,
+        "transitions": {TRANSITION_ISSUE: 5, TRANSITION_RENEW: 1},
+        "expired": 0,
+        "evicted": 2,
+    }
+
+
+def test_heap_stays_bounded_under_renewals():
+    clock = _Clock(_START)
+    tracker = WeatherAlarmTracker(clock=clock)
+    for minutes in range(500):
+        clock.now = _START + timedelta(minutes=minutes)
+        tracker.update(_alarm("深圳市气象台发布暴雨黄色预警信号", issued=clock.now))
+    assert len(tracker.active) == 1
+    assert len(tracker._expiry_heap) <= 2 * len(tracker.active) + 64
+
+
+def test_active_alarms_by_province():
+    tracker = WeatherAlarmTracker()
+    tracker.update(_alarm("深圳市气象台发布暴雨黄色预警信号"))
+    tracker.update(_alarm("广州市气象台发布雷电红色预警信号", region="440100"))
+    tracker.update(_alarm("成都市气象台发布高温橙色预警信号", region="510100"))
+    # 无法对应省份的行政区划代码归入None
+    tracker.update(_alarm("气象台发布大雾黄色预警信号", region="990000"))
+
+    guangdong = tracker.active_alarms("广东")
+    assert [(alarm.kind, alarm.color) for alarm in guangdong] == [
+        ("雷电", "红色"),
+        ("暴雨", "黄色"),
+    ]
+    assert guangdong[0].to_dict()["province"] == "广东"
+    assert tracker.active_alarms("西藏") == []
+    assert tracker.province_counts() == {"广东": 2, "四川": 1, None: 1}
+
+
+def test_renewal_is_not_pushed():
+    class _Context:
+        def __init__(self):
+            self.sent = []
+
+        async def send_message(self, session, message):
+            self.sent.append((session, message))
+
+    context = _Context()
+    manager = MessagePushManager(
+        {"target_groups": ["10001"], "platform_name": "aiocqhttp"}, context
+    )
+
+    def push(text: str, minutes: int) -> bool:
+        # 处理器给出的是本地时间，续发的预警ID随发布时间变化
+        data = _alarm(
+            f"广东省深圳市气象台{text}",
+            issued=datetime.now().replace(microsecond=0) + timedelta(minutes=minutes),
+        )
+        event = DisasterEvent(
+            id=data.id,
+            data=data,
+            source=data.source,
+            disaster_type=DisasterType.WEATHER_ALARM,
+        )
+        return asyncio.run(manager.push_event(event))
+
+    assert push("发布暴雨黄色预警信号", 0)
+    assert not push("继续发布暴雨黄色预警信号", 1)
+    assert push("暴雨预警由黄色升级为橙色", 2)
+    assert len(context.sent) == 2
+    assert manager.weather_alarms.get_stats()["transitions"] == {
+        TRANSITION_ISSUE: 1,
+        TRANSITION_RENEW: 1,
+        TRANSITION_UPGRADE: 1,
+    }
@@ -0,0 +1,129 @@
+"""WebSocket连接监督：对本地替身测量重连间隔（1012立即重连一次、退避、稳定后清零、连续失败上限）"""
+
+import asyncio
+import socket
+import time
+
+from aiohttp import WSCloseCode, web
+
+from astrbot_plugin_disaster_warning.websocket_manager import WebSocketManager
+
+INITIAL_DELAY = 0.1
+STABLE_AFTER = 0.3
+# 事件循环调度与本机握手的余量
+SLACK = 0.08
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _manager(**config) -> WebSocketManager:
+    return WebSocketManager(
+        {
+            "staleness_watchdog_enabled": False,
+            "reconnect_initial_delay": INITIAL_DELAY,
+            "reconnect_interval": 1,
+            "reconnect_jitter": 0,
+            "reconnect_stable_after": STABLE_AFTER,
+            **config,
+        }
+    )
+
+
+class _StandIn:
+    """按顺序以closes中的 (关闭码, 保持秒数) 关闭每个连接，之后的连接保持不动"""
+
+    def __init__(self, closes: list[tuple[int, float]]):
+        self.closes = closes
+        self.connected: list[float] = []
+
+    async def websocket(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connected.append(time.monotonic())
+        index = len(self.connected) - 1
+        if index < len(self.closes):
+            code, hold = self.closes[index]
+            await asyncio.sleep(hold)
+            await ws.close(code=code)
+            return ws
+        async for _ in ws:
+            pass
+        return ws
+
+
+async def _run_stand_in(closes: list[tuple[int, float]]) -> list[float]:
+    stand_in = _StandIn(closes)
+    app = web.Application()
+    app.router.add_get("/ws", stand_in.websocket)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    manager = _manager()
+    await manager.start()
+    task = asyncio.create_task(manager.connect("test_ws", f"ws://127.0.0.1:{port}/ws"))
+    try:
+        deadline = time.monotonic() + 5
+        while len(stand_in.connected) <= len(closes):
+            assert time.monotonic() < deadline, "未完成预期的重连次数"
+            await asyncio.sleep(0.01)
+        return stand_in.connected
+    finally:
+        await manager.stop()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await runner.cleanup()
+
+
+def _gaps(connected: list[float], closes: list[tuple[int, float]]) -> list[float]:
+    """每次断开到下一次连接成功的间隔"""
+    return [
+        connected[i + 1] - connected[i] - closes[i][1] for i in range(len(closes))
+    ]
+
+
+def test_service_restart_reconnects_immediately_once():
+    restart = WSCloseCode.SERVICE_RESTART
+    closes = [(restart, 0), (restart, 0), (restart, 0)]
+    gaps = _gaps(asyncio.run(_run_stand_in(closes)), closes)
+
+    # 第一次1012立即重连；连接未稳定前再次1012回到退避（1倍、2倍初始间隔）
+    assert gaps[0] < SLACK
+    assert INITIAL_DELAY <= gaps[1] < INITIAL_DELAY + SLACK
+    assert 2 * INITIAL_DELAY <= gaps[2] < 2 * INITIAL_DELAY + SLACK
+
+
+def test_backoff_resets_after_stable_connection():
+    going_away = WSCloseCode.GOING_AWAY
+    # 两次短连接后退避增长，稳定运行一次后回到初始间隔
+    closes = [(going_away, 0), (going_away, 0), (going_away, STABLE_AFTER + 0.1)]
+    gaps = _gaps(asyncio.run(_run_stand_in(closes)), closes)
+
+    assert INITIAL_DELAY <= gaps[0] < INITIAL_DELAY + SLACK
+    assert 2 * INITIAL_DELAY <= gaps[1] < 2 * INITIAL_DELAY + SLACK
+    assert INITIAL_DELAY <= gaps[2] < INITIAL_DELAY + SLACK
+
+
+def test_configured_retry_cap_stops_reconnecting():
+    async def run():
+        manager = _manager(reconnect_initial_delay=0.01, max_reconnect_retries=3)
+        await manager.start()
+        try:
+            uri = f"ws://127.0.0.1:{_free_port()}/ws"
+            await asyncio.wait_for(manager.connect("test_ws", uri), 5)
+        finally:
+            await manager.stop()
+        return manager.reconnect_policies["test_ws"]
+
+    policy = asyncio.run(run())
+    # 连续失败达到上限后监督任务自行结束，断路状态为open
+    assert policy.exhausted
+    assert policy.attempts == 3
+    assert policy.total_failures == 4
+    assert policy.get_state()["state"] == "open"
@@ -0,0 +1,139 @@
+"""
+启动预热
+重启后去重记录和推送记录为空，各数据源连接后重放的最近消息、首份地震列表快照都会被当作新事件，
+一小时内的事件会被重新推送到所有会话。预热期间事件照常经过去重和推送判断并记入推送记录，
+但不实际发送；所有启用的数据源都已就绪（或等待超时）后才开放推送。
+预热期间发震/发布时间晚于启动时刻的事件视为真正的新事件，照常推送
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from astrbot.api import logger
+
+from .models import (
+    DisasterEvent,
+    EarthquakeData,
+    TsunamiData,
+    WeatherAlarmData,
+    source_timezone,
+)
+
+# 发震/发布时间早于启动时刻不超过该时间（秒）的事件仍视为新事件（重启前刚发生、尚未推送的地震）
+_FRESH_MARGIN = 30.0
+
+
+def _event_time_utc(event: DisasterEvent) -> datetime | None:
+    """事件的发震/发布时间（按数据源时区转换为UTC）"""
+    data = event.data
+    if isinstance(data, EarthquakeData):
+        event_time = data.shock_time
+    elif isinstance(data, TsunamiData):
+        event_time = data.issue_time
+    elif isinstance(data, WeatherAlarmData):
+        event_time = data.effective_time or data.issue_time
+    else:
+        return None
+    if event_time is None:
+        return None
+    if event_time.tzinfo is None:
+        event_time = event_time.replace(tzinfo=source_timezone(event.source.value))
+    return event_time.astimezone(timezone.utc)
+
+
+class WarmStartGate:
+    """启动预热闸门"""
+
+    def __init__(self, timeout: float = 30.0):
+        self.timeout = max(0.0, timeout)
+        self.started_at: float | None = None
+        self.started_wall: datetime | None = None
+        self.ready_at: float | None = None
+        self.timed_out = False
+        self.expected: set[str] = set()
+        # 数据源 -> 就绪耗时（秒），尚未就绪的数据源不在其中
+        self.reported: dict[str, float] = {}
+        self.suppressed = 0
+
+    def begin(self, sources: set[str]):
+        """开始预热，sources为需要等待就绪的数据源"""
+        self.started_at = time.monotonic()
+        self.started_wall = datetime.now(timezone.utc)
+        self.expected = set(sources)
+        self.reported.clear()
+        self.ready_at = None
+        self.timed_out = False
+        if not self.timeout or not self.expected:
+            self._open()
+
+    def expect(self, source: str):
+        """预热开始后追加需要等待的数据源"""
+        if not self.ready:
+            self.expected.add(source)
+
+    @property
+    def ready(self) -> bool:
+        # 尚未开始预热时（如服务未启动）不拦截推送
+        return self.started_at is None or self.ready_at is not None
+
+    @property
+    def pending(self) -> set[str]:
+        return self.expected - self.reported.keys()
+
+    def report(self, source: str):
+        """数据源已就绪"""
+        if self.ready or source in self.reported or source not in self.expected:
+            return
+        self.reported[source] = time.monotonic() - self.started_at
+        logger.debug(
+            f"[灾害预警] 启动预热：{source} 已就绪（{self.reported[source]:.1f} 秒）"
+        )
+        self.check()
+
+    def check(self) -> bool:
+        """检查是否可以开放推送（全部数据源就绪或等待超时）"""
+        if self.ready:
+            return True
+        if not self.pending:
+            self._open()
+        elif time.monotonic() - self.started_at >= self.timeout:
+            self.timed_out = True
+            self._open()
+        return self.ready
+
+    def _open(self):
+        self.ready_at = time.monotonic()
+        message = f"[灾害预警] 启动预热完成，用时 {self.time_to_ready:.1f} 秒，预热期间未推送 {self.suppressed} 条旧事件"
+        if self.timed_out:
+            message += f"（等待超时，未就绪：{', '.join(sorted(self.pending))}）"
+        logger.info(message)
+
+    @property
+    def time_to_ready(self) -> float | None:
+        if self.started_at is None or self.ready_at is None:
+            return None
+        return self.ready_at - self.started_at
+
+    def admit(self, event: DisasterEvent) -> bool:
+        """判断事件是否可以推送：预热期间只推送启动后发生的事件"""
+        if self.ready:
+            return True
+        event_time = _event_time_utc(event)
+        if event_time is not None and event_time >= self.started_wall - timedelta(
+            seconds=_FRESH_MARGIN
+        ):
+            return True
+        self.suppressed += 1
+        return False
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取预热统计"""
+        return {
+            "ready": self.ready,
+            "time_to_ready": self.time_to_ready,
+            "timed_out": self.timed_out,
+            "pending": sorted(self.pending),
+            "reported": dict(self.reported),
+            "suppressed": self.suppressed,
+        }
@@ -0,0 +1,241 @@
+"""
+气象预警生命周期跟踪
+FAN Studio逐条推送气象预警，同一地区同一类预警的发布、升级、续发与解除互不关联，
+续发（同级别重新发布）也会被当作新预警推送。这里按行政区划代码与预警类型跟踪当前生效的预警：
+- 发布、升级、降级、解除为状态转换，照常推送
+- 同级别续发只延长有效期，不推送
+未解除的预警在最后一次发布/续发后超过有效期自动失效；
+按省份建立索引，查询某省生效中的预警只遍历该省的预警
+"""
+
+import heapq
+import re
+from collections import defaultdict
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from typing import Any
+
+from astrbot.api import logger
+
+from .models import PROVINCE_CODES, WeatherAlarmData
+
+# 状态转换
+TRANSITION_ISSUE = "issue"
+TRANSITION_UPGRADE = "upgrade"
+TRANSITION_DOWNGRADE = "downgrade"
+TRANSITION_RENEW = "renew"
+TRANSITION_LIFT = "lift"
+# 无法识别地区的预警（不跟踪，照常推送）
+TRANSITION_UNTRACKED = "untracked"
+
+TRANSITION_NAMES = {
+    TRANSITION_ISSUE: "发布",
+    TRANSITION_UPGRADE: "升级",
+    TRANSITION_DOWNGRADE: "降级",
+    TRANSITION_RENEW: "续发",
+    TRANSITION_LIFT: "解除",
+}
+
+_COLOR_RANKS = {"蓝色": 1, "黄色": 2, "橙色": 3, "红色": 4}
+_COLOR_PATTERN = re.compile(r"蓝色|黄色|橙色|红色")
+_LIFT_KEYWORDS = ("解除", "取消")
+
+# 预警信号类型，较长的名称优先匹配（如"雷雨大风"优先于"大风"）
+_ALARM_KINDS = tuple(
+    sorted(
+        (
+            "台风", "暴雨", "暴雪", "寒潮", "大风", "沙尘暴", "沙尘", "高温",
+            "干旱", "雷电", "冰雹", "霜冻", "大雾", "霾", "道路结冰", "雷雨大风",
+            "森林火险", "草原火险", "低温", "持续低温", "强对流", "干热风",
+            "地质灾害气象风险", "山洪灾害气象风险", "渍涝风险", "城市内涝",
+        ),
+        key=len,
+        reverse=True,
+    )
+)  # fmt: skip
+
+# CMA预警ID：行政区划代码等（14位）_发布时间，如 44170041600000_20250425123759
+_ALARM_ID_PATTERN = re.compile(r"^(\d{6})\d*_\d+$")
+
+
+def parse_alarm(data: WeatherAlarmData) -> tuple[str, str, str | None, bool] | None:
+    """解析预警的(行政区划代码, 预警类型, 颜色, 是否解除)，无法识别地区时返回None"""
+    match = _ALARM_ID_PATTERN.match(data.id or "")
+    if not match:
+        return None
+    text = f"{data.headline} {data.title}"
+    kind = next((kind for kind in _ALARM_KINDS if kind in text), data.type or "未知")
+    colors = _COLOR_PATTERN.findall(text)
+    lifted = any(keyword in text for keyword in _LIFT_KEYWORDS)
+    return match.group(1), kind, colors[-1] if colors else None, lifted
+
+
+class ActiveAlarm:
+    """某地区某类生效中的预警"""
+
+    __slots__ = (
+        "region_code",
+        "province",
+        "kind",
+        "color",
+        "alarm_id",
+        "headline",
+        "issued_at",
+        "expires_at",
+    )
+
+    def __init__(self, region_code: str, province: str | None, kind: str):
+        self.region_code = region_code
+        self.province = province
+        self.kind = kind
+        self.color: str | None = None
+        self.alarm_id = ""
+        self.headline = ""
+        self.issued_at: datetime | None = None
+        self.expires_at = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "region_code": self.region_code,
+            "province": self.province,
+            "kind": self.kind,
+            "color": self.color,
+            "alarm_id": self.alarm_id,
+            "headline": self.headline,
+            "issued_at": self.issued_at,
+            "expires_at": datetime.fromtimestamp(self.expires_at),
+        }
+
+
+class WeatherAlarmTracker:
+    """按(行政区划代码, 预警类型)跟踪生效中的气象预警"""
+
+    def __init__(
+        self,
+        ttl_hours: float = 24,
+        max_active: int = 10000,
+        clock: Callable[[], datetime] = datetime.now,
+    ):
+        self.ttl = timedelta(hours=ttl_hours)
+        self.max_active = max(1, max_active)
+        self.clock = clock
+        self.active: dict[tuple[str, str], ActiveAlarm] = {}
+        # 省份 -> 该省生效中的预警
+        self.by_province: defaultdict[
+            str | None, dict[tuple[str, str], ActiveAlarm]
+        ] = defaultdict(dict)
+        # 过期时间最小堆：(过期时间戳, 键)。续发后旧条目留在堆中，出堆时按过期时间识别并跳过
+        self._expiry_heap: list[tuple[float, tuple[str, str]]] = []
+        self.transitions: dict[str, int] = defaultdict(int)
+        self.expired = 0
+        self.evicted = 0
+
+    def update(self, data: WeatherAlarmData) -> str:
+        """记录一条预警，返回状态转换类型"""
+        self.expire()
+        parsed = parse_alarm(data)
+        if parsed is None:
+            self.transitions[TRANSITION_UNTRACKED] += 1
+            return TRANSITION_UNTRACKED
+
+        region_code, kind, color, lifted = parsed
+        key = (region_code, kind)
+        alarm = self.active.get(key)
+
+        if lifted:
+            if alarm:
+                self._remove(key)
+            transition = TRANSITION_LIFT
+        else:
+            if alarm is None:
+                transition = TRANSITION_ISSUE
+                province = PROVINCE_CODES.get(region_code[:2])
+                alarm = ActiveAlarm(region_code, province, kind)
+                self.active[key] = alarm
+                self.by_province[alarm.province][key] = alarm
+            else:
+                old_rank = _COLOR_RANKS.get(alarm.color, 0)
+                new_rank = _COLOR_RANKS.get(color, 0)
+                if new_rank > old_rank:
+                    transition = TRANSITION_UPGRADE
+                elif new_rank < old_rank:
+                    transition = TRANSITION_DOWNGRADE
+                else:
+                    transition = TRANSITION_RENEW
+
+            alarm.color = color
+            alarm.alarm_id = data.id
+            alarm.headline = data.headline or data.title
+            alarm.issued_at = data.effective_time or data.issue_time
+            alarm.expires_at = (self.clock() + self.ttl).timestamp()
+            heapq.heappush(self._expiry_heap, (alarm.expires_at, key))
+            self._enforce_limit()
+
+        self.transitions[transition] += 1
+        logger.debug(
+            "[灾害预警] 气象预警%s: %s %s %s",
+            TRANSITION_NAMES[transition],
+            region_code,
+            kind,
+            color or "",
+        )
+        return transition
+
+    def _remove(self, key: tuple[str, str]):
+        alarm = self.active.pop(key)
+        province_alarms = self.by_province[alarm.province]
+        del province_alarms[key]
+        if not province_alarms:
+            del self.by_province[alarm.province]
+
+    def _pop(self) -> bool:
+        """弹出堆顶条目，条目仍有效时删除对应预警并返回True"""
+        expires_at, key = heapq.heappop(self._expiry_heap)
+        alarm = self.active.get(key)
+        if alarm is None or alarm.expires_at != expires_at:
+            return False
+        self._remove(key)
+        return True
+
+    def _enforce_limit(self):
+        # 堆中过时的条目过多时重建，堆大小不超过生效预警数的2倍
+        if len(self._expiry_heap) > 2 * len(self.active) + 64:
+            self._expiry_heap = [
+                (alarm.expires_at, key) for key, alarm in self.active.items()
+            ]
+            heapq.heapify(self._expiry_heap)
+        while len(self.active) > self.max_active:
+            if self._pop():
+                self.evicted += 1
+
+    def expire(self):
+        """清理超过有效期的预警"""
+        now = self.clock().timestamp()
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            if self._pop():
+                self.expired += 1
+
+    def active_alarms(self, province: str) -> list[ActiveAlarm]:
+        """某省生效中的预警（按颜色从高到低）"""
+        self.expire()
+        alarms = list(self.by_province.get(province, {}).values())
+        alarms.sort(key=lambda alarm: _COLOR_RANKS.get(alarm.color, 0), reverse=True)
+        return alarms
+
+    def province_counts(self) -> dict[str | None, int]:
+        """各省生效中的预警数量"""
+        self.expire()
+        return {
+            province: len(alarms) for province, alarms in self.by_province.items()
+        }
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取预警跟踪统计"""
+        return {
+            "active": len(self.active),
+            "max_active": self.max_active,
+            "transitions": dict(self.transitions),
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
@@ -3,7 +3,10 @@ WebSocket连接管理器
 """
 
 import asyncio
+import time
+from collections import deque
 from collections.abc import Callable
+from datetime import datetime, timezone
 from typing import Any
 
 import aiohttp
@@ -11,6 +14,219 @@ import websockets
 
 from astrbot.api import logger
 
+from .frame_classifier import FrameClassifier
+from .global_quake_protocol import KEEPALIVE_REPLY, GlobalQuakeFramer
+from .models import MessageEnvelope
+from .reconnect_policy import ReconnectPolicy
+
+# 入站队列溢出策略
+OVERFLOW_AUTO = "auto"  # 按消息类别：心跳类帧可丢弃，数据帧从不丢弃
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # 丢弃最旧的消息，保证读取不阻塞
+OVERFLOW_BLOCK = "block"  # 从不丢弃，队列满时读取端等待（反压）
+
+# WebSocket关闭码 1012: Service Restart
+_CLOSE_SERVICE_RESTART = 1012
+
+# 地震预警类连接关键词：这些连接可能数天没有数据，需要主动探测
+_WARNING_FEED_KEYWORDS = ("eew", "cea", "cwa", "p2p")
+
+# 各数据源允许的最长静默时间（秒，心跳也计入）：
+# FAN Studio / Wolfx 定期推送应用层心跳，P2P 定期推送各地域节点数（555）
+FEED_SILENCE_BUDGETS = {
+    "fan_studio": 180,
+    "wolfx": 180,
+    "p2p": 900,
+}
+
+# HTTP连接池：每个主机的最大连接数，DNS缓存时间（秒）
+_HTTP_LIMIT_PER_HOST = 4
+_HTTP_DNS_CACHE_TTL = 300
+
+# 静默检查周期（秒）
+_WATCHDOG_TICK = 1.0
+# 主动探测等待pong的最长时间（秒）
+_PROBE_TIMEOUT = 5.0
+# 每个连接保留的断线区间数
+_OUTAGE_HISTORY = 20
+
+
+class IngressQueue:
+    """单个连接的有界入站队列 - 隔离socket读取与消息处理
+
+    auto策略按消息类别处理溢出：心跳类帧（心跳、P2P的555/561等）可丢弃，
+    队列满时优先丢弃最旧的心跳类帧；数据帧从不丢弃，没有可丢弃的帧时读取端等待
+    """
+
+    def __init__(self, name: str, max_size: int, overflow_policy: str):
+        self.name = name
+        self.overflow_policy = overflow_policy
+        self.max_size = max(1, max_size)
+        # (消息, 入队时间, 是否可丢弃)
+        self._items: deque[tuple[Any, float, bool]] = deque()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._unfinished = 0
+        self.consumer_tasks: list[asyncio.Task] = []
+
+        # 统计信息
+        self.enqueued = 0
+        self.dequeued = 0
+        self.processed = 0
+        self.dropped = 0
+        self.dropped_data = 0  # 其中的数据帧
+        self.blocked = 0  # 读取端因队列满而等待的次数
+        self.blocked_time = 0.0
+        self.max_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def put(self, item: Any, droppable: bool = False):
+        """入队 - 根据溢出策略处理队列已满的情况
+
+        droppable表示心跳类帧，只在auto策略下影响溢出处理
+        """
+        if len(self._items) >= self.max_size and not await self._make_room(droppable):
+            return
+
+        self._items.append((item, time.monotonic(), droppable))
+        self._unfinished += 1
+        self.enqueued += 1
+        self._not_empty.set()
+        depth = len(self._items)
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    async def _make_room(self, droppable: bool) -> bool:
+        """队列已满时腾出位置，返回False表示丢弃新消息本身"""
+        if self.overflow_policy == OVERFLOW_DROP_OLDEST:
+            self._evict(0)
+            return True
+        if self.overflow_policy == OVERFLOW_AUTO:
+            for index, (_, _, queued_droppable) in enumerate(self._items):
+                if queued_droppable:
+                    self._evict(index)
+                    return True
+            if droppable:
+                self.dropped += 1
+                return False
+
+        # block策略（或auto策略下队列中全是数据帧）时在此等待，读取端随之暂停
+        self.blocked += 1
+        started = time.monotonic()
+        while len(self._items) >= self.max_size:
+            self._not_full.clear()
+            await self._not_full.wait()
+        self.blocked_time += time.monotonic() - started
+        return True
+
+    def _evict(self, index: int):
+        _, _, droppable = self._items[index]
+        del self._items[index]
+        self._unfinished -= 1
+        self.dropped += 1
+        if not droppable:
+            self.dropped_data += 1
+
+    @property
+    def idle(self) -> bool:
+        """已入队的消息都已处理完毕"""
+        return self._unfinished == 0
+
+    async def get(self) -> Any:
+        """出队 - 同时记录排队等待时间"""
+        while not self._items:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        item, enqueue_time, _ = self._items.popleft()
+        self._not_full.set()
+        self.dequeued += 1
+        wait = time.monotonic() - enqueue_time
+        self.total_wait += wait
+        if wait > self.max_wait:
+            self.max_wait = wait
+        return item
+
+    def task_done(self):
+        self.processed += 1
+        self._unfinished -= 1
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取队列统计"""
+        return {
+            "depth": len(self._items),
+            "max_size": self.max_size,
+            "max_depth": self.max_depth,
+            "overflow_policy": self.overflow_policy,
+            "consumers": len(self.consumer_tasks),
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "dropped_data": self.dropped_data,
+            "blocked": self.blocked,
+            "blocked_ms": self.blocked_time * 1000,
+            "avg_wait_ms": (self.total_wait / self.dequeued * 1000)
+            if self.dequeued > 0
+            else 0.0,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+
+class FeedActivity:
+    """单个连接的收发活动记录（单调时钟）"""
+
+    def __init__(self):
+        self.connected_at: float | None = None
+        self.last_frame = 0.0  # 任意帧（含心跳）
+        self.last_data: float | None = None  # 需要处理的数据帧
+        self.last_heartbeat: float | None = None  # 应用层心跳帧
+        self.last_probe = 0.0
+        self.probe_rtt: float | None = None
+        self.probing = False
+        self.stale_reconnects = 0
+        self.frames = 0
+
+    def mark_connected(self):
+        now = time.monotonic()
+        self.connected_at = now
+        self.last_frame = now
+        self.last_probe = now
+
+    def get_stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "connected": self.connected_at is not None,
+            "last_frame_age": now - self.last_frame if self.last_frame else None,
+            "last_data_age": now - self.last_data if self.last_data else None,
+            "last_heartbeat_age": (
+                now - self.last_heartbeat if self.last_heartbeat else None
+            ),
+            "probe_rtt_ms": (
+                self.probe_rtt * 1000 if self.probe_rtt is not None else None
+            ),
+            "stale_reconnects": self.stale_reconnects,
+        }
+
+
+class Outage:
+    """单次断线区间（UTC墙钟时间，回补历史数据时按此筛选）"""
+
+    def __init__(self, start: datetime):
+        self.start = start
+        self.end: datetime | None = None
+
+    @property
+    def duration(self) -> float:
+        end = self.end or datetime.now(timezone.utc)
+        return (end - self.start).total_seconds()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "start": self.start.isoformat(timespec="seconds"),
+            "end": self.end.isoformat(timespec="seconds") if self.end else None,
+            "duration": self.duration,
+        }
+
 
 class WebSocketManager:
     """WebSocket连接管理器"""
@@ -20,35 +236,113 @@ class WebSocketManager:
         self.message_logger = message_logger
         self.connections: dict[str, websockets.WebSocketServerProtocol] = {}
         self.message_handlers: dict[str, Callable] = {}
-        self.reconnect_tasks: dict[str, asyncio.Task] = {}
-        self.connection_retry_counts: dict[str, int] = {}  # 记录每个连接的重试次数
+        self.reconnect_policies: dict[str, ReconnectPolicy] = {}  # 每个连接的重连策略
+        self.ingress_queues: dict[str, IngressQueue] = {}  # 每个连接的入站队列
+        # 心跳和无需处理的帧在读取端直接丢弃（只计数）
+        self.frame_classifier = FrameClassifier(
+            enabled=config.get("frame_filter_enabled", True)
+        )
+        # 静默看门狗：半开连接上游停止发送时，TCP层的ping未必能及时发现
+        self.feed_activity: dict[str, FeedActivity] = {}
+        self.watchdog_enabled = config.get("staleness_watchdog_enabled", True)
+        self.probe_interval = config.get("liveness_probe_interval", 10)
+        self.watchdog_task: asyncio.Task | None = None
+        # 每个连接最近的断线区间
+        self.outages: dict[str, deque[Outage]] = {}
+        # 连接状态监听器 listener(name, connected, outage)
+        self.connection_listeners: list[
+            Callable[[str, bool, Outage | None], None]
+        ] = []
         self.running = False
 
     def register_handler(self, connection_name: str, handler: Callable):
         """注册消息处理器"""
         self.message_handlers[connection_name] = handler
 
-    async def connect(
-        self,
-        name: str,
-        uri: str,
-        headers: dict | None = None,
-        is_retry: bool = False,
+    def add_connection_listener(
+        self, listener: Callable[[str, bool, Outage | None], None]
     ):
-        """建立WebSocket连接"""
-        try:
-            # 如果是重试连接，记录重试次数
-            if is_retry:
-                current_retry = self.connection_retry_counts.get(name, 0) + 1
-                self.connection_retry_counts[name] = current_retry
-                max_retries = self.config.get("max_reconnect_retries", 3)
+        """注册连接状态监听器
+
+        断开时传入新开始的断线区间；重新连接时传入刚结束的断线区间（首次连接为None）
+        """
+        self.connection_listeners.append(listener)
+
+    def _notify_connection(self, name: str, connected: bool):
+        history = self.outages.setdefault(name, deque(maxlen=_OUTAGE_HISTORY))
+        now = datetime.now(timezone.utc)
+        if connected:
+            outage = history[-1] if history and history[-1].end is None else None
+            if outage:
+                outage.end = now
                 logger.info(
-                    f"[灾害预警] 尝试重连 {name} (尝试 {current_retry}/{max_retries})"
+                    f"[灾害预警] {name} 已恢复，断线 {outage.duration:.1f} 秒"
                 )
+        else:
+            outage = Outage(now)
+            history.append(outage)
+
+        for listener in self.connection_listeners:
+            try:
+                listener(name, connected, outage)
+            except Exception as e:
+                logger.error(f"[灾害预警] 连接状态监听器出错 {name}: {e}")
+
+    def get_outages(self) -> dict[str, list[dict[str, Any]]]:
+        """获取各连接最近的断线区间"""
+        return {
+            name: [outage.to_dict() for outage in history]
+            for name, history in self.outages.items()
+            if history
+        }
+
+    async def connect(self, name: str, uri: str, headers: dict | None = None):
+        """连接监督任务 - 建立WebSocket连接，断线后按重连策略重连"""
+        policy = self._get_reconnect_policy(name)
+        while self.running:
+            close_code = await self._run_connection(name, uri, headers, policy)
+            if not self.running:
+                break
+
+            policy.record_disconnected()
+            if close_code == _CLOSE_SERVICE_RESTART:
+                # 上游计划内重启通常很快恢复，第一次重连不等待
+                delay = policy.immediate()
             else:
-                logger.info(f"[灾害预警] 正在连接 {name}: {uri}")
-                # 首次连接时重置重试计数
-                self.connection_retry_counts[name] = 0
+                delay = policy.next_delay()
+            if delay is None:
+                logger.error(
+                    f"[灾害预警] {name} 重连失败，已连续失败 {policy.attempts} 次，将停止重连"
+                )
+                break
+
+            logger.info(
+                f"[灾害预警] {name} 将在 {delay:.1f} 秒后重连 (连续第{policy.attempts}次)"
+            )
+            await asyncio.sleep(delay)
+
+    def _get_reconnect_policy(self, name: str) -> ReconnectPolicy:
+        policy = self.reconnect_policies.get(name)
+        if policy is None:
+            # reconnect_interval作为退避上限
+            policy = ReconnectPolicy.from_config(
+                self.config,
+                max_delay=self.config.get("reconnect_interval", 30),
+            )
+            self.reconnect_policies[name] = policy
+        return policy
+
+    async def _run_connection(
+        self,
+        name: str,
+        uri: str,
+        headers: dict | None,
+        policy: ReconnectPolicy,
+    ) -> int | None:
+        """建立一次连接并读取到断开为止，返回关闭码（连接失败时为None）"""
+        websocket = None
+        try:
+            logger.info(f"[灾害预警] 正在连接 {name}: {uri}")
 
             # 修复：使用更兼容的headers参数
             connect_kwargs = {
@@ -61,49 +355,57 @@ class WebSocketManager:
             if headers:
                 connect_kwargs["headers"] = headers
 
+            ingress_queue = self._get_ingress_queue(name, uri)
+
+            activity = self.feed_activity.setdefault(name, FeedActivity())
+
             async with websockets.connect(**connect_kwargs) as websocket:
                 self.connections[name] = websocket
+                policy.record_connected()
+                activity.mark_connected()
                 logger.info(f"[灾害预警] WebSocket连接成功: {name}")
+                self._notify_connection(name, True)
 
-                # 处理消息
+                # 读取循环只负责入队，解析和推送由消费者任务完成，避免慢速推送阻塞读取
+                frame_classifier = self.frame_classifier
+                label_frame = frame_classifier.label
+                monotonic = time.monotonic
                 async for message in websocket:
-                    try:
-                        # 记录原始消息 - 在处理器查找之前记录，确保所有消息都被记录
-                        if self.message_logger:
-                            self.message_logger.log_websocket_message(
-                                name, message, uri
-                            )
-
-                        # 智能处理器查找（支持前缀匹配）
-                        if name in self.message_handlers:
-                            handler_name = name
-                        else:
-                            # 尝试前缀匹配（解决 fan_studio_usgs -> fan_studio 问题）
-                            handler_name = self._find_handler_by_prefix(name)
-
-                        if handler_name:
-                            # 关键修复：传递连接名称给处理器，确保source信息正确
-                            await self.message_handlers[handler_name](
-                                message, connection_name=name
-                            )
-                        else:
-                            logger.warning(
-                                f"[灾害预警] 未找到消息处理器 - 连接: {name}"
-                            )
-                    except Exception as e:
-                        logger.error(f"[灾害预警] 处理消息时出错 {name}: {e}")
-                        import traceback
-
-                        logger.error(f"[灾害预警] 异常堆栈: {traceback.format_exc()}")
+                    now = activity.last_frame = monotonic()
+                    activity.frames += 1
+                    label = label_frame(name, message)
+                    if label:
+                        if label == "heartbeat":
+                            activity.last_heartbeat = now
+                        if frame_classifier.enabled:
+                            frame_classifier.record(name, label)
+                            continue
+                    else:
+                        activity.last_data = now
+                    # 未启用预过滤时心跳类帧照常入队，但队列满时可以丢弃
+                    await ingress_queue.put(
+                        MessageEnvelope(raw=message, connection_name=name, url=uri),
+                        droppable=label is not None,
+                    )
+
+            logger.warning(f"[灾害预警] WebSocket连接已关闭 {name}")
+            return getattr(websocket, "close_code", None)
 
         except Exception as e:
+            if websocket is None:
+                policy.record_failure()
+
             # 更详细的错误分析和日志
             error_msg = str(e)
-            if "1012" in error_msg and "service restart" in error_msg:
+            close_code = getattr(websocket, "close_code", None)
+            if close_code == _CLOSE_SERVICE_RESTART or (
+                "1012" in error_msg and "service restart" in error_msg
+            ):
                 logger.warning(
                     f"[灾害预警] WebSocket连接收到服务重启通知 {name}: {error_msg}"
                 )
-                logger.info(f"[灾害预警] {name} 服务器正在重启，将在稍后自动重连")
+                logger.info(f"[灾害预警] {name} 服务器正在重启，将立即重连")
+                return _CLOSE_SERVICE_RESTART
             elif "HTTP 502" in error_msg:
                 logger.warning(
                     f"[灾害预警] WebSocket服务器网关错误 {name}: {error_msg}"
@@ -114,43 +416,166 @@ class WebSocketManager:
                 logger.info(f"[灾害预警] {name} 服务器可能暂时不可用")
             else:
                 logger.error(f"[灾害预警] WebSocket连接失败 {name}: {error_msg}")
+            return close_code
 
-            self.connections.pop(name, None)
-
-            # 启动重连任务
-            if self.running:
-                await self._schedule_reconnect(name, uri, headers)
+        finally:
+            was_connected = self.connections.pop(name, None) is not None
+            if name in self.feed_activity:
+                self.feed_activity[name].connected_at = None
+            if was_connected:
+                self._notify_connection(name, False)
 
-    async def _schedule_reconnect(
-        self, name: str, uri: str, headers: dict | None = None
-    ):
-        """计划重连"""
-        if name in self.reconnect_tasks:
-            self.reconnect_tasks[name].cancel()
+    def _get_ingress_queue(self, name: str, uri: str) -> IngressQueue:
+        """获取连接的入站队列，首次使用时创建队列并启动消费者任务"""
+        ingress_queue = self.ingress_queues.get(name)
+        if ingress_queue:
+            return ingress_queue
 
-        async def reconnect():
-            # 获取当前重试次数和最大重试次数
-            current_retry = self.connection_retry_counts.get(name, 0)
-            max_retries = self.config.get("max_reconnect_retries", 3)
+        ingress_queue = IngressQueue(
+            name,
+            self.config.get("ingress_queue_size", 256),
+            self._get_overflow_policy(),
+        )
+        consumer_count = max(1, self.config.get("ingress_consumers", 1))
+        for _ in range(consumer_count):
+            ingress_queue.consumer_tasks.append(
+                asyncio.create_task(self._consume_queue(name, uri, ingress_queue))
+            )
+        self.ingress_queues[name] = ingress_queue
+        return ingress_queue
 
-            # 检查是否已达到最大重试次数
-            if current_retry >= max_retries:
-                logger.error(
-                    f"[灾害预警] {name} 重连失败，已达到最大重试次数 {max_retries}，将停止重连"
-                )
-                return
+    def _get_overflow_policy(self) -> str:
+        """获取入站队列的溢出策略 - 默认auto，按消息类别处理"""
+        policy = self.config.get("ingress_overflow_policy", OVERFLOW_AUTO)
+        if policy in (OVERFLOW_DROP_OLDEST, OVERFLOW_BLOCK):
+            return policy
+        return OVERFLOW_AUTO
 
+    async def _consume_queue(self, name: str, uri: str, ingress_queue: IngressQueue):
+        """入站队列消费者"""
+        while True:
+            envelope = await ingress_queue.get()
             try:
-                await asyncio.sleep(self.config.get("reconnect_interval", 30))
-                # 标记为重试连接
-                await self.connect(name, uri, headers, is_retry=True)
+                await self._dispatch_message(name, uri, envelope)
             except Exception as e:
-                logger.error(f"[灾害预警] 重连失败 {name}: {e}")
-                # 如果还有重试次数，继续安排重连
-                if self.connection_retry_counts.get(name, 0) < max_retries:
-                    await self._schedule_reconnect(name, uri, headers)
+                logger.error(f"[灾害预警] 处理消息时出错 {name}: {e}")
+                import traceback
 
-        self.reconnect_tasks[name] = asyncio.create_task(reconnect())
+                logger.error(f"[灾害预警] 异常堆栈: {traceback.format_exc()}")
+            finally:
+                ingress_queue.task_done()
+
+    async def _dispatch_message(self, name: str, uri: str, envelope: MessageEnvelope):
+        """分发单条消息到处理器并记录"""
+        try:
+            # 智能处理器查找（支持前缀匹配）
+            if name in self.message_handlers:
+                handler_name = name
+            else:
+                # 尝试前缀匹配（解决 fan_studio_usgs -> fan_studio 问题）
+                handler_name = self._find_handler_by_prefix(name)
+
+            if handler_name:
+                # 关键修复：传递连接名称给处理器，确保source信息正确
+                await self.message_handlers[handler_name](envelope, connection_name=name)
+            else:
+                logger.warning(f"[灾害预警] 未找到消息处理器 - 连接: {name}")
+        finally:
+            # 记录原始消息 - 在解析之后记录（包括未找到处理器的消息），
+            # 复用解析时的解码结果，大消息不会在事件循环中被提前解码
+            if self.message_logger:
+                self.message_logger.log_websocket_message(name, envelope, uri)
+
+    def get_queue_stats(self) -> dict[str, dict[str, Any]]:
+        """获取所有入站队列的统计信息"""
+        return {
+            name: ingress_queue.get_stats()
+            for name, ingress_queue in self.ingress_queues.items()
+        }
+
+    def get_frame_stats(self) -> dict[str, dict[str, int]]:
+        """获取每个连接被预过滤的帧数"""
+        return self.frame_classifier.get_stats()
+
+    def _silence_budget(self, name: str) -> float | None:
+        for prefix, budget in FEED_SILENCE_BUDGETS.items():
+            if name.startswith(prefix):
+                return budget
+        return None
+
+    async def _watchdog(self):
+        """静默看门狗 - 超过静默预算的连接强制重连，预警类连接定期主动探测"""
+        while self.running:
+            await asyncio.sleep(_WATCHDOG_TICK)
+            now = time.monotonic()
+            for name, websocket in list(self.connections.items()):
+                activity = self.feed_activity.get(name)
+                if activity is None or activity.connected_at is None:
+                    continue
+
+                budget = self._silence_budget(name)
+                silence = now - activity.last_frame
+                if budget and silence > budget:
+                    self._force_reconnect(
+                        name, websocket, f"已静默 {silence:.0f} 秒（预算 {budget} 秒）"
+                    )
+                    continue
+
+                # 预警类连接可能数天没有数据，通过主动ping在数秒内发现半开连接
+                if (
+                    self.probe_interval > 0
+                    and not activity.probing
+                    and now - activity.last_probe >= self.probe_interval
+                    and any(keyword in name for keyword in _WARNING_FEED_KEYWORDS)
+                ):
+                    activity.probing = True
+                    activity.last_probe = now
+                    asyncio.create_task(self._probe(name, websocket, activity))
+
+    async def _probe(self, name: str, websocket, activity: FeedActivity):
+        """发送ping并等待pong，超时则强制重连"""
+        try:
+            start = time.monotonic()
+            pong_waiter = await websocket.ping()
+            await asyncio.wait_for(
+                pong_waiter,
+                min(self.config.get("connection_timeout", 10), _PROBE_TIMEOUT),
+            )
+            activity.probe_rtt = time.monotonic() - start
+        except asyncio.TimeoutError:
+            if self.connections.get(name) is websocket:
+                self._force_reconnect(name, websocket, "ping无响应")
+        except Exception as e:
+            # 连接已关闭，由连接监督任务处理
+            logger.debug("[灾害预警] 连接探测失败 %s: %s", name, e)
+        finally:
+            activity.probing = False
+
+    def _force_reconnect(self, name: str, websocket, reason: str):
+        """中止半开连接，读取循环随即退出并由连接监督任务重连"""
+        logger.warning(f"[灾害预警] {name} {reason}，强制重连")
+        activity = self.feed_activity[name]
+        activity.stale_reconnects += 1
+        activity.connected_at = None
+        # 连接保留在connections中，由读取循环退出时记录断线区间并通知监听器（触发回补）
+        # 半开连接上的关闭握手不会得到响应，直接中止传输层
+        transport = getattr(websocket, "transport", None)
+        if transport is not None:
+            transport.abort()
+        else:
+            asyncio.create_task(websocket.close())
+
+    def get_feed_activity(self) -> dict[str, dict[str, Any]]:
+        """获取每个连接最后一条消息的时间"""
+        return {
+            name: activity.get_stats() for name, activity in self.feed_activity.items()
+        }
+
+    def get_connection_states(self) -> dict[str, dict[str, Any]]:
+        """获取每个连接的断路状态"""
+        return {
+            name: policy.get_state() for name, policy in self.reconnect_policies.items()
+        }
 
     async def disconnect(self, name: str):
         """断开连接"""
@@ -162,10 +587,6 @@ class WebSocketManager:
             finally:
                 self.connections.pop(name, None)
 
-        if name in self.reconnect_tasks:
-            self.reconnect_tasks[name].cancel()
-            self.reconnect_tasks.pop(name, None)
-
     async def send_message(self, name: str, message: str):
         """发送消息"""
         if name in self.connections:
@@ -177,20 +598,28 @@ class WebSocketManager:
     async def start(self):
         """启动管理器"""
         self.running = True
+        if self.watchdog_enabled:
+            self.watchdog_task = asyncio.create_task(self._watchdog())
         logger.info("[灾害预警] WebSocket管理器已启动")
 
     async def stop(self):
         """停止管理器"""
         self.running = False
 
-        # 取消所有重连任务
-        for task in self.reconnect_tasks.values():
-            task.cancel()
+        if self.watchdog_task:
+            self.watchdog_task.cancel()
+            self.watchdog_task = None
 
         # 断开所有连接
         for name in list(self.connections.keys()):
             await self.disconnect(name)
 
+        # 停止入站队列消费者
+        for ingress_queue in self.ingress_queues.values():
+            for task in ingress_queue.consumer_tasks:
+                task.cancel()
+        self.ingress_queues.clear()
+
         logger.info("[灾害预警] WebSocket管理器已停止")
 
     def _find_handler_by_prefix(self, connection_name: str) -> str | None:
@@ -222,177 +651,406 @@ class WebSocketManager:
 
 
 class HTTPDataFetcher:
-    """HTTP数据获取器"""
+    """HTTP数据获取器 - 服务运行期间持有同一个连接池会话
+
+    复用连接（keep-alive）避免每次轮询重新进行TLS握手，
+    并记录各URL的ETag/Last-Modified，内容未变化时服务器返回304，不再重复下载和解析
+    """
 
     def __init__(self, config: dict[str, Any]):
         self.config = config
         self.session: aiohttp.ClientSession | None = None
+        # URL -> (ETag, Last-Modified)
+        self._validators: dict[str, tuple[str | None, str | None]] = {}
+        # URL -> 最近一次响应状态码（请求异常时为None）
+        self.last_status: dict[str, int | None] = {}
 
-    async def __aenter__(self):
+        # 统计信息
+        self.requests = 0
+        self.not_modified = 0
+        self.errors = 0
+        self.bytes_received = 0
+
+    async def start(self):
+        """创建连接池会话"""
+        if self.session and not self.session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit_per_host=_HTTP_LIMIT_PER_HOST,
+            ttl_dns_cache=_HTTP_DNS_CACHE_TTL,
+        )
         self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=self.config.get("http_timeout", 30))
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.config.get("http_timeout", 30)),
         )
-        return self
 
-    async def __aexit__(self, exc_type=None, exc_val=None, exc_tb=None):
-        # 忽略异常参数，仅用于资源清理
-        _ = exc_type, exc_val, exc_tb  # 抑制未使用变量警告
+    async def close(self):
+        """关闭连接池会话"""
         if self.session:
             await self.session.close()
+            self.session = None
 
-    async def fetch_json(self, url: str, headers: dict | None = None) -> dict | None:
-        """获取JSON数据"""
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type=None, exc_val=None, exc_tb=None):
+        await self.close()
+
+    async def fetch_envelope(
+        self,
+        url: str,
+        connection_name: str,
+        headers: dict | None = None,
+        conditional: bool = True,
+    ) -> MessageEnvelope | None:
+        """获取HTTP响应并封装为消息信封（不在此处解码，由下游按需解码一次）
+
+        conditional为True时发送条件请求，内容未变化（304）时返回None
+        """
         if not self.session:
-            return None
+            await self.start()
+
+        request_headers = dict(headers) if headers else {}
+        validators = self._validators.get(url) if conditional else None
+        if validators:
+            etag, last_modified = validators
+            if etag:
+                request_headers["If-None-Match"] = etag
+            if last_modified:
+                request_headers["If-Modified-Since"] = last_modified
 
+        self.requests += 1
         try:
-            async with self.session.get(url, headers=headers) as response:
+            async with self.session.get(url, headers=request_headers) as response:
+                self.last_status[url] = response.status
+                if response.status == 304:
+                    self.not_modified += 1
+                    logger.debug("[灾害预警] HTTP内容未变化: %s", url)
+                    return None
                 if response.status == 200:
-                    return await response.json()
+                    raw = await response.read()
+                    self.bytes_received += len(raw)
+                    self._validators[url] = (
+                        response.headers.get("ETag"),
+                        response.headers.get("Last-Modified"),
+                    )
+                    return MessageEnvelope(
+                        raw=raw,
+                        connection_name=connection_name,
+                        url=url,
+                    )
                 else:
+                    self.errors += 1
                     logger.warning(f"[灾害预警] HTTP请求失败 {url}: {response.status}")
         except Exception as e:
+            self.errors += 1
+            self.last_status[url] = None
             logger.error(f"[灾害预警] HTTP请求异常 {url}: {e}")
 
         return None
 
+    async def fetch_json(self, url: str, headers: dict | None = None) -> dict | None:
+        """获取JSON数据（不使用条件请求）"""
+        envelope = await self.fetch_envelope(url, "http", headers, conditional=False)
+        return envelope.data if envelope else None
+
+    def get_stats(self) -> dict[str, int]:
+        """获取HTTP请求统计"""
+        return {
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "errors": self.errors,
+            "bytes": self.bytes_received,
+        }
+
+
+# Global Quake每次读取的最大字节数
+_GQ_READ_CHUNK = 64 * 1024
+
+DEFAULT_GQ_SERVER = "server-backup.globalquake.net"
+
+
+def _server_address(value: Any) -> str:
+    """服务器地址 - 兼容布尔开关形式的旧配置"""
+    if isinstance(value, str) and value.strip():
+        return value.strip()
+    return DEFAULT_GQ_SERVER
+
+
+class _ServerStats:
+    """单个Global Quake服务器的连接统计"""
+
+    def __init__(self):
+        self.connects = 0
+        self.failures = 0
+        self.uptime = 0.0
+        self.connected_since: float | None = None
+        self.last_error: str | None = None
+
+    def current_uptime(self) -> float:
+        if self.connected_since is None:
+            return self.uptime
+        return self.uptime + time.monotonic() - self.connected_since
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "connects": self.connects,
+            "failures": self.failures,
+            "uptime_seconds": self.current_uptime(),
+            "connected": self.connected_since is not None,
+            "last_error": self.last_error,
+        }
+
 
 class GlobalQuakeClient:
-    """Global Quake TCP客户端"""
+    """Global Quake TCP客户端
+
+    run()是连接监督任务：断线后按退避策略无限重连，
+    主服务器不可用时切换到备用服务器，连接备用服务器期间定期检查主服务器，恢复后切回
+    """
 
     def __init__(self, config: dict[str, Any], message_logger=None):
         self.config = config
         self.message_logger = message_logger
-        # 关键修复：确保服务器地址是字符串，而不是布尔值
-        primary_server = config.get("primary_server", "server-backup.globalquake.net")
-        secondary_server = config.get(
-            "secondary_server", "server-backup.globalquake.net"
+        self.primary_server = _server_address(
+            config.get("primary_server", DEFAULT_GQ_SERVER)
         )
-
-        # 处理布尔值配置问题
-        if isinstance(primary_server, bool):
-            primary_server = "server-backup.globalquake.net" if primary_server else ""
-        if isinstance(secondary_server, bool):
-            secondary_server = (
-                "server-backup.globalquake.net" if secondary_server else ""
-            )
-
-        # 确保是有效的字符串地址
-        self.primary_server = (
-            str(primary_server)
-            if isinstance(primary_server, str) and primary_server.strip()
-            else "server-backup.globalquake.net"
-        )
-        self.secondary_server = (
-            str(secondary_server)
-            if isinstance(secondary_server, str) and secondary_server.strip()
-            else "server-backup.globalquake.net"
+        self.secondary_server = _server_address(
+            config.get("secondary_server", DEFAULT_GQ_SERVER)
         )
         self.primary_port = config.get("primary_port", 38000)
         self.secondary_port = config.get("secondary_port", 38000)
 
+        # 按优先级排列的服务器，地址相同时只保留主服务器
+        self.servers = [(self.primary_server, self.primary_port)]
+        if config.get("secondary_enabled", True) and (
+            self.secondary_server,
+            self.secondary_port,
+        ) != self.servers[0]:
+            self.servers.append((self.secondary_server, self.secondary_port))
+        self.server_stats = {
+            f"{server}:{port}": _ServerStats() for server, port in self.servers
+        }
+
+        self.connect_timeout = config.get("connect_timeout", 10)
+        self.primary_recheck_interval = config.get("primary_recheck_interval", 300)
+        self.reconnect_policy = ReconnectPolicy.from_config(
+            config, initial_delay=1.0, max_delay=60.0
+        )
+
         self.reader: asyncio.StreamReader | None = None
         self.writer: asyncio.StreamWriter | None = None
         self.running = False
         self.message_handler: Callable | None = None
+        self.current_server: tuple[str, int] | None = None
+        # 主服务器恢复后切回时跳过退避
+        self._failback = False
+
+        # TCP是字节流：分帧器处理半包与粘包，心跳包在分帧后直接应答，不进入解析
+        self.framer = GlobalQuakeFramer()
+        self.frame_classifier = FrameClassifier()
+        self.keepalives = 0
 
     def register_handler(self, handler: Callable):
         """注册消息处理器"""
         self.message_handler = handler
 
+    async def _connect_to(self, server: str, port: int) -> bool:
+        """连接指定服务器"""
+        stats = self.server_stats[f"{server}:{port}"]
+        try:
+            logger.info(f"[灾害预警] 正在连接Global Quake服务器 {server}:{port}")
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(server, port), self.connect_timeout
+            )
+        except Exception as e:
+            stats.failures += 1
+            stats.last_error = str(e) or type(e).__name__
+            self.reconnect_policy.record_failure()
+            logger.error(f"[灾害预警] Global Quake连接失败 {server}:{port}: {e}")
+            return False
+
+        self.current_server = (server, port)
+        self.framer.reset()
+        stats.connects += 1
+        stats.connected_since = time.monotonic()
+        self.reconnect_policy.record_connected()
+        logger.info(f"[灾害预警] Global Quake连接成功: {server}:{port}")
+        return True
+
     async def connect(self):
-        """连接到Global Quake服务器"""
-        servers = [
-            (self.primary_server, self.primary_port),
-            (self.secondary_server, self.secondary_port),
-        ]
+        """按优先级连接Global Quake服务器（单次尝试）"""
+        for server, port in self.servers:
+            if await self._connect_to(server, port):
+                return True
+        return False
+
+    async def run(self):
+        """连接监督任务 - 无限重连，主备切换"""
+        self.running = True
+        index = 0
+        try:
+            while self.running:
+                server, port = self.servers[index]
+                if await self._connect_to(server, port):
+                    recheck_task = (
+                        asyncio.create_task(self._recheck_primary())
+                        if index != 0
+                        else None
+                    )
+                    try:
+                        await self.listen()
+                    finally:
+                        if recheck_task:
+                            recheck_task.cancel()
+                    if not self.running:
+                        break
+
+                    uptime = self.reconnect_policy.record_disconnected()
+                    logger.warning(
+                        f"[灾害预警] Global Quake连接断开 {server}:{port}，本次连接持续 {uptime:.0f} 秒"
+                    )
+                    # 断线后总是先尝试主服务器
+                    index = 0
+                    if self._failback:
+                        self._failback = False
+                        continue
+                else:
+                    # 当前服务器不可用，切换到下一个服务器
+                    index = (index + 1) % len(self.servers)
+                    if index != 0:
+                        continue
+
+                delay = self.reconnect_policy.next_delay()
+                if delay is None:
+                    logger.error("[灾害预警] Global Quake达到最大重连次数，停止重连")
+                    break
+                logger.info(
+                    f"[灾害预警] Global Quake将在 {delay:.1f} 秒后重连 (第{self.reconnect_policy.attempts}次)"
+                )
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            logger.info("[灾害预警] Global Quake连接监督任务被取消")
+        finally:
+            await self.disconnect()
 
-        for server, port in servers:
+    async def _recheck_primary(self):
+        """连接备用服务器期间定期探测主服务器，可用时断开当前连接切回主服务器"""
+        server, port = self.servers[0]
+        while self.running:
+            await asyncio.sleep(self.primary_recheck_interval)
             try:
-                logger.info(f"[灾害预警] 正在连接Global Quake服务器 {server}:{port}")
-                self.reader, self.writer = await asyncio.open_connection(server, port)
-                logger.info(f"[灾害预警] Global Quake连接成功: {server}:{port}")
-                return True
-            except Exception as e:
-                logger.error(f"[灾害预警] Global Quake连接失败 {server}:{port}: {e}")
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection(server, port), self.connect_timeout
+                )
+                writer.close()
+            except Exception:
+                continue
 
-        return False
+            logger.info(
+                f"[灾害预警] Global Quake主服务器 {server}:{port} 已恢复，切回主服务器"
+            )
+            self._failback = True
+            await self._close_transport()
+            return
 
     async def listen(self):
-        """监听消息"""
+        """监听消息直到连接断开 - 按块读取，由分帧器切分出完整的包"""
         if not self.reader or not self.writer:
             return
 
-        self.running = True
-
         try:
             while self.running:
-                data = await self.reader.readline()
-                if not data:
+                chunk = await self.reader.read(_GQ_READ_CHUNK)
+                if not chunk:
                     break
 
-                message = data.decode("utf-8").strip()
-                if message and self.message_handler:
-                    try:
-                        # 添加Global Quake消息调试日志
-                        logger.debug(
-                            f"[灾害预警] Global Quake收到原始消息: {message[:100]}..."
-                        )
-
-                        # 记录原始消息
-                        if self.message_logger:
-                            current_server = (
-                                self.writer.get_extra_info("peername")[0]
-                                if self.writer
-                                else "unknown"
-                            )
-                            current_port = (
-                                self.writer.get_extra_info("peername")[1]
-                                if self.writer
-                                else 0
-                            )
-                            logger.debug(
-                                f"[灾害预警] 准备记录Global Quake TCP消息 - 服务器: {current_server}:{current_port}"
-                            )
-                            self.message_logger.log_tcp_message(
-                                current_server, current_port, message
-                            )
-                            logger.debug("[灾害预警] Global Quake TCP消息记录完成")
-                        else:
-                            logger.debug(
-                                "[灾害预警] 消息记录器未启用，无法记录Global Quake消息"
-                            )
-
-                        await self.message_handler(message)
-                    except Exception as e:
-                        logger.error(f"[灾害预警] 处理Global Quake消息时出错: {e}")
+                oversized = self.framer.oversized
+                frames = self.framer.feed(chunk)
+                if self.framer.oversized != oversized:
+                    logger.warning(
+                        f"[灾害预警] Global Quake帧超过 {self.framer.max_frame_size} 字节上限，已跳过"
+                    )
+
+                for frame in frames:
+                    await self._handle_frame(frame)
 
-        except asyncio.CancelledError:
-            logger.info("[灾害预警] Global Quake监听任务被取消")
         except Exception as e:
             logger.error(f"[灾害预警] Global Quake监听异常: {e}")
         finally:
-            await self.disconnect()
+            await self._close_transport()
 
-    async def disconnect(self):
-        """断开连接"""
-        self.running = False
+    async def _handle_frame(self, frame: bytes):
+        """处理单个完整的包"""
+        if self.frame_classifier.classify("global_quake", frame):
+            # 服务器心跳需要应答，否则会被断开
+            self.keepalives += 1
+            await self.send_bytes(self.framer.encode(KEEPALIVE_REPLY))
+            return
+
+        if not self.message_handler:
+            return
+
+        envelope = MessageEnvelope(raw=frame, connection_name="global_quake")
+        try:
+            await self.message_handler(envelope)
+        except Exception as e:
+            logger.error(f"[灾害预警] 处理Global Quake消息时出错: {e}")
+        finally:
+            # 解析之后记录，复用解码结果
+            if self.message_logger:
+                server, port = self.current_server or ("unknown", 0)
+                self.message_logger.log_tcp_message(server, port, envelope)
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取连接、重连与分帧统计"""
+        server = self.current_server
+        return {
+            "connected": self.writer is not None,
+            "server": f"{server[0]}:{server[1]}" if server else None,
+            "keepalives": self.keepalives,
+            "reconnect": self.reconnect_policy.get_state(),
+            "servers": {
+                name: stats.to_dict() for name, stats in self.server_stats.items()
+            },
+            **self.framer.get_stats(),
+        }
+
+    async def _close_transport(self):
+        """关闭当前TCP连接并累计该服务器的在线时长"""
+        if self.current_server:
+            stats = self.server_stats[
+                f"{self.current_server[0]}:{self.current_server[1]}"
+            ]
+            if stats.connected_since is not None:
+                stats.uptime += time.monotonic() - stats.connected_since
+                stats.connected_since = None
 
         if self.writer:
+            writer = self.writer
+            self.writer = None
+            self.reader = None
             try:
-                self.writer.close()
-                await self.writer.wait_closed()
+                writer.close()
+                await writer.wait_closed()
             except Exception as e:
-                logger.error(f"[灾害预警] 断开Global Quake连接时出错: {e}")
-            finally:
-                self.writer = None
-                self.reader = None
+                logger.debug("[灾害预警] 关闭Global Quake连接时出错: %s", e)
+
+    async def disconnect(self):
+        """停止监督任务并断开连接"""
+        self.running = False
+        await self._close_transport()
 
     async def send_message(self, message: str):
         """发送消息"""
+        await self.send_bytes(message.encode("utf-8"))
+
+    async def send_bytes(self, data: bytes):
+        """发送已封装的数据"""
         if self.writer:
             try:
-                self.writer.write(message.encode("utf-8"))
+                self.writer.write(data)
                 await self.writer.drain()
             except Exception as e:
                 logger.error(f"[灾害预警] 发送Global Quake消息失败: {e}")